@@ -5,8 +5,8 @@ import logging
 import os
 
 from src.api import search_bp, postgres_bp, sync_bp
-from src.core import RediSearchService
-from src.services import PostgreSQLService
+from src.core import redisearch_service
+from src.services import postgres_service
 
 logging.basicConfig(
     level=logging.INFO,
@@ -16,9 +16,6 @@ logging.basicConfig(
 app = Flask(__name__)
 CORS(app)
 
-redisearch_service = RediSearchService()
-postgres_service = PostgreSQLService()
-
 app.register_blueprint(search_bp, url_prefix='/search')
 app.register_blueprint(sync_bp, url_prefix='/sync')
 app.register_blueprint(postgres_bp, url_prefix='/postgres')
@@ -31,7 +28,8 @@ def health_check():
         return jsonify({
             'status': 'healthy',
             'message': 'Redis Search API is running',
-            'stats': stats
+            'stats': stats,
+            'redis_pools': redis_config.get_pool_stats()
         }), 200
     except Exception as e:
         return jsonify({
@@ -0,0 +1,63 @@
+"""ASGI entry point serving the same routes as app.py on asyncio
+
+Run with an ASGI server, e.g. ``hypercorn asgi:app --bind 0.0.0.0:5000``.
+"""
+from quart import Quart, jsonify
+from quart_cors import cors
+from config import redis_config
+import logging
+
+from src.api.aio import search_bp, postgres_bp, sync_bp
+from src.core import async_redisearch_service
+from src.services.async_postgres_service import async_postgres_service
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+app = Quart(__name__)
+app = cors(app)
+
+app.register_blueprint(search_bp, url_prefix='/search')
+app.register_blueprint(sync_bp, url_prefix='/sync')
+app.register_blueprint(postgres_bp, url_prefix='/postgres')
+
+
+@app.after_serving
+async def close_connections():
+    await redis_config.close_async_connections()
+    await async_postgres_service.close_connection()
+
+
+@app.route('/', methods=['GET'])
+async def health_check():
+    try:
+        stats = await async_redisearch_service.get_stats()
+        return jsonify({
+            'status': 'healthy',
+            'message': 'Redis Search API is running (ASGI)',
+            'stats': stats,
+            'redis_pools': redis_config.get_pool_stats(),
+            'redis_async_pools': redis_config.get_async_pool_stats()
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Health check failed: {str(e)}'
+        }), 500
+
+
+@app.errorhandler(404)
+async def not_found(error):
+    return jsonify({'error': 'Endpoint not found'}), 404
+
+
+@app.errorhandler(405)
+async def method_not_allowed(error):
+    return jsonify({'error': 'Method not allowed'}), 405
+
+
+@app.errorhandler(500)
+async def internal_error(error):
+    return jsonify({'error': 'Internal server error'}), 500
@@ -0,0 +1,84 @@
+"""Latency benchmark for the in-process autocomplete trie
+
+Builds a SuggestionTrie over a synthetic catalogue vocabulary, checks fuzzy
+completions against a brute-force scan with TextProcessor.levenshtein_distance
+and prints latency percentiles. Run from the repository root:
+
+    python benchmarks/bench_autocomplete.py --phrases 200000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.services.autocomplete_service import SuggestionTrie
+from src.utils import TextProcessor
+
+WORDS = ['samsung', 'galaxy', 'phone', 'apple', 'iphone', 'charger', 'usb', 'cable', 'wireless', 'headphones',
+         'bluetooth', 'speaker', 'laptop', 'stand', 'keyboard', 'mouse', 'monitor', 'gaming', 'chair', 'desk',
+         'lamp', 'smart', 'watch', 'band', 'case', 'cover', 'screen', 'protector', 'tablet', 'camera']
+
+
+def synthetic_phrases(count, seed=7):
+    rng = random.Random(seed)
+    phrases = {}
+    while len(phrases) < count:
+        words = [rng.choice(WORDS) + (str(rng.randint(0, 999)) if rng.random() < 0.7 else '') for _ in range(rng.randint(1, 3))]
+        phrases[' '.join(words)] = float(rng.randint(1, 1000))
+    return list(phrases.items())
+
+
+def brute_force(phrases, prefix, max_distance):
+    """(distance, -score) of every phrase with a prefix within ``max_distance`` edits, the reference for fuzzy_complete"""
+    matches = {}
+    for phrase, score in phrases:
+        lengths = range(max(0, len(prefix) - max_distance), min(len(phrase), len(prefix) + max_distance) + 1)
+        distance = min((TextProcessor.levenshtein_distance(prefix, phrase[:n]) for n in lengths), default=max_distance + 1)
+        if distance <= max_distance:
+            matches[phrase] = (distance, -score)
+    return matches
+
+
+def percentile(samples, fraction):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--phrases', type=int, default=200000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    phrases = synthetic_phrases(args.phrases)
+    started = time.perf_counter()
+    trie = SuggestionTrie(phrases, top_k=50)
+    print(f"{len(trie)} phrases, {trie.node_count} nodes, built in {time.perf_counter() - started:.2f}s")
+
+    rng = random.Random(11)
+    prefixes = [rng.choice(WORDS)[:rng.randint(3, 6)] for _ in range(args.queries)]
+    typos = [p[:1] + p[2:] + 'x' if len(p) > 3 else p for p in prefixes]
+
+    sample = phrases[:5000]
+    small = SuggestionTrie(sample, top_k=50)
+    for prefix in typos[:50] + prefixes[:50]:
+        expected = brute_force(sample, prefix, 1)
+        found = [expected.get(phrase) for phrase, _ in small.fuzzy_complete(prefix, 1, args.limit)]
+        assert found == sorted(expected.values())[:args.limit], prefix
+        completions = sorted(-score for phrase, score in sample if phrase.startswith(prefix))[:args.limit]
+        assert [-score for _, score in small.complete(prefix, args.limit)] == completions, prefix
+
+    for label, run, queries in (('prefix', lambda p: trie.complete(p, args.limit), prefixes),
+                                ('fuzzy', lambda p: trie.fuzzy_complete(p, 1, args.limit), typos)):
+        samples = []
+        for prefix in queries:
+            started = time.perf_counter()
+            run(prefix)
+            samples.append((time.perf_counter() - started) * 1e6)
+        print(f"{label:<7} p50 {percentile(samples, 0.5):8.1f} us   p99 {percentile(samples, 0.99):8.1f} us   max {max(samples):8.1f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Micro-benchmark for SearchService.parse_search_results
+
+Compares the previous pair-walking parser with the current linear one on a
+synthetic FT.SEARCH reply. Run from the repository root:
+
+    python benchmarks/bench_parse_results.py --limit 100
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.services.search_service import SearchService
+
+
+def legacy_parse(result):
+    """The parser as it was before field projection, kept here for comparison"""
+    def decode(value):
+        if isinstance(value, bytes):
+            return value.decode('utf-8')
+        return value
+
+    documents = []
+    for i in range(1, len(result), 2):
+        if i + 1 < len(result):
+            doc_id = result[i]
+            doc_fields = result[i + 1]
+            doc_dict = {}
+            metadata_dict = {}
+            for j in range(0, len(doc_fields), 2):
+                if j + 1 < len(doc_fields):
+                    field_name = decode(doc_fields[j])
+                    field_value = decode(doc_fields[j + 1])
+                    if field_name.startswith('metadata.'):
+                        metadata_dict[field_name[9:]] = field_value
+                        if 'metadata.tags' in doc_fields:
+                            tags_value = metadata_dict.get('tags', '')
+                            metadata_dict['tags'] = [tag.strip() for tag in tags_value.split(',') if tag.strip()] if tags_value else []
+                        else:
+                            doc_dict['tags'] = []
+                    else:
+                        doc_dict[field_name] = field_value
+            doc_dict['id'] = decode(doc_id)
+            doc_dict['metadata'] = metadata_dict
+            documents.append(doc_dict)
+    return documents
+
+
+def synthetic_reply(limit):
+    """A decoded FT.SEARCH reply with ``limit`` full product hashes"""
+    reply = [limit]
+    for n in range(limit):
+        reply.append(f"search:documents:{n}")
+        # metadata.tags comes last: the legacy parser re-splits on every later metadata field
+        reply.append([
+            'id', str(n),
+            'name', f"Product {n} wireless noise cancelling headphones",
+            'price', str(19.99 + n),
+            'image', f"https://example.com/images/{n}.jpg",
+            'url', f"https://example.com/products/{n}",
+            'metadata.name', f"Product {n} wireless noise cancelling headphones",
+            'metadata.brand', 'Acme',
+            'metadata.price', str(19.99 + n),
+            'metadata.tags', 'audio, wireless, bluetooth, headphones',
+            'indexed_at', '1700000000',
+        ])
+    return reply
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--number', type=int, default=2000)
+    args = parser.parse_args()
+
+    reply = synthetic_reply(args.limit)
+    ids_reply = [reply[0]] + reply[1::2]
+    service = SearchService.__new__(SearchService)
+
+    assert [doc['metadata'] for doc in legacy_parse(reply)] == [doc['metadata'] for doc in service.parse_search_results(reply)]
+
+    legacy = min(timeit.repeat(lambda: legacy_parse(reply), number=args.number, repeat=5))
+    current = min(timeit.repeat(lambda: service.parse_search_results(reply), number=args.number, repeat=5))
+    ids_only = min(timeit.repeat(lambda: service.parse_search_results(ids_reply, ids_only=True), number=args.number, repeat=5))
+
+    per_call = 1e6 / args.number
+    print(f"limit={args.limit}, {args.number} calls, best of 5")
+    print(f"legacy parser:    {legacy * per_call:8.1f} us/call")
+    print(f"linear parser:    {current * per_call:8.1f} us/call  ({legacy / current:.2f}x)")
+    print(f"ids-only parser:  {ids_only * per_call:8.1f} us/call")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,7 @@
 import redis
+import redis.asyncio
 import os
+import threading
 from dotenv import load_dotenv
 import logging
 
@@ -13,24 +15,47 @@ class RedisConfig:
         self.port = int(os.getenv('REDIS_PORT', 6379))
         self.password = os.getenv('REDIS_PASSWORD')
         self.db = int(os.getenv('REDIS_DB', 0))
-        self._connection = None
+        self.max_connections = int(os.getenv('REDIS_MAX_CONNECTIONS', 50))
+        self.read_max_connections = int(os.getenv('REDIS_READ_MAX_CONNECTIONS', self.max_connections))
+        self.pool_timeout = float(os.getenv('REDIS_POOL_TIMEOUT', 5))
+        self.health_check_interval = int(os.getenv('REDIS_HEALTH_CHECK_INTERVAL', 30))
+        self._pools = {}
+        self._connections = {}
+        self._async_connections = {}
+        self._lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._reset_after_fork)
         
-    def get_connection(self):
-        """Get Redis connection instance"""
-        if self._connection is None:
+    def _create_pool(self, max_connections: int):
+        return redis.BlockingConnectionPool(
+            host=self.host,
+            port=self.port,
+            password=self.password,
+            db=self.db,
+            max_connections=max_connections,
+            timeout=self.pool_timeout,
+            health_check_interval=self.health_check_interval,
+            decode_responses=True,
+            socket_timeout=5,
+            socket_connect_timeout=5,
+            retry_on_timeout=True
+        )
+    
+    def get_pool(self, role: str = 'write'):
+        """Get the blocking connection pool for ``role`` ('read' or 'write')"""
+        with self._lock:
+            if role not in self._pools:
+                max_connections = self.read_max_connections if role == 'read' else self.max_connections
+                self._pools[role] = self._create_pool(max_connections)
+            return self._pools[role]
+    
+    def get_connection(self, role: str = 'write'):
+        """Get Redis connection instance backed by the pool for ``role``"""
+        if role not in self._connections:
             try:
-                self._connection = redis.Redis(
-                    host=self.host,
-                    port=self.port,
-                    password=self.password,
-                    db=self.db,
-                    decode_responses=True,
-                    socket_timeout=5,
-                    socket_connect_timeout=5,
-                    retry_on_timeout=True
-                )
-                self._connection.ping()
-                logging.info(f"Successfully connected to Redis at {self.host}:{self.port}")
+                connection = redis.Redis(connection_pool=self.get_pool(role))
+                connection.ping()
+                self._connections[role] = connection
+                logging.info(f"Successfully connected to Redis at {self.host}:{self.port} ({role} pool)")
             except redis.ConnectionError as e:
                 logging.error(f"Failed to connect to Redis: {e}")
                 raise
@@ -38,7 +63,81 @@ class RedisConfig:
                 logging.error(f"Error connecting to Redis: {e}")
                 raise
                 
-        return self._connection
+        return self._connections[role]
+    
+    def get_read_connection(self):
+        """Get Redis connection instance for read-only traffic"""
+        return self.get_connection('read')
+    
+    def get_async_connection(self, role: str = 'write'):
+        """Get an asyncio Redis client for ``role``, used by the ASGI app
+        
+        Connections are opened lazily inside the running event loop, so the
+        client can be created before the loop starts.
+        """
+        if role not in self._async_connections:
+            max_connections = self.read_max_connections if role == 'read' else self.max_connections
+            pool = redis.asyncio.BlockingConnectionPool(
+                host=self.host,
+                port=self.port,
+                password=self.password,
+                db=self.db,
+                max_connections=max_connections,
+                timeout=self.pool_timeout,
+                health_check_interval=self.health_check_interval,
+                decode_responses=True,
+                socket_timeout=5,
+                socket_connect_timeout=5,
+                retry_on_timeout=True
+            )
+            self._async_connections[role] = redis.asyncio.Redis(connection_pool=pool)
+        return self._async_connections[role]
+    
+    async def close_async_connections(self):
+        """Close every asyncio client, meant for ASGI shutdown"""
+        connections, self._async_connections = self._async_connections, {}
+        for connection in connections.values():
+            await connection.aclose()
+    
+    def _reset_after_fork(self):
+        """Drop connections inherited from the parent process so workers never share sockets"""
+        self._lock = threading.Lock()
+        for pool in self._pools.values():
+            pool.reset()
+        self._async_connections = {}
+    
+    def get_pool_stats(self) -> dict:
+        """Live statistics for every initialized pool"""
+        stats = {}
+        for role, pool in list(self._pools.items()):
+            created = len(pool._connections)
+            in_use = pool.max_connections - pool.pool.qsize()
+            stats[role] = {
+                'max_connections': pool.max_connections,
+                'created_connections': created,
+                'in_use_connections': in_use,
+                'idle_connections': max(created - in_use, 0),
+                'timeout_seconds': pool.timeout,
+                'health_check_interval': self.health_check_interval
+            }
+        return stats
+    
+    def get_async_pool_stats(self) -> dict:
+        """Live statistics for every initialized asyncio pool"""
+        stats = {}
+        for role, connection in list(self._async_connections.items()):
+            pool = connection.connection_pool
+            in_use = len(pool._in_use_connections)
+            idle = len(pool._available_connections)
+            stats[role] = {
+                'max_connections': pool.max_connections,
+                'created_connections': in_use + idle,
+                'in_use_connections': in_use,
+                'idle_connections': idle,
+                'timeout_seconds': getattr(pool, 'timeout', None),
+                'health_check_interval': self.health_check_interval
+            }
+        return stats
     
     def test_connection(self):
         """Test Redis connection"""
@@ -0,0 +1,65 @@
+"""Report RediSearch index memory from FT.INFO and compare it against a saved baseline
+
+Typical schema migration:
+
+    python scripts/index_memory_report.py product_index --save before.json
+    curl -X POST localhost:5000/search/index/rebuild
+    python scripts/index_memory_report.py product_index --baseline before.json
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from config import redis_config
+from src.services.index_manager import IndexManager, MEMORY_INFO_FIELDS
+
+COLUMNS = ('num_docs',) + MEMORY_INFO_FIELDS
+
+
+def _number(value) -> str:
+    return format(value, ',.3f' if isinstance(value, float) else ',')
+
+
+def print_report(report, baseline=None):
+    for index_name, entry in report.items():
+        if 'error' in entry:
+            print(f"{index_name}: {entry['error']}")
+            continue
+        print(f"{index_name} -> {entry['index_name']} (schema v{entry['schema_version']})")
+        before = (baseline or {}).get(index_name)
+        for column in COLUMNS:
+            if column not in entry:
+                continue
+            line = f"  {column:<26}{_number(entry[column]):>14}"
+            if before and column in before:
+                change = entry[column] - before[column]
+                percent = f" ({change / before[column] * 100:+.1f}%)" if before[column] else ''
+                line += f"  was {_number(before[column]):>14}{percent}"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('indexes', nargs='*', help='index names or aliases, every index by default')
+    parser.add_argument('--save', help='write the report as JSON to this file')
+    parser.add_argument('--baseline', help='compare against a report saved with --save')
+    args = parser.parse_args()
+
+    report = IndexManager(redis_config.get_connection()).memory_report(args.indexes)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print_report(report, baseline)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved report to {args.save}")
+
+
+if __name__ == '__main__':
+    main()
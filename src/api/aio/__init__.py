@@ -0,0 +1,5 @@
+from src.api.aio.postgres_routes import postgres_bp
+from src.api.aio.sync_routes import sync_bp
+from src.api.aio.search_routes import search_bp
+
+__all__=["search_bp", "sync_bp", "postgres_bp"]
@@ -0,0 +1,68 @@
+from quart import Blueprint, request, jsonify
+import logging
+from src.services.async_postgres_service import async_postgres_service, CONNECTION_ERRORS
+
+postgres_bp = Blueprint('postgres', __name__)
+
+
+@postgres_bp.route('/info', methods=['GET'])
+async def get_postgres_info():
+    try:
+        exact = request.args.get('exact', 'false').lower() == 'true'
+        info = await async_postgres_service.get_table_info(exact)
+        info['pool'] = async_postgres_service.get_pool_stats()
+        if 'error' in info:
+            info['connected'] = False
+            return jsonify(info), 500
+        return jsonify(info), 200
+        
+    except Exception as e:
+        logging.error(f"Error getting PostgreSQL info: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@postgres_bp.route('/products', methods=['GET'])
+async def get_postgres_products():
+    try:
+        limit = request.args.get('limit', 10, type=int)
+        offset = request.args.get('offset', 0, type=int)
+        exact = request.args.get('exact', 'false').lower() == 'true'
+        
+        if limit < 1 or limit > 100:
+            return jsonify({'error': 'Limit must be between 1 and 100'}), 400
+            
+        if offset < 0:
+            return jsonify({'error': 'Offset must be >= 0'}), 400
+        
+        try:
+            products = await async_postgres_service.fetch_products(limit, offset)
+            total_count = await async_postgres_service.get_products_count(exact)
+        except CONNECTION_ERRORS as e:
+            logging.error(f"PostgreSQL unavailable: {e}")
+            return jsonify({
+                'error': 'PostgreSQL connection failed',
+                'connected': False
+            }), 500
+        
+        return jsonify({
+            'products': products,
+            'total_count': total_count,
+            'total_count_exact': exact,
+            'returned_count': len(products),
+            'limit': limit,
+            'offset': offset
+        }), 200
+        
+    except Exception as e:
+        logging.error(f"Error getting PostgreSQL products: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@postgres_bp.route('/pool', methods=['GET'])
+async def get_postgres_pool():
+    try:
+        return jsonify(async_postgres_service.get_pool_stats()), 200
+        
+    except Exception as e:
+        logging.error(f"Error getting PostgreSQL pool stats: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
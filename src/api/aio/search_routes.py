@@ -0,0 +1,189 @@
+from quart import Blueprint, request, jsonify
+import asyncio
+import logging
+from src.core import redisearch_service, async_redisearch_service
+from src.api.params import index_params, query_params, facet_params, cursor_count, suggest_params, batch_specs, json_body
+from src.api import responses
+
+# Query endpoints await redis.asyncio; indexing endpoints are batch work on the blocking clients and run in worker threads
+search_bp = Blueprint('search', __name__)
+
+
+def _reply(body, status):
+    return jsonify(body), status
+
+
+@search_bp.route('/index/all', methods=['POST'])
+async def index_all_documents():
+    try:
+        if not await asyncio.to_thread(redisearch_service.test_redisearch_availability):
+            return _reply(responses.REDISEARCH_UNAVAILABLE, 500)
+
+        params, error = index_params(json_body(await request.get_data()), redisearch_service.bulk_flush_size)
+        if error:
+            return jsonify({'error': error}), 400
+
+        if params['background']:
+            job = await asyncio.to_thread(redisearch_service.submit_index_job, params['clear_existing'], params['batch_size'], params['flush_size'])
+            return _reply(*responses.job_submitted(job))
+
+        stats = await asyncio.to_thread(redisearch_service.index_from_postgres, params['clear_existing'], params['batch_size'], params['flush_size'])
+        return _reply(*responses.index_response(stats))
+
+    except Exception as e:
+        logging.error(f"Error in index_all_documents: {e}")
+        return jsonify({'success': False, 'error': f'Internal server error: {str(e)}'}), 500
+
+
+@search_bp.route('/index/rebuild', methods=['POST'])
+async def rebuild_index():
+    try:
+        if not await asyncio.to_thread(redisearch_service.test_redisearch_availability):
+            return _reply(responses.REDISEARCH_UNAVAILABLE, 500)
+
+        params, error = index_params(json_body(await request.get_data()), redisearch_service.bulk_flush_size)
+        if error:
+            return jsonify({'error': error}), 400
+
+        stats = await asyncio.to_thread(redisearch_service.rebuild_from_postgres, params['batch_size'], params['flush_size'])
+        return _reply(*responses.rebuild_response(stats))
+
+    except Exception as e:
+        logging.error(f"Error in rebuild_index: {e}")
+        return jsonify({'success': False, 'error': f'Internal server error: {str(e)}'}), 500
+
+
+@search_bp.route('/index/versions', methods=['GET'])
+async def index_versions():
+    try:
+        return jsonify(await asyncio.to_thread(redisearch_service.versions.get_status)), 200
+
+    except Exception as e:
+        logging.error(f"Error in index_versions: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@search_bp.route('/fulltext', methods=['GET'])
+async def full_text_search():
+    try:
+        params, error = query_params(request.args)
+        if error:
+            return jsonify({'error': error}), 400
+
+        if params['cursor']:
+            page = await async_redisearch_service.open_cursor('fulltext', params['query'], params['limit'], 2,
+                                                              params['fields'], params['ids_only'], params['options'], params['window'])
+            return _reply(*responses.opened_cursor_response(params, page))
+
+        results = await async_redisearch_service.full_text_search(params['query'], params['limit'], params['fields'],
+                                                                  params['ids_only'], params['options'])
+        return _reply(*responses.query_response(params, results))
+
+    except Exception as e:
+        logging.error(f"Error in full_text_search: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@search_bp.route('/fuzzy', methods=['GET'])
+async def fuzzy_search():
+    try:
+        params, error = query_params(request.args, fuzzy=True)
+        if error:
+            return jsonify({'error': error}), 400
+
+        if params['cursor']:
+            page = await async_redisearch_service.open_cursor('fuzzy', params['query'], params['limit'], params['max_distance'],
+                                                              params['fields'], params['ids_only'], params['options'], params['window'])
+            return _reply(*responses.opened_cursor_response(params, page, fuzzy=True))
+
+        found = await async_redisearch_service.corrected_fuzzy_search(params['query'], params['max_distance'], params['limit'],
+                                                                      params['fields'], params['ids_only'], params['options'])
+        return _reply(*responses.query_response(params, found, fuzzy=True))
+
+    except Exception as e:
+        logging.error(f"Error in fuzzy_search: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@search_bp.route('/facets', methods=['GET'])
+async def faceted_search():
+    try:
+        params, error = facet_params(request.args)
+        if error:
+            return jsonify({'error': error}), 400
+
+        result = await async_redisearch_service.faceted_search(params['query'], params['limit'], params['facet_size'], params['price_bucket'],
+                                                               params['fields'], params['ids_only'], params['options'])
+        return _reply(*responses.facets_response(params, result))
+
+    except Exception as e:
+        logging.error(f"Error in faceted_search: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@search_bp.route('/cursor/<cursor_id>', methods=['GET'])
+async def read_search_cursor(cursor_id):
+    try:
+        count, error = cursor_count(request.args)
+        if error:
+            return jsonify({'error': error}), 400
+
+        return _reply(*responses.cursor_page_response(await async_redisearch_service.read_cursor(cursor_id, count)))
+
+    except Exception as e:
+        logging.error(f"Error in read_search_cursor: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@search_bp.route('/suggest', methods=['GET'])
+async def get_suggestions():
+    try:
+        params, error = suggest_params(request.args)
+        if error:
+            return jsonify({'error': error}), 400
+
+        suggestions = await async_redisearch_service.get_suggestions(params['prefix'], params['limit'], params['fuzzy'], params['with_scores'])
+        return _reply(*responses.suggestions_response(params, suggestions))
+
+    except Exception as e:
+        logging.error(f"Error in get_suggestions: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@search_bp.route('/autocomplete', methods=['GET'])
+async def autocomplete():
+    try:
+        params, error = suggest_params(request.args, autocomplete=True)
+        if error:
+            return jsonify({'error': error}), 400
+
+        completions = await async_redisearch_service.get_suggestions(params['prefix'], params['limit'], params['fuzzy'], params['with_scores'])
+        return _reply(*responses.completions_response(params, completions))
+
+    except Exception as e:
+        logging.error(f"Error in autocomplete: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@search_bp.route('/batch', methods=['POST'])
+async def batch_search():
+    try:
+        specs, error = batch_specs(json_body(await request.get_data()))
+        if error:
+            return jsonify({'error': error}), 400
+
+        return _reply(*responses.result_response(await async_redisearch_service.batch_search(specs)))
+
+    except Exception as e:
+        logging.error(f"Error in batch_search: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@search_bp.route('/metrics', methods=['GET'])
+async def search_metrics():
+    try:
+        return jsonify(await async_redisearch_service.get_search_metrics()), 200
+
+    except Exception as e:
+        logging.error(f"Error in search_metrics: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
@@ -0,0 +1,121 @@
+from quart import Blueprint, request, jsonify
+import asyncio
+import logging
+from src.services import data_sync_service, job_service
+from src.api.params import sync_params, sync_batch_size, jobs_limit, status_params, json_body
+from src.api import responses
+
+# Sync jobs are long-running batch work built on the blocking clients, so they run in worker threads
+sync_bp = Blueprint('sync', __name__)
+
+
+def _reply(body, status):
+    return jsonify(body), status
+
+
+@sync_bp.route('/postgres', methods=['POST'])
+async def sync_from_postgres():
+    try:
+        params, error = sync_params(json_body(await request.get_data()), data_sync_service.workers, data_sync_service.queue_size)
+        if error:
+            return jsonify({'error': error}), 400
+
+        args = (params['batch_size'], params['clear_existing'], params['workers'], params['queue_size'])
+        if params['background']:
+            return _reply(*responses.job_submitted(await asyncio.to_thread(data_sync_service.submit_sync_job, *args)))
+
+        return _reply(*responses.sync_response(await asyncio.to_thread(data_sync_service.sync_all_products, *args)))
+
+    except Exception as e:
+        logging.error(f"Error in sync_from_postgres: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@sync_bp.route('/incremental', methods=['POST'])
+async def sync_incremental():
+    try:
+        batch_size, error = sync_batch_size(json_body(await request.get_data()))
+        if error:
+            return jsonify({'error': error}), 400
+
+        return _reply(*responses.incremental_response(await asyncio.to_thread(data_sync_service.sync_incremental, batch_size)))
+
+    except Exception as e:
+        logging.error(f"Error in sync_incremental: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@sync_bp.route('/changes', methods=['GET'])
+async def get_pending_changes():
+    try:
+        return _reply(*responses.result_response(await asyncio.to_thread(data_sync_service.get_pending_changes)))
+
+    except Exception as e:
+        logging.error(f"Error checking pending changes: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@sync_bp.route('/postgres/<product_id>', methods=['POST'])
+async def sync_single_product(product_id):
+    try:
+        if not product_id:
+            return jsonify({'error': 'Product ID is required'}), 400
+
+        return _reply(*responses.product_sync_response(await asyncio.to_thread(data_sync_service.sync_single_product, product_id)))
+
+    except Exception as e:
+        logging.error(f"Error syncing single product: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@sync_bp.route('/status', methods=['GET'])
+async def get_sync_status():
+    try:
+        return jsonify(await asyncio.to_thread(data_sync_service.get_sync_status, *status_params(request.args))), 200
+
+    except Exception as e:
+        logging.error(f"Error getting sync status: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@sync_bp.route('/jobs', methods=['GET'])
+async def list_jobs():
+    try:
+        limit, error = jobs_limit(request.args)
+        if error:
+            return jsonify({'error': error}), 400
+        return jsonify({'jobs': await asyncio.to_thread(job_service.list_jobs, limit)}), 200
+
+    except Exception as e:
+        logging.error(f"Error listing jobs: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@sync_bp.route('/jobs/<job_id>', methods=['GET'])
+async def get_job(job_id):
+    try:
+        return _reply(*responses.job_response(job_id, await asyncio.to_thread(job_service.get_job, job_id)))
+
+    except Exception as e:
+        logging.error(f"Error getting job {job_id}: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@sync_bp.route('/jobs/<job_id>/cancel', methods=['POST'])
+async def cancel_job(job_id):
+    try:
+        return _reply(*responses.job_action_response(job_id, await asyncio.to_thread(job_service.cancel, job_id)))
+
+    except Exception as e:
+        logging.error(f"Error cancelling job {job_id}: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@sync_bp.route('/jobs/<job_id>/resume', methods=['POST'])
+async def resume_job(job_id):
+    try:
+        return _reply(*responses.job_action_response(job_id, await asyncio.to_thread(job_service.resume, job_id)))
+
+    except Exception as e:
+        logging.error(f"Error resuming job {job_id}: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
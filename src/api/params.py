@@ -0,0 +1,290 @@
+"""Request validation shared by the WSGI and ASGI routes"""
+import json
+from src.services.search_service import RETURNABLE_FIELDS, SORTABLE_FIELDS
+
+BATCH_MAX_QUERIES = 50
+# RediSearch refuses offset + limit beyond MAXSEARCHRESULTS (10000 by default); deeper pages go through cursors
+MAX_RESULT_WINDOW = 10000
+# Cursors go deeper, but their first read sorts the whole window
+MAX_CURSOR_WINDOW = 100000
+
+
+def unknown_fields_error(fields):
+    unknown = [field for field in fields if field not in RETURNABLE_FIELDS]
+    if unknown:
+        return f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(RETURNABLE_FIELDS)}"
+    return None
+
+
+def flag(value) -> bool:
+    """A boolean parameter: JSON booleans as is, strings are true only when they read "true" """
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() == 'true' if value is not None else False
+
+
+def projection_params(args):
+    """Read the ``fields`` and ``ids_only`` query parameters, returns (fields, ids_only, error)"""
+    ids_only = flag(args.get('ids_only'))
+    fields = [field.strip() for field in args.get('fields', '').split(',') if field.strip()]
+    return fields or None, ids_only, unknown_fields_error(fields)
+
+
+def _optional_float(value):
+    if value is None or value == '':
+        return None
+    return float(value)
+
+
+def search_options(args, limit: int):
+    """Read the ``offset``, ``min_price``, ``max_price``, ``sort_by`` and ``order`` parameters, returns (options, error)"""
+    try:
+        offset = int(args.get('offset', 0) or 0)
+        min_price = _optional_float(args.get('min_price'))
+        max_price = _optional_float(args.get('max_price'))
+    except (TypeError, ValueError):
+        return None, 'offset must be an integer, min_price and max_price must be numbers'
+    if offset < 0:
+        return None, 'Offset must be >= 0'
+    if offset + limit > MAX_RESULT_WINDOW:
+        return None, f'offset + limit must not exceed {MAX_RESULT_WINDOW}, use cursor pagination for deeper pages'
+    if min_price is not None and max_price is not None and min_price > max_price:
+        return None, 'min_price must not be greater than max_price'
+    sort_by = args.get('sort_by') or None
+    if sort_by is not None and sort_by not in SORTABLE_FIELDS:
+        return None, f"sort_by must be one of {', '.join(SORTABLE_FIELDS)}"
+    order = str(args.get('order', 'asc')).lower()
+    if order not in ('asc', 'desc'):
+        return None, 'order must be asc or desc'
+    return {
+        'offset': offset,
+        'min_price': min_price,
+        'max_price': max_price,
+        'sort_by': sort_by,
+        'order': order
+    }, None
+
+
+def batch_query_spec(raw):
+    """Validate one /batch sub-query with the same rules as the single-query endpoints, returns (spec, error)"""
+    if not isinstance(raw, dict):
+        return None, 'Each query must be an object'
+    query_type = raw.get('type', 'fulltext')
+    if query_type not in ('fulltext', 'fuzzy', 'suggest'):
+        return None, 'type must be one of fulltext, fuzzy, suggest'
+    query = str(raw.get('q', raw.get('prefix', ''))).strip()
+    try:
+        limit = int(raw.get('limit', 10))
+        max_distance = int(raw.get('distance', 2))
+    except (TypeError, ValueError):
+        return None, 'limit and distance must be integers'
+
+    if query_type == 'suggest':
+        if limit < 1 or limit > 50:
+            return None, 'Limit must be between 1 and 50'
+        return {
+            'type': query_type,
+            'query': query,
+            'limit': limit,
+            'fuzzy': flag(raw.get('fuzzy')),
+            'with_scores': flag(raw.get('with_scores'))
+        }, None
+
+    if not query:
+        return None, 'Field "q" is required'
+    if limit < 1 or limit > 100:
+        return None, 'Limit must be between 1 and 100'
+    if query_type == 'fuzzy' and (max_distance < 1 or max_distance > 5):
+        return None, 'Distance must be between 1 and 5'
+    fields = raw.get('fields') or []
+    if isinstance(fields, str):
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+    error = unknown_fields_error(fields)
+    if error:
+        return None, error
+    options, error = search_options(raw, limit)
+    if error:
+        return None, error
+    return {
+        'type': query_type,
+        'query': query,
+        'limit': limit,
+        'max_distance': max_distance,
+        'fields': fields or None,
+        'ids_only': flag(raw.get('ids_only')),
+        'options': options
+    }, None
+
+
+BODY_NOT_OBJECT = 'Request body must be a JSON object'
+
+
+def json_body(raw):
+    """Parse a raw request body: {} when it is empty, None (which the readers reject) when it is not JSON"""
+    if not raw or not raw.strip():
+        return {}
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
+
+
+def _bounded_int(data, name: str, default: int, maximum: int):
+    value = data.get(name, default)
+    if not isinstance(value, int) or value < 1 or value > maximum:
+        return None, f'{name} must be an integer between 1 and {maximum}'
+    return value, None
+
+
+def index_params(data, flush_size: int):
+    """Read the /index/all and /index/rebuild body: ``clear_existing``, ``background``, ``flush_size`` and ``batch_size``"""
+    if not isinstance(data, dict):
+        return None, BODY_NOT_OBJECT
+    params = {'clear_existing': flag(data.get('clear_existing', True)), 'background': flag(data.get('background'))}
+    for name, default in (('flush_size', flush_size), ('batch_size', 1000)):
+        params[name], error = _bounded_int(data, name, default, 10000)
+        if error:
+            return None, error
+    return params, None
+
+
+def query_params(args, fuzzy: bool = False):
+    """Read the /fulltext and /fuzzy parameters, ``distance`` only when ``fuzzy`` and ``window`` only with ``cursor``"""
+    query = args.get('q', '').strip()
+    max_distance = args.get('distance', 2, type=int) if fuzzy else 2
+    limit = args.get('limit', 10, type=int)
+    if not query:
+        return None, 'Query parameter "q" is required'
+    if max_distance < 1 or max_distance > 5:
+        return None, 'Distance must be between 1 and 5'
+    if limit < 1 or limit > 100:
+        return None, 'Limit must be between 1 and 100'
+    fields, ids_only, error = projection_params(args)
+    if error:
+        return None, error
+    options, error = search_options(args, limit)
+    if error:
+        return None, error
+    cursor = flag(args.get('cursor'))
+    if cursor and options['offset']:
+        return None, 'offset cannot be combined with cursor pagination'
+    window = None
+    if cursor and args.get('window'):
+        window = args.get('window', type=int)
+        if window is None or window < limit or window > MAX_CURSOR_WINDOW:
+            return None, f'window must be an integer between limit and {MAX_CURSOR_WINDOW}'
+    return {
+        'query': query,
+        'limit': limit,
+        'max_distance': max_distance,
+        'fields': fields,
+        'ids_only': ids_only,
+        'options': options,
+        'cursor': cursor,
+        'window': window
+    }, None
+
+
+def facet_params(args):
+    """Read the /facets parameters"""
+    query = args.get('q', '').strip()
+    limit = args.get('limit', 10, type=int)
+    facet_size = args.get('facet_size', 10, type=int)
+    price_bucket = args.get('price_bucket', 50, type=float)
+    if not query:
+        return None, 'Query parameter "q" is required'
+    if limit < 0 or limit > 100:
+        return None, 'Limit must be between 0 and 100'
+    if facet_size < 1 or facet_size > 100:
+        return None, 'facet_size must be between 1 and 100'
+    if price_bucket <= 0:
+        return None, 'price_bucket must be greater than 0'
+    fields, ids_only, error = projection_params(args)
+    if error:
+        return None, error
+    options, error = search_options(args, limit)
+    if error:
+        return None, error
+    return {
+        'query': query,
+        'limit': limit,
+        'facet_size': facet_size,
+        'price_bucket': price_bucket,
+        'fields': fields,
+        'ids_only': ids_only,
+        'options': options
+    }, None
+
+
+def cursor_count(args):
+    """Read the ``count`` parameter of /cursor reads"""
+    count = args.get('count', 10, type=int)
+    if count < 1 or count > 100:
+        return None, 'Count must be between 1 and 100'
+    return count, None
+
+
+def suggest_params(args, autocomplete: bool = False):
+    """Read the /suggest parameters, /autocomplete requires a prefix and is always fuzzy without scores"""
+    prefix = args.get('prefix', '').strip()
+    limit = args.get('limit', 10, type=int)
+    if autocomplete and not prefix:
+        return None, 'Prefix parameter is required'
+    if limit < 1 or limit > 50:
+        return None, 'Limit must be between 1 and 50'
+    return {
+        'prefix': prefix,
+        'limit': limit,
+        'fuzzy': autocomplete or flag(args.get('fuzzy')),
+        'with_scores': not autocomplete and flag(args.get('with_scores'))
+    }, None
+
+
+def batch_specs(data):
+    """Read the /batch body into validated sub-query specs"""
+    if not isinstance(data, dict):
+        return None, BODY_NOT_OBJECT
+    queries = data.get('queries')
+    if not isinstance(queries, list) or not queries:
+        return None, 'Field "queries" must be a non-empty list'
+    if len(queries) > BATCH_MAX_QUERIES:
+        return None, f'At most {BATCH_MAX_QUERIES} queries per batch'
+    specs = []
+    for position, raw in enumerate(queries):
+        spec, error = batch_query_spec(raw)
+        if error:
+            return None, f'Query {position}: {error}'
+        specs.append(spec)
+    return specs, None
+
+
+def sync_params(data, workers: int, queue_size: int):
+    """Read the /sync/postgres body: ``batch_size``, ``clear_existing``, ``workers``, ``queue_size`` and ``background``"""
+    if not isinstance(data, dict):
+        return None, BODY_NOT_OBJECT
+    params = {'clear_existing': flag(data.get('clear_existing', True)), 'background': flag(data.get('background'))}
+    for name, default, maximum in (('batch_size', 100, 1000), ('workers', workers, 32), ('queue_size', queue_size, 100)):
+        params[name], error = _bounded_int(data, name, default, maximum)
+        if error:
+            return None, error
+    return params, None
+
+
+def sync_batch_size(data):
+    """Read the ``batch_size`` of /sync/incremental"""
+    if not isinstance(data, dict):
+        return None, BODY_NOT_OBJECT
+    return _bounded_int(data, 'batch_size', 100, 1000)
+
+
+def jobs_limit(args):
+    """Read the ``limit`` of /sync/jobs"""
+    limit = args.get('limit', 20, type=int)
+    if limit < 1 or limit > 100:
+        return None, 'limit must be an integer between 1 and 100'
+    return limit, None
+
+
+def status_params(args):
+    """Read the ``max_staleness`` and ``exact`` parameters of /sync/status"""
+    return args.get('max_staleness', type=float), flag(args.get('exact'))
@@ -1,5 +1,7 @@
 from flask import Blueprint, request, jsonify
 import logging
+import psycopg2
+import psycopg2.pool
 from src.services import postgres_service
 
 postgres_bp = Blueprint('postgres', __name__)
@@ -8,13 +10,12 @@ postgres_bp = Blueprint('postgres', __name__)
 @postgres_bp.route('/info', methods=['GET'])
 def get_postgres_info():
     try:
-        if not postgres_service.test_connection():
-            return jsonify({
-                'error': 'PostgreSQL connection failed',
-                'connected': False
-            }), 500
-        
-        info = postgres_service.get_table_info()
+        exact = request.args.get('exact', 'false').lower() == 'true'
+        info = postgres_service.get_table_info(exact)
+        info['pool'] = postgres_service.get_pool_stats()
+        if 'error' in info:
+            info['connected'] = False
+            return jsonify(info), 500
         return jsonify(info), 200
         
     except Exception as e:
@@ -27,6 +28,7 @@ def get_postgres_products():
     try:
         limit = request.args.get('limit', 10, type=int)
         offset = request.args.get('offset', 0, type=int)
+        exact = request.args.get('exact', 'false').lower() == 'true'
         
         if limit < 1 or limit > 100:
             return jsonify({'error': 'Limit must be between 1 and 100'}), 400
@@ -34,18 +36,20 @@ def get_postgres_products():
         if offset < 0:
             return jsonify({'error': 'Offset must be >= 0'}), 400
         
-        if not postgres_service.test_connection():
+        try:
+            products = postgres_service.fetch_products(limit, offset)
+            total_count = postgres_service.get_products_count(exact)
+        except (psycopg2.OperationalError, psycopg2.pool.PoolError) as e:
+            logging.error(f"PostgreSQL unavailable: {e}")
             return jsonify({
                 'error': 'PostgreSQL connection failed',
                 'connected': False
             }), 500
         
-        products = postgres_service.fetch_products(limit, offset)
-        total_count = postgres_service.get_products_count()
-        
         return jsonify({
             'products': products,
             'total_count': total_count,
+            'total_count_exact': exact,
             'returned_count': len(products),
             'limit': limit,
             'offset': offset
@@ -54,3 +58,13 @@ def get_postgres_products():
     except Exception as e:
         logging.error(f"Error getting PostgreSQL products: {e}")
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@postgres_bp.route('/pool', methods=['GET'])
+def get_postgres_pool():
+    try:
+        return jsonify(postgres_service.get_pool_stats()), 200
+        
+    except Exception as e:
+        logging.error(f"Error getting PostgreSQL pool stats: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
@@ -0,0 +1,170 @@
+"""Response bodies shared by the WSGI and ASGI routes, each returns (body, status) for ``jsonify``"""
+
+REDISEARCH_UNAVAILABLE = {
+    'success': False,
+    'error': 'RediSearch module not available. Please install Redis Stack.'
+}
+
+
+def result_response(result, status: int = 200):
+    """A service result as is, 500 when it reports an error"""
+    return result, 500 if 'error' in result else status
+
+
+def job_submitted(job):
+    if 'error' in job:
+        return {'success': False, **job}, 409 if job.get('conflict') else 500
+    return {'success': True, 'job': job}, 202
+
+
+def index_response(stats):
+    if 'error' in stats:
+        return {
+            'success': False,
+            'error': stats['error']
+        }, 500
+    if stats['total_products'] == 0:
+        return {
+            'success': False,
+            'error': 'No products found in PostgreSQL database'
+        }, 404
+    return {
+        'success': True,
+        'message': f'Successfully indexed {stats["successfully_indexed"]} products using RediSearch',
+        'stats': stats
+    }, 200
+
+
+def rebuild_response(stats):
+    if 'error' in stats:
+        return {
+            'success': False,
+            'error': stats['error'],
+            'stats': stats
+        }, 500
+    return {
+        'success': True,
+        'message': f'Rebuilt index version {stats["version"]} with {stats["successfully_indexed"]} products and made it live',
+        'stats': stats
+    }, 200
+
+
+def _fuzzy_fields(params, found, fuzzy: bool):
+    if not fuzzy:
+        return {}
+    return {'max_distance': params['max_distance'], 'did_you_mean': found['did_you_mean']}
+
+
+def query_response(params, found, fuzzy: bool = False):
+    """Body of /fulltext (``found`` is the result list) and /fuzzy (``found`` is the corrected search)"""
+    results = found['results'] if fuzzy else found
+    return {
+        'query': params['query'],
+        **_fuzzy_fields(params, found, fuzzy),
+        'results_count': len(results),
+        'results': results
+    }, 200
+
+
+def opened_cursor_response(params, page, fuzzy: bool = False):
+    """Body of /fulltext and /fuzzy with ``cursor=true``: the first page and the cursor to read on"""
+    if 'error' in page:
+        return page, 500
+    return {
+        'query': params['query'],
+        **_fuzzy_fields(params, page, fuzzy),
+        'results_count': len(page['results']),
+        'results': page['results'],
+        'total': page['total'],
+        'window': page.get('window', 0),
+        'cursor': page['cursor']
+    }, 200
+
+
+def facets_response(params, result):
+    if 'error' in result:
+        return result, 500
+    return {
+        'query': params['query'],
+        'results_count': len(result['results']),
+        'results': result['results'],
+        'total': result['total'],
+        'facets': result['facets'],
+        'cached': result['cached']
+    }, 200
+
+
+def cursor_page_response(page):
+    if 'error' in page:
+        if 'cursor not found' in page['error'].lower():
+            return {'error': 'Cursor not found or expired'}, 404
+        return page, 500
+    return {
+        'results_count': len(page['results']),
+        'results': page['results'],
+        'cursor': page['cursor']
+    }, 200
+
+
+def suggestions_response(params, suggestions):
+    return {
+        'prefix': params['prefix'],
+        'fuzzy_enabled': params['fuzzy'],
+        'suggestions_count': len(suggestions),
+        'suggestions': suggestions
+    }, 200
+
+
+def completions_response(params, completions):
+    return {
+        'prefix': params['prefix'],
+        'completions_count': len(completions),
+        'completions': completions
+    }, 200
+
+
+def sync_response(result):
+    if result['success']:
+        return {
+            'success': True,
+            'message': f"Successfully synced {result['indexed_products']} products from PostgreSQL",
+            'stats': result
+        }, 200
+    return {
+        'success': False,
+        'message': 'Sync completed with errors',
+        'stats': result
+    }, 500
+
+
+def incremental_response(result):
+    if result['success']:
+        return {
+            'success': True,
+            'message': f"Synced {result['indexed_products']} changed products from PostgreSQL" if result['changed'] else 'No changes since last sync',
+            'stats': result
+        }, 200
+    return {
+        'success': False,
+        'message': 'Incremental sync completed with errors',
+        'stats': result
+    }, 500
+
+
+def product_sync_response(result):
+    return result, 200 if result['success'] else 404
+
+
+def job_response(job_id, job):
+    if job is None:
+        return {'error': f'Job {job_id} not found'}, 404
+    return job, 200
+
+
+def job_action_response(job_id, job):
+    """A cancel or resume by id, 409 when the job refused it"""
+    if job is None:
+        return {'error': f'Job {job_id} not found'}, 404
+    if 'error' in job:
+        return job, 409
+    return job, 202
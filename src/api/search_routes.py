@@ -3,76 +3,82 @@ import logging
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
-from src.core import RediSearchService
+from src.core import redisearch_service
+from src.api.params import index_params, query_params, facet_params, cursor_count, suggest_params, batch_specs, json_body
+from src.api import responses
 
 search_bp = Blueprint('search', __name__)
-redisearch_service = RediSearchService()
+
+
+def _reply(body, status):
+    return jsonify(body), status
 
 
 @search_bp.route('/index/all', methods=['POST'])
 def index_all_documents():
     try:
-        from src.services.postgres_service import postgres_service
-        
         if not redisearch_service.test_redisearch_availability():
-            return jsonify({
-                'success': False,
-                'error': 'RediSearch module not available. Please install Redis Stack.'
-            }), 500
-        
-        clear_existing = request.json.get('clear_existing', True) if request.is_json else True
-        
-        if clear_existing:
-            redisearch_service.clear_all_data()
-            logging.info("Cleared existing search data and RediSearch index")
-        
-        postgres_products = postgres_service.fetch_products()
-        
-        if not postgres_products:
-            return jsonify({
-                'success': False,
-                'error': 'No products found in PostgreSQL database'
-            }), 404
-        
-        stats = redisearch_service.bulk_index_from_postgres(postgres_products)
-        
-        if 'error' in stats:
-            return jsonify({
-                'success': False,
-                'error': stats['error']
-            }), 500
-        
-        return jsonify({
-            'success': True,
-            'message': f'Successfully indexed {stats["successfully_indexed"]} products using RediSearch',
-            'stats': stats
-        }), 200
-        
+            return _reply(responses.REDISEARCH_UNAVAILABLE, 500)
+
+        params, error = index_params(json_body(request.get_data()), redisearch_service.bulk_flush_size)
+        if error:
+            return jsonify({'error': error}), 400
+
+        if params['background']:
+            job = redisearch_service.submit_index_job(params['clear_existing'], params['batch_size'], params['flush_size'])
+            return _reply(*responses.job_submitted(job))
+
+        stats = redisearch_service.index_from_postgres(params['clear_existing'], params['batch_size'], params['flush_size'])
+        return _reply(*responses.index_response(stats))
+
     except Exception as e:
         logging.error(f"Error in index_all_documents: {e}")
         return jsonify({'success': False, 'error': f'Internal server error: {str(e)}'}), 500
 
 
+@search_bp.route('/index/rebuild', methods=['POST'])
+def rebuild_index():
+    try:
+        if not redisearch_service.test_redisearch_availability():
+            return _reply(responses.REDISEARCH_UNAVAILABLE, 500)
+
+        params, error = index_params(json_body(request.get_data()), redisearch_service.bulk_flush_size)
+        if error:
+            return jsonify({'error': error}), 400
+
+        stats = redisearch_service.rebuild_from_postgres(params['batch_size'], params['flush_size'])
+        return _reply(*responses.rebuild_response(stats))
+
+    except Exception as e:
+        logging.error(f"Error in rebuild_index: {e}")
+        return jsonify({'success': False, 'error': f'Internal server error: {str(e)}'}), 500
+
+
+@search_bp.route('/index/versions', methods=['GET'])
+def index_versions():
+    try:
+        return jsonify(redisearch_service.versions.get_status()), 200
+
+    except Exception as e:
+        logging.error(f"Error in index_versions: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
 @search_bp.route('/fulltext', methods=['GET'])
 def full_text_search():
     try:
-        query = request.args.get('q', '').strip()
-        limit = request.args.get('limit', 10, type=int)
-        
-        if not query:
-            return jsonify({'error': 'Query parameter "q" is required'}), 400
-        
-        if limit < 1 or limit > 100:
-            return jsonify({'error': 'Limit must be between 1 and 100'}), 400
-        
-        results = redisearch_service.full_text_search(query, limit)
-        
-        return jsonify({
-            'query': query,
-            'results_count': len(results),
-            'results': results
-        }), 200
-        
+        params, error = query_params(request.args)
+        if error:
+            return jsonify({'error': error}), 400
+
+        if params['cursor']:
+            page = redisearch_service.open_cursor('fulltext', params['query'], params['limit'], 2,
+                                                  params['fields'], params['ids_only'], params['options'], params['window'])
+            return _reply(*responses.opened_cursor_response(params, page))
+
+        results = redisearch_service.full_text_search(params['query'], params['limit'], params['fields'], params['ids_only'], params['options'])
+        return _reply(*responses.query_response(params, results))
+
     except Exception as e:
         logging.error(f"Error in full_text_search: {e}")
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
@@ -81,53 +87,64 @@ def full_text_search():
 @search_bp.route('/fuzzy', methods=['GET'])
 def fuzzy_search():
     try:
-        query = request.args.get('q', '').strip()
-        max_distance = request.args.get('distance', 2, type=int)
-        limit = request.args.get('limit', 10, type=int)
-        
-        if not query:
-            return jsonify({'error': 'Query parameter "q" is required'}), 400
-        
-        if max_distance < 1 or max_distance > 5:
-            return jsonify({'error': 'Distance must be between 1 and 5'}), 400
-            
-        if limit < 1 or limit > 100:
-            return jsonify({'error': 'Limit must be between 1 and 100'}), 400
-        
-        results = redisearch_service.fuzzy_search(query, max_distance, limit)
-        
-        return jsonify({
-            'query': query,
-            'max_distance': max_distance,
-            'results_count': len(results),
-            'results': results
-        }), 200
-        
+        params, error = query_params(request.args, fuzzy=True)
+        if error:
+            return jsonify({'error': error}), 400
+
+        if params['cursor']:
+            page = redisearch_service.open_cursor('fuzzy', params['query'], params['limit'], params['max_distance'],
+                                                  params['fields'], params['ids_only'], params['options'], params['window'])
+            return _reply(*responses.opened_cursor_response(params, page, fuzzy=True))
+
+        found = redisearch_service.corrected_fuzzy_search(params['query'], params['max_distance'], params['limit'],
+                                                          params['fields'], params['ids_only'], params['options'])
+        return _reply(*responses.query_response(params, found, fuzzy=True))
+
     except Exception as e:
         logging.error(f"Error in fuzzy_search: {e}")
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 
+@search_bp.route('/facets', methods=['GET'])
+def faceted_search():
+    try:
+        params, error = facet_params(request.args)
+        if error:
+            return jsonify({'error': error}), 400
+
+        result = redisearch_service.faceted_search(params['query'], params['limit'], params['facet_size'], params['price_bucket'],
+                                                   params['fields'], params['ids_only'], params['options'])
+        return _reply(*responses.facets_response(params, result))
+
+    except Exception as e:
+        logging.error(f"Error in faceted_search: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@search_bp.route('/cursor/<cursor_id>', methods=['GET'])
+def read_search_cursor(cursor_id):
+    try:
+        count, error = cursor_count(request.args)
+        if error:
+            return jsonify({'error': error}), 400
+
+        return _reply(*responses.cursor_page_response(redisearch_service.read_cursor(cursor_id, count)))
+
+    except Exception as e:
+        logging.error(f"Error in read_search_cursor: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
 @search_bp.route('/suggest', methods=['GET'])
 def get_suggestions():
     try:
-        prefix = request.args.get('prefix', '').strip()
-        limit = request.args.get('limit', 10, type=int)
-        fuzzy = request.args.get('fuzzy', 'false').lower() == 'true'
-        with_scores = request.args.get('with_scores', 'false').lower() == 'true'
-        
-        if limit < 1 or limit > 50:
-            return jsonify({'error': 'Limit must be between 1 and 50'}), 400
-        
-        suggestions = redisearch_service.get_suggestions(prefix, limit, fuzzy, with_scores)
-        
-        return jsonify({
-            'prefix': prefix,
-            'fuzzy_enabled': fuzzy,
-            'suggestions_count': len(suggestions),
-            'suggestions': suggestions
-        }), 200
-        
+        params, error = suggest_params(request.args)
+        if error:
+            return jsonify({'error': error}), 400
+
+        suggestions = redisearch_service.get_suggestions(params['prefix'], params['limit'], params['fuzzy'], params['with_scores'])
+        return _reply(*responses.suggestions_response(params, suggestions))
+
     except Exception as e:
         logging.error(f"Error in get_suggestions: {e}")
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
@@ -136,23 +153,37 @@ def get_suggestions():
 @search_bp.route('/autocomplete', methods=['GET'])
 def autocomplete():
     try:
-        prefix = request.args.get('prefix', '').strip()
-        limit = request.args.get('limit', 10, type=int)
-        
-        if not prefix:
-            return jsonify({'error': 'Prefix parameter is required'}), 400
-        
-        if limit < 1 or limit > 50:
-            return jsonify({'error': 'Limit must be between 1 and 50'}), 400
-        
-        completions = redisearch_service.get_suggestions(prefix, limit, fuzzy=True, with_scores=False)
-        
-        return jsonify({
-            'prefix': prefix,
-            'completions_count': len(completions),
-            'completions': completions
-        }), 200
-        
+        params, error = suggest_params(request.args, autocomplete=True)
+        if error:
+            return jsonify({'error': error}), 400
+
+        completions = redisearch_service.get_suggestions(params['prefix'], params['limit'], params['fuzzy'], params['with_scores'])
+        return _reply(*responses.completions_response(params, completions))
+
     except Exception as e:
         logging.error(f"Error in autocomplete: {e}")
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@search_bp.route('/batch', methods=['POST'])
+def batch_search():
+    try:
+        specs, error = batch_specs(json_body(request.get_data()))
+        if error:
+            return jsonify({'error': error}), 400
+
+        return _reply(*responses.result_response(redisearch_service.batch_search(specs)))
+
+    except Exception as e:
+        logging.error(f"Error in batch_search: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@search_bp.route('/metrics', methods=['GET'])
+def search_metrics():
+    try:
+        return jsonify(redisearch_service.get_search_metrics()), 200
+
+    except Exception as e:
+        logging.error(f"Error in search_metrics: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
@@ -1,58 +1,65 @@
 from flask import Blueprint, request, jsonify
 import logging
-from src.services import data_sync_service, postgres_service
+from src.services import data_sync_service, job_service
+from src.api.params import sync_params, sync_batch_size, jobs_limit, status_params, json_body
+from src.api import responses
 sync_bp = Blueprint('sync', __name__)
 
 
+def _reply(body, status):
+    return jsonify(body), status
+
+
 @sync_bp.route('/postgres', methods=['POST'])
 def sync_from_postgres():
     try:
-        data = request.get_json() or {}
-        batch_size = data.get('batch_size', 100)
-        clear_existing = data.get('clear_existing', True)
-        
-        if not isinstance(batch_size, int) or batch_size < 1 or batch_size > 1000:
-            return jsonify({'error': 'batch_size must be an integer between 1 and 1000'}), 400
-        
-        if not postgres_service.test_connection():
-            return jsonify({
-                'success': False,
-                'error': 'PostgreSQL connection failed. Please check your database configuration.'
-            }), 500
-        
-        result = data_sync_service.sync_all_products(batch_size, clear_existing)
-        
-        if result['success']:
-            return jsonify({
-                'success': True,
-                'message': f"Successfully synced {result['indexed_products']} products from PostgreSQL",
-                'stats': result
-            }), 200
-        else:
-            return jsonify({
-                'success': False,
-                'message': 'Sync completed with errors',
-                'stats': result
-            }), 500
-            
+        params, error = sync_params(json_body(request.get_data()), data_sync_service.workers, data_sync_service.queue_size)
+        if error:
+            return jsonify({'error': error}), 400
+
+        args = (params['batch_size'], params['clear_existing'], params['workers'], params['queue_size'])
+        if params['background']:
+            return _reply(*responses.job_submitted(data_sync_service.submit_sync_job(*args)))
+
+        return _reply(*responses.sync_response(data_sync_service.sync_all_products(*args)))
+
     except Exception as e:
         logging.error(f"Error in sync_from_postgres: {e}")
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 
+@sync_bp.route('/incremental', methods=['POST'])
+def sync_incremental():
+    try:
+        batch_size, error = sync_batch_size(json_body(request.get_data()))
+        if error:
+            return jsonify({'error': error}), 400
+
+        return _reply(*responses.incremental_response(data_sync_service.sync_incremental(batch_size)))
+
+    except Exception as e:
+        logging.error(f"Error in sync_incremental: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@sync_bp.route('/changes', methods=['GET'])
+def get_pending_changes():
+    try:
+        return _reply(*responses.result_response(data_sync_service.get_pending_changes()))
+
+    except Exception as e:
+        logging.error(f"Error checking pending changes: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
 @sync_bp.route('/postgres/<product_id>', methods=['POST'])
 def sync_single_product(product_id):
     try:
         if not product_id:
             return jsonify({'error': 'Product ID is required'}), 400
-        
-        result = data_sync_service.sync_single_product(product_id)
-        
-        if result['success']:
-            return jsonify(result), 200
-        else:
-            return jsonify(result), 404
-            
+
+        return _reply(*responses.product_sync_response(data_sync_service.sync_single_product(product_id)))
+
     except Exception as e:
         logging.error(f"Error syncing single product: {e}")
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
@@ -61,9 +68,51 @@ def sync_single_product(product_id):
 @sync_bp.route('/status', methods=['GET'])
 def get_sync_status():
     try:
-        status = data_sync_service.get_sync_status()
-        return jsonify(status), 200
-        
+        return jsonify(data_sync_service.get_sync_status(*status_params(request.args))), 200
+
     except Exception as e:
         logging.error(f"Error getting sync status: {e}")
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@sync_bp.route('/jobs', methods=['GET'])
+def list_jobs():
+    try:
+        limit, error = jobs_limit(request.args)
+        if error:
+            return jsonify({'error': error}), 400
+        return jsonify({'jobs': job_service.list_jobs(limit)}), 200
+
+    except Exception as e:
+        logging.error(f"Error listing jobs: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@sync_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    try:
+        return _reply(*responses.job_response(job_id, job_service.get_job(job_id)))
+
+    except Exception as e:
+        logging.error(f"Error getting job {job_id}: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@sync_bp.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    try:
+        return _reply(*responses.job_action_response(job_id, job_service.cancel(job_id)))
+
+    except Exception as e:
+        logging.error(f"Error cancelling job {job_id}: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@sync_bp.route('/jobs/<job_id>/resume', methods=['POST'])
+def resume_job(job_id):
+    try:
+        return _reply(*responses.job_action_response(job_id, job_service.resume(job_id)))
+
+    except Exception as e:
+        logging.error(f"Error resuming job {job_id}: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
@@ -1,2 +1,3 @@
-from .redisearch_service import RediSearchService
-__all__ = ["RediSearchService"]
\ No newline at end of file
+from .redisearch_service import RediSearchService, redisearch_service
+from .async_redisearch_service import AsyncRediSearchService, async_redisearch_service
+__all__ = ["RediSearchService", "redisearch_service", "AsyncRediSearchService", "async_redisearch_service"]
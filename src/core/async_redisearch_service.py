@@ -0,0 +1,279 @@
+import asyncio
+import logging
+import time
+from typing import List, Dict
+from config import redis_config
+from src.core.redisearch_service import RediSearchService, redisearch_service
+from src.services.suggestion_service import PREFIX_TABLE_META
+
+
+class AsyncRediSearchService:
+    """Asyncio interface over RediSearchService for the ASGI app
+
+    Query planning, caching and parsing are reused from SearchService and
+    SuggestionService; the Redis round trips, including the query cache and
+    index generation reads, go through ``redis.asyncio`` clients, so an in-flight
+    search holds no thread while it waits on Redis. Rare blocking steps such as
+    recreating a missing index run in a worker thread.
+    """
+
+    def __init__(self, service: RediSearchService = None):
+        self.service = service or redisearch_service
+        self._read_client = None
+        self._write_client = None
+
+    @property
+    def read_client(self):
+        if self._read_client is None:
+            self._read_client = redis_config.get_async_connection('read')
+        return self._read_client
+
+    @property
+    def write_client(self):
+        """Client of the query cache and generation counters, the connection their sync reads use"""
+        if self._write_client is None:
+            self._write_client = redis_config.get_async_connection('write')
+        return self._write_client
+
+    async def _cached_results(self, plan: Dict):
+        """Async SearchService.cached_results, keeps the generation checked on the plan"""
+        if not plan['cache_key']:
+            return None
+        cached, plan['generation'] = await self.service.search_service.cache.lookup_async(plan['cache_key'], self.write_client)
+        return cached
+
+    async def _store_results(self, plan: Dict, results: List, failures: int):
+        search_service = self.service.search_service
+        if search_service.cacheable(plan, results, failures):
+            await search_service.cache.set_async(plan['cache_key'], results, plan['generation'], self.write_client)
+
+    async def _run_plan(self, plan: Dict) -> List[Dict]:
+        search_service = self.service.search_service
+        if plan is None:
+            return []
+        cached = await self._cached_results(plan)
+        if cached is not None:
+            return cached
+        responses = await self._execute(plan)
+        if search_service.is_missing_index_reply(responses):
+            await asyncio.to_thread(search_service.recover_missing_index)
+            responses = await self._execute(plan)
+        results, failures = search_service.resolve_plan(plan, responses, store=False)
+        await self._store_results(plan, results, failures)
+        return results
+
+    async def _execute(self, plan: Dict) -> List:
+        pipe = self.read_client.pipeline(transaction=False)
+        self.service.search_service.queue_plan(pipe, plan)
+        return await pipe.execute(raise_on_error=False)
+
+    async def full_text_search(self, query: str, limit: int = 10, fields: List[str] = None, ids_only: bool = False, options: Dict = None) -> List[Dict]:
+        try:
+            return await self._run_plan(self.service.search_service.plan_full_text(query, limit, fields, ids_only, options))
+        except Exception as e:
+            logging.error(f"Error in RediSearch full text search: {e}")
+            return []
+
+    async def fuzzy_search(self, query: str, max_distance: int = 2, limit: int = 10, fields: List[str] = None, ids_only: bool = False, options: Dict = None) -> List[Dict]:
+        return (await self.corrected_fuzzy_search(query, max_distance, limit, fields, ids_only, options))['results']
+
+    async def corrected_fuzzy_search(self, query: str, max_distance: int = 2, limit: int = 10, fields: List[str] = None, ids_only: bool = False, options: Dict = None) -> Dict:
+        """Same contract as SearchService.corrected_fuzzy_search"""
+        try:
+            correction = await self.correct_query(query, max_distance)
+            results = await self._run_plan(self.service.search_service.plan_fuzzy(query, max_distance, limit, fields, ids_only, options, correction))
+            return {'results': results, 'did_you_mean': correction['did_you_mean'] if correction else None}
+        except Exception as e:
+            logging.error(f"Error in RediSearch fuzzy search: {e}")
+            return {'results': [], 'did_you_mean': None}
+
+    async def correct_query(self, query: str, max_distance: int = 2):
+        """Same contract as SearchService.correct_query"""
+        search_service = self.service.search_service
+        if not search_service.spellcheck_enabled:
+            return None
+        query_words = search_service.text_processor.extract_words(query.lower())
+        if not query_words:
+            return None
+        cache_key = search_service.correction_cache_key(query_words, max_distance)
+        if cache_key:
+            cached, generation = await search_service.cache.lookup_async(cache_key, self.write_client)
+            if cached is not None:
+                return cached
+        try:
+            reply = await self.read_client.execute_command(*search_service.spellcheck_command(query_words, max_distance))
+        except Exception as e:
+            logging.warning(f"Spellcheck of '{query}' failed, using fuzzy expansion: {e}")
+            return None
+        correction = search_service.parse_spellcheck(query_words, reply)
+        if cache_key:
+            await search_service.cache.set_async(cache_key, correction, generation, self.write_client)
+        return correction
+
+    async def faceted_search(self, query: str, limit: int = 10, facet_size: int = 10, price_bucket: float = 50.0,
+                             fields: List[str] = None, ids_only: bool = False, options: Dict = None) -> Dict:
+        facet_service = self.service.facet_service
+        try:
+            plan = facet_service.plan(query, limit, facet_size, price_bucket, fields, ids_only, options)
+            if plan is None:
+                return facet_service.empty_response()
+            if plan['cache_key']:
+                cached, plan['generation'] = await facet_service.cache.lookup_async(plan['cache_key'], self.write_client)
+                if cached is not None:
+                    return dict(cached, cached=True)
+            responses = await self._execute_facets(plan)
+            if self.service.search_service.is_missing_index_reply(responses):
+                await asyncio.to_thread(self.service.search_service.recover_missing_index)
+                responses = await self._execute_facets(plan)
+            response, failures = facet_service.evaluate(plan, responses)
+            if plan['cache_key'] and not failures:
+                await facet_service.cache.set_async(plan['cache_key'], response, plan['generation'], self.write_client)
+            return dict(response, cached=False)
+        except Exception as e:
+            logging.error(f"Error in faceted search: {e}")
+            return {'error': str(e)}
+
+    async def _execute_facets(self, plan: Dict) -> List:
+        pipe = self.read_client.pipeline(transaction=False)
+        self.service.facet_service.queue(pipe, plan)
+        return await pipe.execute(raise_on_error=False)
+
+    async def open_cursor(self, kind: str, query: str, page_size: int = 10, max_distance: int = 2, fields: List[str] = None, ids_only: bool = False,
+                          options: Dict = None, window: int = None) -> Dict:
+        """Same contract as RediSearchService.open_cursor"""
+        search_service = self.service.search_service
+        try:
+            correction = await self.correct_query(query, max_distance) if kind == 'fuzzy' else None
+            plan = search_service.plan_query(kind, query, page_size, max_distance, fields, ids_only, options, correction)
+            page = await self._open_cursor(plan, window)
+            if kind == 'fuzzy':
+                page['did_you_mean'] = correction['did_you_mean'] if correction else None
+            return page
+        except Exception as e:
+            logging.error(f"Error opening search cursor: {e}")
+            return {'error': str(e)}
+
+    async def _open_cursor(self, plan: Dict, window: int = None) -> Dict:
+        search_service = self.service.search_service
+        if plan is None:
+            return {'results': [], 'cursor': None, 'total': 0}
+        unsupported = search_service.cursor_unsupported(plan)
+        if unsupported:
+            return {'error': unsupported}
+        responses = await self._execute_counts(plan)
+        if search_service.is_missing_index_reply(responses):
+            await asyncio.to_thread(search_service.recover_missing_index)
+            responses = await self._execute_counts(plan)
+        search_query, total = search_service.pick_variant(plan, responses)
+        if search_query is None:
+            return {'results': [], 'cursor': None, 'total': 0}
+        command, window = search_service.aggregate_command(plan, search_query, total, window)
+        page = search_service.parse_cursor_reply(await self.read_client.execute_command(*command))
+        page['total'] = total
+        page['window'] = window
+        return page
+
+    async def _execute_counts(self, plan: Dict) -> List:
+        pipe = self.read_client.pipeline(transaction=False)
+        self.service.search_service.queue_count_plan(pipe, plan)
+        return await pipe.execute(raise_on_error=False)
+
+    async def read_cursor(self, cursor_id: str, count: int = 10) -> Dict:
+        search_service = self.service.search_service
+        try:
+            reply = await self.read_client.execute_command(*search_service.cursor_read_command(cursor_id, count))
+            return search_service.parse_cursor_reply(reply)
+        except Exception as e:
+            logging.error(f"Error reading search cursor {cursor_id}: {e}")
+            return {'error': str(e)}
+
+    async def get_suggestions(self, prefix: str, limit: int = 10, fuzzy: bool = False, with_scores: bool = False) -> List:
+        suggestion_service = self.service.suggestion_service
+        try:
+            local = self.service.local_suggestions(prefix, limit, fuzzy, with_scores, await self._autocomplete_generation())
+            if local is not None:
+                return local
+            field = suggestion_service.prefix_table_field(prefix, limit)
+            if field is not None:
+                reply = await self.read_client.hmget(suggestion_service.prefixes_key, field, PREFIX_TABLE_META)
+                served = suggestion_service.parse_prefix_entry(reply, limit, fuzzy, with_scores)
+                if served is not None:
+                    return served
+            result = await self.read_client.execute_command(*suggestion_service.suggestion_command(prefix, limit, fuzzy, with_scores))
+            return suggestion_service.parse_suggestions(result, with_scores)
+        except Exception as e:
+            logging.error(f"Error getting suggestions for '{prefix}': {e}")
+            return []
+
+    async def _autocomplete_generation(self):
+        """Generation the in-process autocomplete engine checks, None when it is disabled"""
+        autocomplete = self.service.autocomplete
+        if autocomplete is None:
+            return None
+        return await autocomplete.generation.current_async(self.write_client)
+
+    async def _lookup_batch(self, entries: List[Dict]):
+        """Async counterpart of the cache and autocomplete lookups in RediSearchService.plan_batch"""
+        for entry in entries:
+            lookup_started = time.perf_counter()
+            spec = entry['spec']
+            if entry['plan'] is not None:
+                entry['results'] = await self._cached_results(entry['plan'])
+                entry['cached'] = entry['results'] is not None
+            elif spec['type'] == 'suggest':
+                entry['results'] = self.service.local_suggestions(
+                    spec['query'], spec['limit'], spec.get('fuzzy', False), spec.get('with_scores', False),
+                    await self._autocomplete_generation()
+                )
+            entry['elapsed'] += time.perf_counter() - lookup_started
+
+    async def batch_search(self, queries: List[Dict]) -> Dict:
+        """Same contract as RediSearchService.batch_search"""
+        try:
+            started = time.perf_counter()
+            entries = self.service.plan_batch_entries(queries)
+            await self._lookup_batch(entries)
+            pipe = self.read_client.pipeline(transaction=False)
+            commands = self.service.queue_batch(entries, pipe)
+
+            round_trips = 0
+            redis_seconds = 0.0
+            responses = []
+            if commands:
+                redis_started = time.perf_counter()
+                responses = await pipe.execute(raise_on_error=False)
+                round_trips = 1
+                if self.service.batch_index_missing(entries, responses):
+                    await asyncio.to_thread(self.service.search_service.recover_missing_index)
+                    pipe = self.read_client.pipeline(transaction=False)
+                    self.service.queue_batch(entries, pipe)
+                    responses = await pipe.execute(raise_on_error=False)
+                    round_trips += 1
+                redis_seconds = time.perf_counter() - redis_started
+
+            response = self.service.resolve_batch(entries, responses, commands, round_trips, redis_seconds, started, store=False)
+            for entry in entries:
+                if 'failures' in entry:
+                    await self._store_results(entry['plan'], entry['found'], entry['failures'])
+            return response
+        except Exception as e:
+            logging.error(f"Error in batch search: {e}")
+            return {'error': str(e)}
+
+    async def get_search_metrics(self) -> Dict:
+        """Same contract as RediSearchService.get_search_metrics, reading the cache generation asynchronously"""
+        generation = await self.service.query_cache.generation.current_async(self.write_client)
+        return self.service.get_search_metrics(generation)
+
+    async def get_stats(self) -> Dict:
+        """Suggestion and document counts in one round trip, without scanning the keyspace"""
+        try:
+            pipe = self.read_client.pipeline(transaction=False)
+            self.service.queue_stats(pipe)
+            return self.service.parse_stats(*await pipe.execute(raise_on_error=False))
+        except Exception as e:
+            logging.error(f"Error getting stats: {e}")
+            return {'error': str(e)}
+
+
+async_redisearch_service = AsyncRediSearchService()
@@ -1,20 +1,65 @@
 import logging
-from typing import List, Dict
+import os
+import time
+from itertools import chain, islice
+from typing import List, Dict, Iterable
 from config import redis_config
-from src.services import SuggestionService, DocumentIndexService, SearchService
+from src.services import SuggestionService, DocumentIndexService, SearchService, IndexVersionService, IndexGeneration, SyncGeneration, QueryCache, IndexManager, FacetService, AutocompleteEngine
+from src.services.suggestion_service import suggestion_keys_for
+from src.services.index_generation import SUGGESTIONS_GENERATION_KEY
+from src.services.document_index_service import FINGERPRINT_FIELD
+from src.services.job_service import job_service, JobContext, INDEX_LOCK
 
 
 class RediSearchService:
     def __init__(self):
         self.redis_client = redis_config.get_connection()
+        self.read_client = redis_config.get_read_connection()
         self.suggestions_key = "suggestions"
         self.index_name = "product_index"
         self.documents_key = "search:documents"
         self.inverted_index_key = "search:inverted_index"
+        self.bulk_flush_size = int(os.getenv('BULK_FLUSH_SIZE', 500))
         
-        self.suggestion_service = SuggestionService(self.redis_client, self.suggestions_key)
-        self.document_service = DocumentIndexService(self.redis_client, self.documents_key, self.inverted_index_key)
-        self.search_service = SearchService(self.redis_client, self.index_name, self.documents_key, self.inverted_index_key)
+        self.versions = IndexVersionService(self.redis_client, self.index_name, self.documents_key, self.suggestions_key)
+        live_documents_key = self.versions.documents_key_for(self.versions.live_version())
+        
+        self.generation = IndexGeneration(self.redis_client, check_interval=float(os.getenv('INDEX_GENERATION_CHECK_INTERVAL', 1.0)))
+        self.suggestion_generation = IndexGeneration(self.redis_client, SUGGESTIONS_GENERATION_KEY,
+                                                     check_interval=float(os.getenv('INDEX_GENERATION_CHECK_INTERVAL', 1.0)))
+        self.query_cache = QueryCache(
+            self.generation,
+            self.redis_client,
+            max_entries=int(os.getenv('SEARCH_CACHE_SIZE', 2048)),
+            ttl=float(os.getenv('SEARCH_CACHE_TTL', 60)),
+            use_redis=os.getenv('SEARCH_CACHE_REDIS', 'false').lower() == 'true',
+            redis_ttl=int(os.getenv('SEARCH_CACHE_REDIS_TTL', 300))
+        )
+        
+        self.sync_generation = SyncGeneration(
+            self.redis_client,
+            chunk_size=int(os.getenv('SYNC_SWEEP_CHUNK_SIZE', 500)),
+            throttle_seconds=float(os.getenv('SYNC_SWEEP_THROTTLE_MS', 10)) / 1000,
+            max_ratio=float(os.getenv('SYNC_SWEEP_MAX_RATIO', 0.5))
+        )
+        
+        self.index_manager = IndexManager(self.redis_client, self.index_name, live_documents_key)
+        
+        self.suggestion_service = SuggestionService(self.redis_client, self.suggestions_key, self.read_client, self.suggestion_generation)
+        self.document_service = DocumentIndexService(self.redis_client, live_documents_key, self.inverted_index_key, self.generation)
+        self.search_service = SearchService(self.read_client, self.index_name, live_documents_key, self.inverted_index_key, self.query_cache, self.index_manager)
+        self.facet_service = FacetService(self.read_client, self.search_service, self.query_cache)
+        self.autocomplete = None
+        if os.getenv('AUTOCOMPLETE_ENGINE', 'redis').lower() == 'memory':
+            self.autocomplete = AutocompleteEngine(
+                self.read_client, self.suggestions_key, self.suggestion_generation,
+                top_k=int(os.getenv('AUTOCOMPLETE_TOP_K', 50)),
+                max_distance=int(os.getenv('AUTOCOMPLETE_MAX_DISTANCE', 1)),
+                refresh_interval=float(os.getenv('AUTOCOMPLETE_REFRESH_INTERVAL', 5.0))
+            )
+        self.index_manager.check_schema()
+        self.search_service.detect_module_version()
+        job_service.register('index_all', self.run_index_job, lock=INDEX_LOCK)
 
     def test_redisearch_availability(self) -> bool:
         """Test if RediSearch module is available"""
@@ -25,73 +70,612 @@ class RediSearchService:
             logging.error(f"RediSearch not available: {e}")
             return False
 
+    def refresh_live_version(self) -> int:
+        """Point writes at the documents prefix of the live index version"""
+        version = self.versions.live_version()
+        live_documents_key = self.versions.documents_key_for(version)
+        self.document_service.documents_key = live_documents_key
+        self.search_service.documents_key = live_documents_key
+        self.index_manager.documents_key = live_documents_key
+        return version
+
+    def ensure_index(self):
+        self.refresh_live_version()
+        self.index_manager.ensure_index()
+
     def add_suggestion(self, suggestion: str, score: float = 1.0) -> bool:
         return self.suggestion_service.add_suggestion(suggestion, score)
 
     def get_suggestions(self, prefix: str, limit: int = 10, fuzzy: bool = False, with_scores: bool = False) -> List:
+        local = self.local_suggestions(prefix, limit, fuzzy, with_scores)
+        if local is not None:
+            return local
         return self.suggestion_service.get_suggestions(prefix, limit, fuzzy, with_scores)
 
+    def local_suggestions(self, prefix: str, limit: int = 10, fuzzy: bool = False, with_scores: bool = False, generation: int = None):
+        """Suggestions from the in-process autocomplete engine, None when disabled or it cannot answer"""
+        if self.autocomplete is None:
+            return None
+        try:
+            return self.autocomplete.suggestions(prefix, limit, fuzzy, with_scores, generation)
+        except Exception as e:
+            logging.error(f"Error in local autocomplete for '{prefix}': {e}")
+            return None
+
     def clear_suggestions(self) -> bool:
         return self.suggestion_service.clear_suggestions()
 
+    def materialize_prefixes(self) -> Dict:
+        return self.suggestion_service.materialize_prefixes()
+
     def index_document(self, doc_id: str, name: str, price: float, image: str,  url: str, metadata: Dict = None) -> bool:
+        # Another process may have promoted a version since, writes to the retired prefix would be torn down
+        self.refresh_live_version()
         return self.document_service.index_document(doc_id, name, price, image, url, metadata )
 
-    def full_text_search(self, query: str, limit: int = 10) -> List[Dict]:
-        return self.search_service.full_text_search(query, limit)
+    def full_text_search(self, query: str, limit: int = 10, fields: List[str] = None, ids_only: bool = False, options: Dict = None) -> List[Dict]:
+        return self.search_service.full_text_search(query, limit, fields, ids_only, options)
+
+    def fuzzy_search(self, query: str, max_distance: int = 2, limit: int = 10, fields: List[str] = None, ids_only: bool = False, options: Dict = None) -> List[Dict]:
+        return self.search_service.fuzzy_search(query, max_distance, limit, fields, ids_only, options)
+
+    def corrected_fuzzy_search(self, query: str, max_distance: int = 2, limit: int = 10, fields: List[str] = None, ids_only: bool = False, options: Dict = None) -> Dict:
+        return self.search_service.corrected_fuzzy_search(query, max_distance, limit, fields, ids_only, options)
+
+    def faceted_search(self, query: str, limit: int = 10, facet_size: int = 10, price_bucket: float = 50.0,
+                       fields: List[str] = None, ids_only: bool = False, options: Dict = None) -> Dict:
+        return self.facet_service.faceted_search(query, limit, facet_size, price_bucket, fields, ids_only, options)
+
+    def open_cursor(self, kind: str, query: str, page_size: int = 10, max_distance: int = 2, fields: List[str] = None, ids_only: bool = False,
+                    options: Dict = None, window: int = None) -> Dict:
+        """First page of a cursor-paginated 'fulltext' or 'fuzzy' search over its best ``window`` hits, fuzzy ones spelling-corrected first"""
+        try:
+            correction = self.search_service.correct_query(query, max_distance) if kind == 'fuzzy' else None
+            plan = self.search_service.plan_query(kind, query, page_size, max_distance, fields, ids_only, options, correction)
+            page = self.search_service.open_cursor(plan, window)
+            if kind == 'fuzzy':
+                page['did_you_mean'] = correction['did_you_mean'] if correction else None
+            return page
+        except Exception as e:
+            logging.error(f"Error opening search cursor: {e}")
+            return {'error': str(e)}
+
+    def read_cursor(self, cursor_id: str, count: int = 10) -> Dict:
+        try:
+            return self.search_service.read_cursor(cursor_id, count)
+        except Exception as e:
+            logging.error(f"Error reading search cursor {cursor_id}: {e}")
+            return {'error': str(e)}
+
+    def index_batch(self, products: List[Dict], document_service: DocumentIndexService = None, suggestion_service: SuggestionService = None,
+                    sync_generation: int = None) -> Dict:
+        """Index a batch of products, writing only the documents whose content changed
+
+        The stored fingerprints of the batch and the names its documents contributed
+        suggestions for are read with one pipelined round trip, and documents with an
+        identical fingerprint are left untouched, so RediSearch does not re-index them;
+        they count as ``indexed`` and ``unchanged``. Changed documents are ``updated``,
+        new ones ``inserted``, and all of them are written with a second round trip.
+        With INDEX_SKIP_UNCHANGED=false, or when the fingerprints cannot be read, every
+        document is written and counted as indexed only.
+
+        Suggestions follow the contributed names: phrases are added only for documents
+        whose name differs from the one recorded for them, a renamed document's old
+        phrases are taken back, and the new names are recorded. All of it is summed per
+        batch and queued on the pipeline of the documents, so a document is never
+        skipped as unchanged while its suggestions are missing. When the names cannot
+        be read, suggestions are left for the next run. With a ``sync_generation``
+        every valid product of the batch, written or unchanged, is stamped with it for
+        the stale document sweep.
+        """
+        document_service = document_service or self.document_service
+        suggestion_service = suggestion_service or self.suggestion_service
+        stats = {
+            'products': len(products),
+            'indexed': 0,
+            'skipped': 0,
+            'unchanged': 0,
+            'updated': 0,
+            'inserted': 0,
+            'failed': 0,
+            'suggestion_phrases': 0,
+            'suggestion_errors': 0,
+            'commands': 0,
+            'round_trips': 0,
+            'errors': []
+        }
+        documents = []
+        
+        for product in products:
+            price = product.get('price', 0.0)
+            name = str(product.get('name', ''))
+            if not price or not name.strip():
+                stats['skipped'] += 1
+                continue
+            documents.append(document_service.build_document(
+                str(product.get('id')), name, price,
+                str(product.get('image', '')),
+                product.get('source_url'),
+                product.get('metadata')
+            ))
+        
+        if not documents:
+            return stats
+        
+        doc_ids = [document['id'] for document in documents]
+        changes = [None] * len(documents)
+        sources = None
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            document_service.queue_fingerprints(pipe, doc_ids)
+            suggestion_service.queue_sources_read(pipe, doc_ids)
+            stats['commands'] += len(pipe)
+            *stored, sources = pipe.execute()
+            stats['round_trips'] += 1
+            if document_service.skip_unchanged:
+                changes = [
+                    'inserted' if fingerprint is None else 'unchanged' if fingerprint == document[FINGERPRINT_FIELD] else 'updated'
+                    for document, fingerprint in zip(documents, stored)
+                ]
+        except Exception as e:
+            logging.warning(f"Could not read document fingerprints, writing the whole batch without suggestions: {e}")
+        
+        pipe = self.redis_client.pipeline(transaction=False)
+        builder = suggestion_service.builder()
+        contributed = {}
+        queued = []
+        for position, (document, change) in enumerate(zip(documents, changes)):
+            source = sources[position] if sources is not None else document['name']
+            if source != document['name']:
+                builder.add(document['name'], 1.0)
+                if source is not None:
+                    builder.subtract(source, 1.0)
+                contributed[document['id']] = document['name']
+            if change == 'unchanged':
+                stats['unchanged'] += 1
+                stats['indexed'] += 1
+                continue
+            document_service.queue_mapping(pipe, document)
+            queued.append((document['id'], change))
+        
+        if not queued and not contributed and sync_generation is None:
+            return stats
+        
+        stats['suggestion_phrases'] = sum(1 for score in builder.scores.values() if score)
+        suggestion_count = builder.queue(pipe) + suggestion_service.queue_sources(pipe, contributed)
+        live = bool(queued) and document_service is self.document_service
+        if live:
+            self.generation.queue_bump(pipe)
+        if sync_generation is not None:
+            self.sync_generation.queue_stamp(pipe, [document['id'] for document in documents], sync_generation)
+        stats['commands'] += len(pipe)
+        try:
+            results = pipe.execute(raise_on_error=False)
+        except Exception as e:
+            stats['failed'] = len(queued)
+            stats['errors'].append(f"Batch of {len(queued)} products failed: {e}")
+            return stats
+        finally:
+            stats['round_trips'] += 1
+            if live:
+                self.generation.invalidate()
+            if suggestion_count and suggestion_service.generation is not None:
+                suggestion_service.generation.invalidate()
+        
+        for (doc_id, change), doc_result in zip(queued, results):
+            if isinstance(doc_result, Exception):
+                stats['failed'] += 1
+                stats['errors'].append(f"Failed to index document {doc_id}: {doc_result}")
+                continue
+            stats['indexed'] += 1
+            if change:
+                stats[change] += 1
+        suggestion_results = results[len(queued):len(queued) + suggestion_count]
+        stats['suggestion_errors'] = sum(1 for r in suggestion_results if isinstance(r, Exception))
+        
+        return stats
+
+    def submit_index_job(self, clear_existing: bool = True, batch_size: int = 1000, flush_size: int = None) -> Dict:
+        """Run a PostgreSQL bulk index as a background job, returns the job"""
+        return job_service.submit('index_all', {
+            'clear_existing': clear_existing,
+            'batch_size': batch_size,
+            'flush_size': flush_size or self.bulk_flush_size
+        })
+
+    def run_index_job(self, job: JobContext) -> Dict:
+        from src.services.postgres_service import postgres_service
+        
+        params = job.params
+        checkpoint = job.checkpoint
+        if params['clear_existing'] and not checkpoint:
+            self.clear_all_data()
+            logging.info("Cleared existing search data and RediSearch index")
+            job.heartbeat()
+        job.set_total(postgres_service.get_products_count(exact=False))
+        after_id = checkpoint['after_id'] if checkpoint else None
+        postgres_products = chain.from_iterable(postgres_service.iter_products(params['batch_size'], after_id))
+        return self.bulk_index_from_postgres(postgres_products, params['flush_size'], job=job)
+
+    def index_from_postgres(self, clear_existing: bool = True, batch_size: int = 1000, flush_size: int = None) -> Dict:
+        """Bulk index every PostgreSQL product in the foreground, after clearing the index when ``clear_existing``"""
+        from src.services.postgres_service import postgres_service
+        
+        if clear_existing:
+            self.clear_all_data()
+            logging.info("Cleared existing search data and RediSearch index")
+        postgres_products = chain.from_iterable(postgres_service.iter_products(batch_size))
+        return self.bulk_index_from_postgres(postgres_products, flush_size)
 
-    def fuzzy_search(self, query: str, max_distance: int = 2, limit: int = 10) -> List[Dict]:
-        return self.search_service.fuzzy_search(query, max_distance, limit)
+    def rebuild_from_postgres(self, batch_size: int = 1000, flush_size: int = None) -> Dict:
+        """``rebuild_index`` from every PostgreSQL product"""
+        from src.services.postgres_service import postgres_service
+        
+        postgres_products = chain.from_iterable(postgres_service.iter_products(batch_size))
+        return self.rebuild_index(postgres_products, flush_size)
 
-    def bulk_index_from_postgres(self, postgres_products: List[Dict]) -> Dict:
-        """Bulk index products using RediSearch and suggestions"""
+    def bulk_index_from_postgres(self, postgres_products: Iterable[Dict], flush_size: int = None,
+                                 document_service: DocumentIndexService = None, suggestion_service: SuggestionService = None,
+                                 job: JobContext = None) -> Dict:
+        """Bulk index products using pipelined RediSearch and suggestion writes
+        
+        Products are buffered into Redis pipelines of ``flush_size`` products.
+        A failed flush is recorded in ``failed_batches`` and the run continues.
+        Suggestion phrases are summed per batch and written with its documents, see
+        ``index_batch``. Writes go to the live index unless target services are given.
+        
+        With a ``job``, the last product id is committed as the job checkpoint every
+        JOB_CHECKPOINT_INTERVAL seconds with the running stats, which a resumed job
+        starts from. The checkpoint stops advancing at the first failed batch, so a
+        resumed job indexes it again. Cancellation stops the run after the current batch.
+        """
         try:
+            flush_size = flush_size or self.bulk_flush_size
             stats = {
-                'total_products': len(postgres_products),
+                'total_products': 0,
                 'successfully_indexed': 0,
+                'skipped_products': 0,
+                'unchanged_products': 0,
+                'updated_products': 0,
+                'inserted_products': 0,
+                'failed_products': 0,
                 'errors': [],
-                'suggestions_added': 0
+                'failed_batches': [],
+                'suggestions_added': 0,
+                'suggestion_phrases': 0,
+                'suggestion_errors': 0,
+                'flush_size': flush_size,
+                'batches': 0,
+                'round_trips': 0,
+                'round_trips_per_batch': 0,
+                'commands': 0,
+                'duration_seconds': 0,
+                'docs_per_second': 0
             }
-            self.search_service._ensure_index_exists()
-            initial_count = self.suggestion_service.get_suggestion_length()
+            if job is not None and job.checkpoint:
+                stats.update(job.checkpoint['stats'])
+            start_time = time.perf_counter()
+            if document_service is None:
+                self.ensure_index()
+            suggestion_service = suggestion_service or self.suggestion_service
+            initial_count = suggestion_service.get_suggestion_length()
+            sync_generation = self.sync_generation.current()
             
-            for product in postgres_products:
-                price = (product.get('price',0.0))
-                name = str(product.get('name', ''))
-                image = str(product.get('image', ''))
-                doc_id = str(product.get('id'))
-                metadata = product.get('metadata')
-                url = product.get('source_url')
-                if price and name and len(name.strip()) > 0:
-                    if self.index_document(doc_id, name, price,image , url, metadata):
-                        weight = 1.0
-                        self.suggestion_service.index_document_for_suggestions(price, name, weight)
-                        stats['successfully_indexed'] += 1
-                    else:
-                        stats['errors'].append(f"Failed to index price {price}")
+            products = iter(postgres_products)
+            committed = job.checkpoint if job is not None else None
+            blocked = False
+            while True:
+                batch = list(islice(products, flush_size))
+                if not batch:
+                    break
+                stats['batches'] += 1
+                batch_stats = self.index_batch(batch, document_service, suggestion_service, sync_generation)
+                stats['total_products'] += batch_stats['products']
+                stats['successfully_indexed'] += batch_stats['indexed']
+                stats['skipped_products'] += batch_stats['skipped']
+                stats['unchanged_products'] += batch_stats['unchanged']
+                stats['updated_products'] += batch_stats['updated']
+                stats['inserted_products'] += batch_stats['inserted']
+                stats['failed_products'] += batch_stats['failed']
+                stats['suggestion_phrases'] += batch_stats['suggestion_phrases']
+                stats['suggestion_errors'] += batch_stats['suggestion_errors']
+                stats['round_trips'] += batch_stats['round_trips']
+                stats['commands'] += batch_stats['commands']
+                stats['errors'].extend(batch_stats['errors'])
+                if batch_stats['failed']:
+                    stats['failed_batches'].append({
+                        'batch': stats['batches'],
+                        'products': batch_stats['products'],
+                        'failed': batch_stats['failed']
+                    })
+                if job is None:
+                    continue
+                cancelled = job.cancelled
+                # Products of a failed batch are not durable, the checkpoint stays before them
+                blocked = blocked or bool(batch_stats['failed'])
+                if not blocked:
+                    committed = {'after_id': batch[-1].get('id'), 'stats': self._checkpoint_stats(stats)}
+                if committed is not None and (cancelled or job.checkpoint_due()):
+                    job.update(stats['total_products'], committed)
+                else:
+                    job.update(stats['total_products'])
+                if cancelled:
+                    stats['cancelled'] = True
+                    break
+            if job is not None and committed is not None and committed is not job.checkpoint:
+                job.update(stats['total_products'], committed)
+            if stats.get('cancelled'):
+                return stats
+            stats['prefix_table'] = suggestion_service.materialize_prefixes()
             
-            final_count = self.suggestion_service.get_suggestion_length()
+            final_count = suggestion_service.get_suggestion_length()
             stats['suggestions_added'] = final_count - initial_count
             
+            duration = time.perf_counter() - start_time
+            stats['duration_seconds'] = round(duration, 3)
+            stats['docs_per_second'] = round(stats['successfully_indexed'] / duration, 1) if duration > 0 else 0
+            if stats['batches']:
+                stats['round_trips_per_batch'] = round(stats['round_trips'] / stats['batches'], 2)
+            
             return stats
             
         except Exception as e:
             logging.error(f"Error in bulk indexing: {e}")
             return {'error': str(e)}
 
+    @staticmethod
+    def _checkpoint_stats(stats: Dict) -> Dict:
+        """Counters carried over to a resumed run, with the error lists trimmed"""
+        carried = {key: value for key, value in stats.items() if type(value) is int}
+        carried['errors'] = stats['errors'][-100:]
+        carried['failed_batches'] = stats['failed_batches'][-100:]
+        return carried
+
+    def rebuild_index(self, postgres_products: Iterable[Dict], flush_size: int = None) -> Dict:
+        """Build a new index version while the current one keeps serving, then swap the alias to it
+        
+        The previous version is garbage-collected in the background. If any product
+        fails to index, the new version is discarded and the live index is left untouched.
+        """
+        version = self.versions.allocate_version()
+        index_name = self.versions.index_name(version)
+        documents_key = self.versions.documents_key_for(version)
+        suggestions_key = self.versions.staging_suggestions_key(version)
+        try:
+            self.redis_client.delete(*suggestion_keys_for(suggestions_key))
+            self.index_manager.create_index(index_name, documents_key)
+        except Exception as e:
+            logging.error(f"Error creating index version {version}: {e}")
+            return {'error': str(e)}
+        
+        stats = self.bulk_index_from_postgres(
+            postgres_products, flush_size,
+            document_service=DocumentIndexService(self.redis_client, documents_key, self.inverted_index_key),
+            suggestion_service=SuggestionService(self.redis_client, suggestions_key)
+        )
+        stats['version'] = version
+        stats['index_name'] = index_name
+        stats['promoted'] = False
+        
+        if 'error' in stats or stats['failed_products'] or not stats['successfully_indexed']:
+            logging.error(f"Rebuild of index version {version} incomplete, discarding it")
+            self.versions.discard_in_background(version)
+            stats.setdefault('error', f"Rebuild of index version {version} incomplete, live index unchanged")
+            return stats
+        
+        try:
+            previous = self.versions.promote(version)
+        except Exception as e:
+            logging.error(f"Error promoting index version {version}: {e}")
+            self.versions.discard_in_background(version)
+            stats['error'] = str(e)
+            return stats
+        
+        self.refresh_live_version()
+        self.generation.bump()
+        self.suggestion_service.changed()
+        self.versions.discard_in_background(previous)
+        stats['promoted'] = True
+        stats['previous_version'] = previous
+        return stats
+
+    def sweep_stale_documents(self, generation: int):
+        """Delete, in the background, live documents a full sync of ``generation`` did not see"""
+        def on_done(progress):
+            self.generation.bump()
+            progress['prefix_table'] = self.materialize_prefixes()
+        return self.sync_generation.sweep_in_background(generation, self.document_service, self.suggestion_service, on_done)
+
     def clear_all_data(self) -> bool:
-        doc_cleared = self.document_service.clear_all_data()
-        suggestions_cleared = self.suggestion_service.clear_suggestions()
-        return doc_cleared and suggestions_cleared
+        """Empty the index without deleting the documents inline
+
+        A new, empty index version is created and promoted, which also drops the
+        live suggestion dictionary, and the previous version's documents go through
+        the throttled background teardown. Writes made after the clear land under
+        the new version's prefix, so the teardown never deletes them.
+        """
+        try:
+            version = self.versions.allocate_version()
+            self.index_manager.create_index(self.versions.index_name(version), self.versions.documents_key_for(version))
+            previous = self.versions.promote(version)
+        except Exception as e:
+            logging.error(f"Error clearing data: {e}")
+            return False
+        self.sync_generation.clear()
+        self.refresh_live_version()
+        self.generation.bump()
+        self.suggestion_service.changed()
+        self.versions.discard_in_background(previous)
+        logging.info(f"Cleared search data: index version {version} is live, version {previous} is being torn down")
+        return True
+
+    def batch_search(self, queries: List[Dict]) -> Dict:
+        """Run full-text, fuzzy and suggest sub-queries over a single pipelined round trip
+
+        Each query is a dict with ``type`` ('fulltext', 'fuzzy' or 'suggest'), ``query``,
+        ``limit`` and the options of the matching single-query method. Cached sub-queries
+        cost no Redis commands. ``took_ms`` per sub-query covers planning and parsing;
+        the shared pipeline time is reported once as ``redis_ms``.
+        """
+        try:
+            started = time.perf_counter()
+            pipe = self.read_client.pipeline(transaction=False)
+            entries, commands = self.plan_batch(queries, pipe)
+
+            round_trips = 0
+            redis_seconds = 0.0
+            responses = []
+            if commands:
+                redis_started = time.perf_counter()
+                responses = pipe.execute(raise_on_error=False)
+                round_trips = 1
+                if self.batch_index_missing(entries, responses):
+                    self.search_service.recover_missing_index()
+                    pipe = self.read_client.pipeline(transaction=False)
+                    self.queue_batch(entries, pipe)
+                    responses = pipe.execute(raise_on_error=False)
+                    round_trips += 1
+                redis_seconds = time.perf_counter() - redis_started
+
+            return self.resolve_batch(entries, responses, commands, round_trips, redis_seconds, started)
+        except Exception as e:
+            logging.error(f"Error in batch search: {e}")
+            return {'error': str(e)}
+
+    def plan_batch(self, queries: List[Dict], pipe):
+        """Plan every sub-query and queue the uncached ones on ``pipe``, returns (entries, commands queued)"""
+        entries = self.plan_batch_entries(queries)
+        for entry in entries:
+            lookup_started = time.perf_counter()
+            spec = entry['spec']
+            if entry['plan'] is not None:
+                entry['results'] = self.search_service.cached_results(entry['plan'])
+                entry['cached'] = entry['results'] is not None
+            elif spec['type'] == 'suggest':
+                entry['results'] = self.local_suggestions(
+                    spec['query'], spec['limit'], spec.get('fuzzy', False), spec.get('with_scores', False)
+                )
+            entry['elapsed'] += time.perf_counter() - lookup_started
+        return entries, self.queue_batch(entries, pipe)
+
+    def plan_batch_entries(self, queries: List[Dict]) -> List[Dict]:
+        """Plan every sub-query without touching Redis, cached results are looked up by the caller"""
+        entries = []
+        for spec in queries:
+            plan_started = time.perf_counter()
+            entry = {'spec': spec, 'plan': None, 'results': None, 'cached': False, 'start': 0, 'count': 0}
+            if spec['type'] != 'suggest':
+                entry['plan'] = self.search_service.plan_query(
+                    spec['type'], spec['query'], spec['limit'], spec.get('max_distance', 2),
+                    spec.get('fields'), spec.get('ids_only', False), spec.get('options')
+                )
+                if entry['plan'] is None:
+                    entry['results'] = []
+            entry['elapsed'] = time.perf_counter() - plan_started
+            entries.append(entry)
+        return entries
+
+    def queue_batch(self, entries: List[Dict], pipe) -> int:
+        """Queue the commands of the uncached entries on ``pipe``, returns the number queued"""
+        commands = 0
+        for entry in entries:
+            entry['start'] = commands
+            commands += self._queue_entry(entry, pipe)
+        return commands
+
+    def _queue_entry(self, entry: Dict, pipe) -> int:
+        spec = entry['spec']
+        if entry['results'] is not None:
+            entry['count'] = 0
+        elif spec['type'] == 'suggest':
+            pipe.execute_command(*self.suggestion_service.suggestion_command(
+                spec['query'], spec['limit'], spec.get('fuzzy', False), spec.get('with_scores', False)
+            ))
+            entry['count'] = 1
+        else:
+            entry['count'] = self.search_service.queue_plan(pipe, entry['plan'])
+        return entry['count']
+
+    def batch_index_missing(self, entries: List[Dict], responses: List) -> bool:
+        search_replies = [reply for entry in entries if entry['plan'] and entry['count'] for reply in responses[entry['start']:entry['start'] + entry['count']]]
+        return bool(search_replies) and self.search_service.is_missing_index_reply(search_replies)
+
+    def resolve_batch(self, entries: List[Dict], responses: List, commands: int, round_trips: int, redis_seconds: float,
+                      started: float, store: bool = True) -> Dict:
+        """Parse the pipeline replies of a planned batch into per-query results
+
+        With ``store`` False fresh search results are not cached; each resolved
+        entry keeps its ``found`` results and ``failures`` for the caller to cache.
+        """
+        results = []
+        for entry in entries:
+            resolve_started = time.perf_counter()
+            spec = entry['spec']
+            replies = responses[entry['start']:entry['start'] + entry['count']]
+            item = {'type': spec['type'], 'query': spec['query']}
+            if spec['type'] == 'suggest' and entry['results'] is not None:
+                found = entry['results']
+            elif spec['type'] == 'suggest':
+                if isinstance(replies[0], Exception):
+                    logging.error(f"Error getting suggestions for '{spec['query']}': {replies[0]}")
+                    item['error'] = str(replies[0])
+                    found = []
+                else:
+                    found = self.suggestion_service.parse_suggestions(replies[0], spec.get('with_scores', False))
+            elif entry['results'] is not None:
+                found = entry['results']
+                item['cached'] = entry['cached']
+            else:
+                found, failures = self.search_service.resolve_plan(entry['plan'], replies, store)
+                entry['found'], entry['failures'] = found, failures
+                item['cached'] = False
+                if failures == len(replies):
+                    item['error'] = 'All query variants failed'
+            item['results_count'] = len(found)
+            item['results'] = found
+            item['took_ms'] = round((entry['elapsed'] + time.perf_counter() - resolve_started) * 1000, 3)
+            results.append(item)
+
+        return {
+            'queries': len(entries),
+            'results': results,
+            'commands': commands,
+            'round_trips': round_trips,
+            'redis_ms': round(redis_seconds * 1000, 3),
+            'took_ms': round((time.perf_counter() - started) * 1000, 3)
+        }
+
+    def get_search_metrics(self, cache_generation: int = None) -> Dict:
+        return {
+            'cache': self.query_cache.get_stats(cache_generation),
+            'planner': self.search_service.get_planner_stats(),
+            'autocomplete': self.autocomplete.get_stats() if self.autocomplete else {'enabled': False}
+        }
 
     def get_stats(self) -> Dict:
+        """Suggestion and document counts in one round trip, without scanning the keyspace"""
         try:
-            return {
-                'total_suggestions': self.suggestion_service.get_suggestion_length(),
-                'documents_count': self.document_service.get_document_count(),
-                'suggestions_key': self.suggestions_key,
-                'service_type': 'RediSearch FT.SUGADD'
-            }
+            pipe = self.read_client.pipeline(transaction=False)
+            self.queue_stats(pipe)
+            return self.parse_stats(*pipe.execute(raise_on_error=False))
         except Exception as e:
             logging.error(f"Error getting stats: {e}")
             return {'error': str(e)}
+
+    def queue_stats(self, pipe):
+        pipe.execute_command('FT.SUGLEN', self.suggestions_key)
+        pipe.execute_command('FT.INFO', self.index_name)
+
+    def parse_stats(self, suggestions, info) -> Dict:
+        if isinstance(info, Exception):
+            logging.warning(f"Could not read index info: {info}")
+        return {
+            'total_suggestions': 0 if isinstance(suggestions, Exception) else int(suggestions),
+            'documents_count': 0 if isinstance(info, Exception) else self.document_service.parse_num_docs(info),
+            'suggestions_key': self.suggestions_key,
+            'schema': self.index_manager.schema_status,
+            'service_type': 'RediSearch FT.SUGADD'
+        }
+
+
+redisearch_service = RediSearchService()
@@ -1,7 +1,15 @@
+from .index_manager import IndexManager
 from .search_service import SearchService
 from .document_index_service import DocumentIndexService
 from .postgres_service import PostgreSQLService, postgres_service
+from .job_service import JobService, JobContext, job_service
 from .data_sync_service import data_sync_service
-from .suggestion_service import SuggestionService
+from .suggestion_service import SuggestionService, SuggestionBuilder
+from .index_version_service import IndexVersionService
+from .index_generation import IndexGeneration
+from .sync_generation import SyncGeneration
+from .query_cache import QueryCache
+from .facet_service import FacetService
+from .autocomplete_service import AutocompleteEngine, SuggestionTrie
 
-__all__ = ["SearchService", "DocumentIndexService", "PostgreSQLService", "postgres_service", "data_sync_service", "SuggestionService"]
\ No newline at end of file
+__all__ = ["SearchService", "DocumentIndexService", "PostgreSQLService", "postgres_service", "JobService", "JobContext", "job_service", "data_sync_service", "SuggestionService", "SuggestionBuilder", "IndexVersionService", "IndexGeneration", "SyncGeneration", "QueryCache", "IndexManager", "FacetService", "AutocompleteEngine", "SuggestionTrie"]
\ No newline at end of file
@@ -0,0 +1,156 @@
+import asyncio
+import asyncpg
+import logging
+import time
+from typing import List, Dict
+from src.services.postgres_service import PostgreSQLService, postgres_service, PRODUCT_COLUMNS
+
+# Failures that mean PostgreSQL is unreachable, as opposed to an empty result
+CONNECTION_ERRORS = (OSError, asyncio.TimeoutError, asyncpg.PostgresConnectionError, asyncpg.InterfaceError)
+
+
+class AsyncPostgreSQLService:
+    """asyncpg counterpart of PostgreSQLService for the read endpoints of the ASGI app
+
+    Connection settings and pool limits are taken from the synchronous service,
+    so both modes are configured by the same PSQL_* variables.
+    """
+
+    def __init__(self, config: PostgreSQLService = None):
+        self.config = config or postgres_service
+        self.table = self.config.table
+        self._pool = None
+        self._pool_lock = None
+        self._pool_stats = {
+            'checkouts': 0,
+            'total_wait_seconds': 0.0,
+            'max_wait_seconds': 0.0
+        }
+
+    async def _get_pool(self):
+        """Get the asyncpg pool, creating it on first use inside the running loop"""
+        if self._pool_lock is None:
+            self._pool_lock = asyncio.Lock()
+        async with self._pool_lock:
+            if self._pool is None:
+                try:
+                    self._pool = await asyncpg.create_pool(
+                        host=self.config.host,
+                        port=self.config.port,
+                        user=self.config.username,
+                        password=self.config.password,
+                        database=self.config.database,
+                        min_size=self.config.pool_min,
+                        max_size=self.config.pool_max,
+                        max_inactive_connection_lifetime=self.config.pool_max_idle,
+                        timeout=self.config.pool_timeout
+                    )
+                    logging.info(f"Created async PostgreSQL connection pool at {self.config.host}:{self.config.port} ({self.config.pool_min}-{self.config.pool_max} connections)")
+                except Exception as e:
+                    logging.error(f"Failed to connect to PostgreSQL: {e}")
+                    raise
+            return self._pool
+
+    async def _fetch(self, query: str, *args) -> List[Dict]:
+        pool = await self._get_pool()
+        started = time.perf_counter()
+        async with pool.acquire(timeout=self.config.pool_timeout) as conn:
+            waited = time.perf_counter() - started
+            self._pool_stats['checkouts'] += 1
+            self._pool_stats['total_wait_seconds'] += waited
+            self._pool_stats['max_wait_seconds'] = max(self._pool_stats['max_wait_seconds'], waited)
+            rows = await conn.fetch(query, *args)
+        return [dict(row) for row in rows]
+
+    def get_pool_stats(self) -> Dict:
+        """Connection pool configuration and checkout statistics"""
+        stats = dict(self._pool_stats)
+        checkouts = stats['checkouts']
+        stats['avg_wait_ms'] = round(stats['total_wait_seconds'] / checkouts * 1000, 3) if checkouts else 0
+        stats['max_wait_ms'] = round(stats.pop('max_wait_seconds') * 1000, 3)
+        stats['total_wait_seconds'] = round(stats['total_wait_seconds'], 3)
+        pool = self._pool
+        stats.update({
+            'min_connections': self.config.pool_min,
+            'max_connections': self.config.pool_max,
+            'open_connections': pool.get_size() if pool else 0,
+            'in_use_connections': pool.get_size() - pool.get_idle_size() if pool else 0
+        })
+        return stats
+
+    async def test_connection(self) -> bool:
+        """Test PostgreSQL connection"""
+        try:
+            await self._fetch("SELECT 1")
+            return True
+        except Exception as e:
+            logging.error(f"PostgreSQL connection test failed: {e}")
+            return False
+
+    async def get_table_info(self, exact: bool = False) -> Dict:
+        """Get information about the products table"""
+        try:
+            columns = await self._fetch("""
+                SELECT column_name, data_type, is_nullable
+                FROM information_schema.columns
+                WHERE table_name = $1
+                ORDER BY ordinal_position
+            """, self.table)
+            return {
+                'table_name': self.table,
+                'total_rows': await self.get_products_count(exact),
+                'total_rows_exact': exact,
+                'columns': columns
+            }
+        except Exception as e:
+            logging.error(f"Error getting table info: {e}")
+            return {'error': str(e)}
+
+    async def fetch_products(self, limit: int = None, offset: int = 0) -> List[Dict]:
+        """Fetch one page of products, connection failures are raised like in the synchronous service"""
+        try:
+            query = f"select distinct {PRODUCT_COLUMNS} from {self.table}"
+            if limit:
+                query += f" LIMIT {int(limit)}"
+            if offset:
+                query += f" OFFSET {int(offset)}"
+            result = await self._fetch(query)
+            logging.info(f"Fetched {len(result)} products from PostgreSQL")
+            return result
+        except CONNECTION_ERRORS:
+            raise
+        except Exception as e:
+            logging.error(f"Error fetching product: {e}")
+            return []
+
+    async def estimate_products_count(self):
+        """Row count estimate from the planner statistics in pg_class, None if the table was never analyzed"""
+        rows = await self._fetch("SELECT reltuples::bigint AS estimate FROM pg_class WHERE oid = $1::regclass", self.table)
+        if not rows or rows[0]['estimate'] is None or rows[0]['estimate'] < 0:
+            return None
+        return int(rows[0]['estimate'])
+
+    async def get_products_count(self, exact: bool = True) -> int:
+        """Get total number of products in the table, the planner estimate when ``exact`` is False"""
+        try:
+            if not exact:
+                estimate = await self.estimate_products_count()
+                if estimate is not None:
+                    return estimate
+            rows = await self._fetch(f"SELECT COUNT(*) as count FROM {self.table}")
+            return rows[0]['count'] if rows else 0
+        except CONNECTION_ERRORS:
+            raise
+        except Exception as e:
+            logging.error(f"Error getting products count: {e}")
+            return 0
+
+    async def close_connection(self):
+        """Close every pooled PostgreSQL connection"""
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await pool.close()
+            logging.info("Async PostgreSQL connection pool closed")
+
+
+async_postgres_service = AsyncPostgreSQLService()
@@ -0,0 +1,282 @@
+import heapq
+import logging
+import threading
+import time
+from array import array
+from typing import List, Dict, Iterable, Tuple
+from src.services.suggestion_service import phrases_key_for
+
+
+class SuggestionTrie:
+    """Immutable trie over suggestion phrases, stored in flat arrays
+
+    Phrases are kept sorted, so every node covers the contiguous phrase range
+    ``lo[n]:hi[n]``. Children are linked through ``first_child`` / ``next_sibling``
+    and labelled with a code point. Nodes are only created for prefixes shared by
+    two or more phrases plus one leaf per phrase. A leaf's remaining characters
+    are read from the phrase itself. Nodes covering more than ``top_k`` phrases
+    keep their best ids in ``top``. Smaller ranges are ranked on demand.
+    """
+
+    def __init__(self, phrases: Iterable[Tuple[str, float]], top_k: int = 50):
+        self.top_k = top_k
+        items = sorted(phrases)
+        self.phrases = [phrase for phrase, _ in items]
+        self.scores = array('d', (score for _, score in items))
+        self.label = array('I')
+        self.depth = array('H')
+        self.lo = array('i')
+        self.hi = array('i')
+        self.first_child = array('i')
+        self.next_sibling = array('i')
+        self.top = {}
+        self._build()
+
+    def _new_node(self, label: int, depth: int, lo: int) -> int:
+        self.label.append(label)
+        self.depth.append(depth)
+        self.lo.append(lo)
+        self.hi.append(lo)
+        self.first_child.append(-1)
+        self.next_sibling.append(-1)
+        return len(self.label) - 1
+
+    def _build(self):
+        phrases = self.phrases
+        count = len(phrases)
+        shared_with_next = [_common_prefix(phrases[i], phrases[i + 1]) for i in range(count - 1)] + [0]
+        last_child = {}
+        path = [self._new_node(0, 0, 0)]
+        shared = 0
+        for i, phrase in enumerate(phrases):
+            for node in path[shared + 1:]:
+                self.hi[node] = i
+            del path[shared + 1:]
+            deepest = min(len(phrase), max(shared, shared_with_next[i]) + 1)
+            for depth in range(shared + 1, deepest + 1):
+                parent = path[-1]
+                node = self._new_node(ord(phrase[depth - 1]), depth, i)
+                if parent in last_child:
+                    self.next_sibling[last_child[parent]] = node
+                else:
+                    self.first_child[parent] = node
+                last_child[parent] = node
+                path.append(node)
+            shared = shared_with_next[i]
+        for node in path:
+            self.hi[node] = count
+
+        # Children are created after their parent, so a reverse pass sees them first
+        for node in range(len(self.label) - 1, -1, -1):
+            lo = self.lo[node]
+            if self.hi[node] - lo <= self.top_k:
+                continue
+            candidates = [lo] if len(phrases[lo]) == self.depth[node] else []
+            child = self.first_child[node]
+            while child != -1:
+                candidates.extend(self.top.get(child) or range(self.lo[child], self.hi[child]))
+                child = self.next_sibling[child]
+            self.top[node] = tuple(heapq.nlargest(self.top_k, candidates, key=self.scores.__getitem__))
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.label)
+
+    def _ranked(self, node: int):
+        """Ids of the best phrases below ``node``, best first"""
+        ranked = self.top.get(node)
+        if ranked is None:
+            ranked = sorted(range(self.lo[node], self.hi[node]), key=self.scores.__getitem__, reverse=True)
+        return ranked
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """Best scored phrases starting with ``prefix``"""
+        if not self.phrases:
+            return []
+        node = 0
+        for depth, char in enumerate(prefix):
+            child = self.first_child[node]
+            if child == -1:
+                phrase_id = self.lo[node]
+                if not self.phrases[phrase_id].startswith(prefix):
+                    return []
+                break
+            code = ord(char)
+            while child != -1 and self.label[child] != code:
+                child = self.next_sibling[child]
+            if child == -1:
+                return []
+            node = child
+        return [(self.phrases[i], self.scores[i]) for i in self._ranked(node)[:limit]]
+
+    def fuzzy_complete(self, prefix: str, max_distance: int = 1, limit: int = 10) -> List[Tuple[str, float]]:
+        """Phrases with a prefix within ``max_distance`` edits of ``prefix``
+
+        Walks the trie carrying one row of the Levenshtein matrix per node, the
+        automaton state for "prefix versus the path to this node". A node whose
+        last cell is within the distance matches, and its ranked phrases are the
+        best below it. Subtrees are pruned once every cell of the row exceeds the
+        distance. Closer matches rank first, then higher scores.
+        """
+        if not self.phrases:
+            return []
+        codes = [ord(char) for char in prefix]
+        best = {}
+
+        def step(row, code):
+            next_row = [row[0] + 1]
+            for j, expected in enumerate(codes):
+                next_row.append(min(next_row[j] + 1, row[j + 1] + 1, row[j] + (expected != code)))
+            return next_row
+
+        def collect(phrase_ids, distance):
+            for phrase_id in phrase_ids:
+                if best.get(phrase_id, max_distance + 1) > distance:
+                    best[phrase_id] = distance
+
+        stack = [(0, list(range(len(codes) + 1)))]
+        while stack:
+            node, row = stack.pop()
+            if row[-1] <= max_distance:
+                collect(self._ranked(node), row[-1])
+            child = self.first_child[node]
+            if child == -1:
+                phrase_id = self.lo[node]
+                distance = row[-1]
+                for char in self.phrases[phrase_id][self.depth[node]:]:
+                    row = step(row, ord(char))
+                    distance = min(distance, row[-1])
+                    if min(row) > max_distance:
+                        break
+                if distance <= max_distance:
+                    collect((phrase_id,), distance)
+                continue
+            while child != -1:
+                next_row = step(row, self.label[child])
+                if min(next_row) <= max_distance:
+                    stack.append((child, next_row))
+                child = self.next_sibling[child]
+        ranked = sorted(best, key=lambda i: (best[i], -self.scores[i]))
+        return [(self.phrases[i], self.scores[i]) for i in ranked[:limit]]
+
+
+def _common_prefix(a: str, b: str) -> int:
+    length = min(len(a), len(b))
+    for i in range(length):
+        if a[i] != b[i]:
+            return i
+    return length
+
+
+class AutocompleteEngine:
+    """In-process autocomplete served from a SuggestionTrie, without a Redis round trip
+
+    The trie is loaded from the ``<suggestions>:phrases`` sorted set that mirrors
+    the FT.SUG dictionary. Refreshes rebuild it whole rather than applying deltas,
+    since its sorted array layout cannot take inserts: when the suggestions
+    generation moves, which only suggestion writes and index promotions bump, a
+    replacement is built in a background thread at most every ``refresh_interval``
+    seconds and swapped in. The previous trie keeps answering meanwhile, so
+    completions may lag suggestion writes by one rebuild. ``suggestions`` returns
+    None, and the caller falls back to FT.SUGGET, only when no trie is loaded yet
+    (or the dictionary has no mirror) or the limit is above ``top_k``.
+    """
+
+    def __init__(self, redis_client, suggestions_key: str, generation, top_k: int = 50,
+                 max_distance: int = 1, refresh_interval: float = 5.0, scan_count: int = 5000):
+        self.redis_client = redis_client
+        self.suggestions_key = suggestions_key
+        self.generation = generation
+        self.top_k = top_k
+        self.max_distance = max_distance
+        self.refresh_interval = refresh_interval
+        self.scan_count = scan_count
+        self.trie = None
+        self._loaded_generation = None
+        self._last_refresh = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._stats = {'served': 0, 'fallbacks': 0, 'loads': 0, 'load_seconds': 0.0, 'loaded_at': None, 'last_error': None}
+
+    def suggestions(self, prefix: str, limit: int = 10, fuzzy: bool = False, with_scores: bool = False, generation: int = None):
+        """Completions in the shape of SuggestionService.get_suggestions, None when the caller must ask Redis
+
+        Callers on an event loop pass the ``generation`` they read asynchronously,
+        otherwise it is read here.
+        """
+        self._maybe_refresh(self.generation.current() if generation is None else generation)
+        trie = self.trie
+        if trie is None or limit > self.top_k:
+            self._stats['fallbacks'] += 1
+            return None
+        prefix = prefix.lower()
+        if fuzzy:
+            matches = trie.fuzzy_complete(prefix, self.max_distance, limit)
+        else:
+            matches = trie.complete(prefix, limit)
+        self._stats['served'] += 1
+        if with_scores:
+            return [{'suggestion': phrase, 'score': score} for phrase, score in matches]
+        return [phrase for phrase, _ in matches]
+
+    def _maybe_refresh(self, generation: int):
+        if generation == self._loaded_generation or self._refreshing:
+            return
+        now = time.monotonic()
+        if self._last_refresh and now - self._last_refresh < self.refresh_interval:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            self._last_refresh = now
+        threading.Thread(target=self._refresh, args=(generation,), name='autocomplete-refresh', daemon=True).start()
+
+    def _refresh(self, generation: int):
+        try:
+            self.load(generation)
+        except Exception as e:
+            self._stats['last_error'] = str(e)
+            logging.error(f"Error loading autocomplete trie: {e}")
+        finally:
+            self._refreshing = False
+
+    def load(self, generation: int = None) -> bool:
+        """Build a trie from the phrases mirror and swap it in, False when there is no mirror to load"""
+        started = time.perf_counter()
+        phrases_key = phrases_key_for(self.suggestions_key)
+        if not self.redis_client.exists(phrases_key):
+            suggestions = int(self.redis_client.execute_command('FT.SUGLEN', self.suggestions_key) or 0)
+            if suggestions:
+                logging.warning(f"Suggestion dictionary '{self.suggestions_key}' has no {phrases_key} mirror, "
+                                "autocomplete stays on FT.SUGGET until the index is rebuilt")
+                self.trie = None
+                self._loaded_generation = generation
+                return False
+        phrases = self.redis_client.zscan_iter(phrases_key, count=self.scan_count)
+        trie = SuggestionTrie(((phrase, float(score)) for phrase, score in phrases), self.top_k)
+        self.trie = trie
+        self._loaded_generation = generation
+        elapsed = time.perf_counter() - started
+        self._stats['loads'] += 1
+        self._stats['load_seconds'] = round(elapsed, 3)
+        self._stats['loaded_at'] = time.time()
+        self._stats['last_error'] = None
+        logging.info(f"Loaded autocomplete trie: {len(trie)} phrases, {trie.node_count} nodes in {elapsed:.3f}s")
+        return True
+
+    def get_stats(self) -> Dict:
+        trie = self.trie
+        stats = dict(self._stats)
+        stats.update({
+            'enabled': True,
+            'ready': trie is not None,
+            'phrases': len(trie) if trie else 0,
+            'nodes': trie.node_count if trie else 0,
+            'top_k': self.top_k,
+            'generation': self._loaded_generation
+        })
+        return stats
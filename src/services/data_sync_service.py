@@ -1,22 +1,69 @@
+import itertools
 import logging
-from typing import Dict
+import os
+import queue
+import threading
+from typing import Dict, Iterable, List
 from src.services import postgres_service
+from src.services.job_service import job_service, JobContext, INDEX_LOCK
 import time
 
+_STOP = object()
+WATERMARK_KEY = "search:sync:watermark"
+
 class DataSyncService:
     """Service to sync data from PostgreSQL to Redis search index"""
     
     def __init__(self):
         self.postgres = postgres_service
-   
+        self._redis_search = None
+        self.workers = int(os.getenv('SYNC_WORKERS', 4))
+        self.queue_size = int(os.getenv('SYNC_QUEUE_SIZE', 8))
+        self.status_max_staleness = float(os.getenv('SYNC_STATUS_MAX_STALENESS', 30))
+        self._status_snapshot = None
+        self._status_lock = threading.Lock()
+        job_service.register('sync_postgres', self.run_sync_job, lock=INDEX_LOCK)
+    
+    @property
+    def redis_search(self):
+        """Shared RediSearch facade, imported lazily to avoid a circular import with src.core"""
+        if self._redis_search is None:
+            from src.core import redisearch_service
+            self._redis_search = redisearch_service
+        return self._redis_search
+    
+    def submit_sync_job(self, batch_size: int = 100, clear_existing: bool = True, workers: int = None, queue_size: int = None) -> Dict:
+        """Run ``sync_all_products`` as a background job, returns the job"""
+        return job_service.submit('sync_postgres', {
+            'batch_size': batch_size,
+            'clear_existing': clear_existing,
+            'workers': workers or self.workers,
+            'queue_size': queue_size or self.queue_size
+        })
+    
+    def run_sync_job(self, job: JobContext) -> Dict:
+        params = job.params
+        return self.sync_all_products(params['batch_size'], params['clear_existing'], params['workers'], params['queue_size'], job)
     
-    def sync_all_products(self, batch_size: int = 100, clear_existing: bool = True) -> Dict:
+    def sync_all_products(self, batch_size: int = 100, clear_existing: bool = True, workers: int = None, queue_size: int = None,
+                          job: JobContext = None) -> Dict:
         """
         Sync all products from PostgreSQL to Redis search index
         
+        A reader thread prefetches batches from PostgreSQL into a bounded queue while a
+        pool of worker threads transforms them and pipelines the writes to Redis.
+        
+        Each run starts a new sync generation and stamps every product it reads with
+        it. When every product was read and indexed, documents left on an older
+        generation, i.e. deleted from PostgreSQL, are swept in the background.
+        
         Args:
             batch_size: Number of products to process in each batch
             clear_existing: Whether to clear existing Redis data first
+            workers: Number of indexing worker threads (defaults to SYNC_WORKERS)
+            queue_size: Maximum number of batches buffered between reader and workers
+            job: Background job to report progress to; a job with a checkpoint
+                resumes after its last committed product id without clearing
             
         Returns:
             Dictionary with sync results
@@ -27,6 +74,7 @@ class DataSyncService:
             'total_products': 0,
             'indexed_products': 0,
             'failed_products': 0,
+            'skipped_products': 0,
             'errors': [],
             'duration_seconds': 0
         }
@@ -36,48 +84,59 @@ class DataSyncService:
                 results['errors'].append('PostgreSQL connection failed')
                 return results
             
-            if clear_existing:
+            checkpoint = job.checkpoint if job else None
+            if clear_existing and not checkpoint:
                 logging.info("Clearing existing Redis search data...")
                 self.redis_search.clear_all_data()
+                if job:
+                    job.heartbeat()
             
-            total_count = self.postgres.get_products_count()
-            results['total_products'] = total_count
-            if total_count == 0:
-                results['errors'].append('No images found in PostgreSQL table')
+            workers = workers or self.workers
+            queue_size = queue_size or self.queue_size
+            if checkpoint:
+                watermark = checkpoint.get('watermark')
+                # Checkpoints written before sync generations existed resume without stamping or sweeping
+                generation = checkpoint.get('sync_generation')
+                logging.info(f"Resuming sync after product id {checkpoint['after_id']}")
+            else:
+                watermark = self.postgres.get_change_watermark()
+                generation = self.redis_search.sync_generation.next()
+            if job:
+                job.heartbeat()
+                job.set_total(self.postgres.get_products_count(exact=False))
+            logging.info(f"Starting pipelined sync: batch size {batch_size}, {workers} workers, queue size {queue_size}")
+            self.redis_search.ensure_index()
+            batches = self.postgres.iter_products(batch_size, checkpoint['after_id'] if checkpoint else None)
+            stats = self._run_sync_pipeline(batches, workers, queue_size, job, {'watermark': watermark, 'sync_generation': generation},
+                                            sync_generation=generation)
+            
+            results['total_products'] = stats['total_products']
+            results['indexed_products'] = stats['indexed']
+            results['failed_products'] = stats['failed']
+            results['skipped_products'] = stats['skipped']
+            results['unchanged_products'] = stats['unchanged']
+            results['updated_products'] = stats['updated']
+            results['inserted_products'] = stats['inserted']
+            results['errors'].extend(stats['errors'])
+            results['pipeline'] = stats['pipeline']
+            if stats['cancelled']:
+                results['cancelled'] = True
+                results['duration_seconds'] = round(time.time() - start_time, 2)
+                logging.info(f"Sync cancelled after {results['indexed_products']} products")
+                return results
+            if stats['indexed'] > stats['unchanged']:
+                results['prefix_table'] = self.redis_search.materialize_prefixes()
+            if stats['total_products'] == 0 and not stats['errors']:
+                results['errors'].append('No products found in PostgreSQL table')
                 return results
-            logging.info(f"Starting sync of {total_count} images...")
-            indexed_count = 0
-            failed_count = 0
-            for batch_num, batch in enumerate(self.postgres.fetch_products_batch(batch_size), 1):
-                logging.info(f"Processing batch {batch_num} ({len(batch)} images)")
-                for product in batch:
-                    try:
-                        search_doc = self._convert_product_to_search_doc(product)
-                        success = self.redis_search.index_document(
-                            doc_id=search_doc['id'],
-                            name=search_doc['name'],
-                            price=search_doc['price'],
-                            image=search_doc['image'],
-                            metadata=search_doc['metadata']
-                        )
-                        if success:
-                            indexed_count += 1
-                        else:
-                            failed_count += 1
-                            logging.warning(f"Failed to index image {product.get('name')}")
-                    except Exception as e:
-                        failed_count += 1
-                        error_msg = f"Error processing image {product.get('name', 'unknown')}: {str(e)}"
-                        logging.error(error_msg)
-                        results['errors'].append(error_msg)
-                if batch_num % 10 == 0:
-                    logging.info(f"Progress: {indexed_count}/{total_count} images indexed")
-            results['indexed_products'] = indexed_count
-            results['failed_products'] = failed_count
-            results['success'] = indexed_count > 0
+            results['success'] = results['indexed_products'] > 0 and not stats['read_failed']
+            if results['success'] and watermark:
+                self._save_watermark(watermark)
+            if results['success'] and not stats['failed'] and generation is not None:
+                results['sweep'] = self._schedule_sweep(generation)
             end_time = time.time()
             results['duration_seconds'] = round(end_time - start_time, 2)
-            logging.info(f"Sync completed: {indexed_count} indexed, {failed_count} failed, {results['duration_seconds']}s")
+            logging.info(f"Sync completed: {results['indexed_products']} indexed, {results['failed_products']} failed, {results['skipped_products']} skipped, {results['duration_seconds']}s")
             
         except Exception as e:
             error_msg = f"Sync failed with error: {str(e)}"
@@ -86,6 +145,260 @@ class DataSyncService:
         
         return results
     
+    def sync_incremental(self, batch_size: int = 100, workers: int = None, queue_size: int = None) -> Dict:
+        """
+        Re-index only the rows that changed since the last persisted watermark.
+        
+        The watermark only advances when every changed row was indexed, so a failed
+        run is retried in full by the next call.
+        """
+        start_time = time.time()
+        results = {
+            'success': False,
+            'changed': False,
+            'total_products': 0,
+            'indexed_products': 0,
+            'failed_products': 0,
+            'skipped_products': 0,
+            'errors': [],
+            'watermark': None,
+            'duration_seconds': 0
+        }
+        
+        try:
+            watermark = self._load_watermark()
+            results['watermark'] = watermark
+            if not self.postgres.has_changes_since(watermark):
+                results['success'] = True
+                results['duration_seconds'] = round(time.time() - start_time, 3)
+                return results
+            
+            results['changed'] = True
+            self.redis_search.ensure_index()
+            latest = {}
+            
+            def changed_batches():
+                for batch, batch_watermark in self.postgres.iter_products_changed_since(watermark, batch_size):
+                    latest['watermark'] = batch_watermark
+                    yield batch
+            
+            stats = self._run_sync_pipeline(changed_batches(), workers or self.workers, queue_size or self.queue_size,
+                                            sync_generation=self.redis_search.sync_generation.current())
+            results['total_products'] = stats['total_products']
+            results['indexed_products'] = stats['indexed']
+            results['failed_products'] = stats['failed']
+            results['skipped_products'] = stats['skipped']
+            results['unchanged_products'] = stats['unchanged']
+            results['updated_products'] = stats['updated']
+            results['inserted_products'] = stats['inserted']
+            results['errors'].extend(stats['errors'])
+            results['pipeline'] = stats['pipeline']
+            if stats['indexed'] > stats['unchanged']:
+                results['prefix_table'] = self.redis_search.materialize_prefixes()
+            results['success'] = not stats['read_failed'] and stats['failed'] == 0
+            if results['success'] and latest:
+                self._save_watermark(latest['watermark'])
+                results['watermark'] = latest['watermark']
+            results['duration_seconds'] = round(time.time() - start_time, 3)
+            logging.info(f"Incremental sync completed: {results['indexed_products']} indexed, {results['failed_products']} failed, {results['skipped_products']} skipped, {results['duration_seconds']}s")
+            
+        except Exception as e:
+            error_msg = f"Incremental sync failed with error: {str(e)}"
+            logging.error(error_msg)
+            results['errors'].append(error_msg)
+        
+        return results
+    
+    def _schedule_sweep(self, generation: int) -> Dict:
+        """Start the background sweep of documents older than ``generation`` if there are any"""
+        stale = self.redis_search.sync_generation.stale_count(generation)
+        if stale:
+            self.redis_search.sweep_stale_documents(generation)
+            logging.info(f"Sweeping {stale} documents not seen by sync generation {generation}")
+        return {'generation': generation, 'stale_documents': stale, 'scheduled': bool(stale)}
+    
+    def get_pending_changes(self) -> Dict:
+        """Cheap check for rows changed since the last sync, suitable for frequent polling"""
+        try:
+            watermark = self._load_watermark()
+            return {
+                'has_changes': self.postgres.has_changes_since(watermark),
+                'watermark': watermark
+            }
+        except Exception as e:
+            return {'error': f"Error checking for changes: {str(e)}"}
+    
+    def _load_watermark(self) -> Dict:
+        stored = self.redis_search.redis_client.hgetall(WATERMARK_KEY)
+        if not stored:
+            return {}
+        return {'id': stored.get('id') or None, 'updated_at': stored.get('updated_at') or None}
+    
+    def _save_watermark(self, watermark: Dict):
+        self.redis_search.redis_client.hset(WATERMARK_KEY, mapping={
+            'id': watermark.get('id') or '',
+            'updated_at': watermark.get('updated_at') or '',
+            'synced_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+        })
+    
+    def _run_sync_pipeline(self, batches: Iterable[List[Dict]], workers: int, queue_size: int,
+                           job: JobContext = None, checkpoint_extra: Dict = None, sync_generation: int = None) -> Dict:
+        """
+        Run the reader -> indexing workers pipeline over a stream of product batches.
+        
+        Bounded queues between the stages provide backpressure: the reader blocks
+        when workers fall behind and workers idle when PostgreSQL is the bottleneck.
+        
+        With a ``job`` the reader stops once the job is cancelled, and the last product
+        id up to which every batch was indexed without failures is committed as the
+        job checkpoint, together with ``checkpoint_extra`` and the totals up to that id.
+        Batches finish out of order across workers, so later batches that already
+        completed are indexed again by a resumed run. Products are stamped with
+        ``sync_generation`` when given.
+        """
+        batch_queue = queue.Queue(maxsize=queue_size)
+        result_queue = queue.Queue(maxsize=queue_size)
+        timings = {'read': 0.0, 'read_blocked': 0.0, 'index': 0.0, 'worker_idle': 0.0}
+        depth = {'samples': 0, 'total': 0, 'max': 0}
+        timings_lock = threading.Lock()
+        reader_errors = []
+        cancelled = []
+        
+        def reader():
+            iterator = iter(batches)
+            try:
+                for seq in itertools.count():
+                    if job is not None and job.cancelled:
+                        cancelled.append(True)
+                        break
+                    started = time.perf_counter()
+                    batch = next(iterator, None)
+                    timings['read'] += time.perf_counter() - started
+                    if batch is None:
+                        break
+                    started = time.perf_counter()
+                    batch_queue.put((seq, batch))
+                    timings['read_blocked'] += time.perf_counter() - started
+                    queued = batch_queue.qsize()
+                    depth['samples'] += 1
+                    depth['total'] += queued
+                    depth['max'] = max(depth['max'], queued)
+            except Exception as e:
+                logging.error(f"Sync reader failed: {e}")
+                reader_errors.append(f"Reading from PostgreSQL failed: {e}")
+            finally:
+                for _ in range(workers):
+                    batch_queue.put(_STOP)
+        
+        def worker():
+            while True:
+                started = time.perf_counter()
+                batch = batch_queue.get()
+                idle = time.perf_counter() - started
+                if batch is _STOP:
+                    result_queue.put(_STOP)
+                    return
+                seq, batch = batch
+                started = time.perf_counter()
+                try:
+                    batch_stats = self.redis_search.index_batch(batch, sync_generation=sync_generation)
+                except Exception as e:
+                    logging.error(f"Sync worker failed on batch: {e}")
+                    batch_stats = {'products': len(batch), 'indexed': 0, 'skipped': 0, 'unchanged': 0, 'updated': 0, 'inserted': 0, 'failed': len(batch),
+                                   'round_trips': 0, 'errors': [f"Batch of {len(batch)} products failed: {e}"]}
+                with timings_lock:
+                    timings['worker_idle'] += idle
+                    timings['index'] += time.perf_counter() - started
+                batch_stats['seq'] = seq
+                batch_stats['last_id'] = batch[-1].get('id')
+                result_queue.put(batch_stats)
+        
+        started = time.perf_counter()
+        threads = [threading.Thread(target=reader, name='sync-reader', daemon=True)]
+        threads += [threading.Thread(target=worker, name=f'sync-worker-{i}', daemon=True) for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        
+        counters = ('total_products', 'indexed', 'skipped', 'unchanged', 'updated', 'inserted', 'failed')
+        stats = dict.fromkeys(counters, 0)
+        stats['errors'] = []
+        checkpoint = job.checkpoint if job is not None else None
+        if checkpoint:
+            stats.update(checkpoint['totals'])
+            stats['errors'] = list(stats['errors'])
+        committed = {'after_id': checkpoint['after_id'] if checkpoint else None, 'totals': dict(stats, errors=list(stats['errors']))}
+        finished = {}
+        next_seq = 0
+        blocked = False
+        
+        def commit_checkpoint():
+            totals = dict(committed['totals'], errors=committed['totals']['errors'][-100:])
+            job.update(stats['total_products'], dict(checkpoint_extra or {}, after_id=committed['after_id'], totals=totals))
+        
+        batches_done = 0
+        round_trips = 0
+        finished_workers = 0
+        while finished_workers < workers:
+            batch_stats = result_queue.get()
+            if batch_stats is _STOP:
+                finished_workers += 1
+                continue
+            batches_done += 1
+            round_trips += batch_stats['round_trips']
+            stats['total_products'] += batch_stats['products']
+            for counter in counters[1:]:
+                stats[counter] += batch_stats[counter]
+            stats['errors'].extend(batch_stats['errors'])
+            if batches_done % 10 == 0:
+                logging.info(f"Progress: {stats['indexed']} products indexed in {batches_done} batches")
+            if job is None:
+                continue
+            finished[batch_stats['seq']] = batch_stats
+            while not blocked and next_seq in finished:
+                done = finished.pop(next_seq)
+                if done['failed']:
+                    blocked = True
+                    break
+                committed['after_id'] = done['last_id']
+                totals = committed['totals']
+                totals['total_products'] += done['products']
+                for counter in counters[1:-1]:
+                    totals[counter] += done[counter]
+                totals['errors'].extend(done['errors'])
+                next_seq += 1
+            if job.checkpoint_due():
+                commit_checkpoint()
+            else:
+                job.update(stats['total_products'])
+        for thread in threads:
+            thread.join()
+        if job is not None:
+            commit_checkpoint()
+        stats['errors'].extend(reader_errors)
+        stats['read_failed'] = bool(reader_errors)
+        stats['cancelled'] = bool(cancelled)
+        
+        elapsed = time.perf_counter() - started
+        stats['pipeline'] = {
+            'workers': workers,
+            'queue_size': queue_size,
+            'batches': batches_done,
+            'round_trips': round_trips,
+            'docs_per_second': round(stats['indexed'] / elapsed, 1) if elapsed > 0 else 0,
+            'queue_depth': {
+                'max': depth['max'],
+                'avg': round(depth['total'] / depth['samples'], 2) if depth['samples'] else 0
+            },
+            'stage_seconds': {
+                'elapsed': round(elapsed, 3),
+                'read': round(timings['read'], 3),
+                'read_blocked': round(timings['read_blocked'], 3),
+                'index': round(timings['index'], 3),
+                'worker_idle': round(timings['worker_idle'], 3)
+            }
+        }
+        return stats
+    
     def _convert_product_to_search_doc(self, product: Dict) -> Dict:
         """
         Convert a product record to a search document format for image search.
@@ -147,21 +460,44 @@ class DataSyncService:
                 'message': f"Error syncing product {product_id}: {str(e)}"
             }
     
-    def get_sync_status(self) -> Dict:
-        """Get current sync status and statistics"""
+    def get_sync_status(self, max_staleness: float = None, exact: bool = False) -> Dict:
+        """
+        Get current sync status and statistics
+        
+        A snapshot younger than ``max_staleness`` seconds (SYNC_STATUS_MAX_STALENESS by
+        default) is served as is. PostgreSQL counts are planner estimates unless ``exact``.
+        """
+        max_staleness = self.status_max_staleness if max_staleness is None else max_staleness
+        snapshot = self._status_snapshot
+        if not exact and snapshot and time.monotonic() - snapshot[0] <= max_staleness:
+            return dict(snapshot[1], snapshot_age_seconds=round(time.monotonic() - snapshot[0], 3))
+        
+        with self._status_lock:
+            snapshot = self._status_snapshot
+            if not exact and snapshot and time.monotonic() - snapshot[0] <= max_staleness:
+                return dict(snapshot[1], snapshot_age_seconds=round(time.monotonic() - snapshot[0], 3))
+            status = self._build_sync_status(exact)
+            if 'error' not in status and not exact:
+                self._status_snapshot = (time.monotonic(), status)
+        return dict(status, snapshot_age_seconds=0)
+    
+    def _build_sync_status(self, exact: bool) -> Dict:
         try:
-            postgres_count = self.postgres.get_products_count()
-            postgres_info = self.postgres.get_table_info()
+            postgres_info = self.postgres.get_table_info(exact)
+            connected = 'error' not in postgres_info
+            postgres_count = postgres_info.get('total_rows', 0)
             
             redis_stats = self.redis_search.get_stats()
             
             return {
                 'postgresql': {
-                    'connected': self.postgres.test_connection(),
+                    'connected': connected,
                     'total_products': postgres_count,
+                    'count_exact': exact,
                     'table_info': postgres_info
                 },
                 'redis': redis_stats,
+                'sync_generation': self.redis_search.sync_generation.get_status(),
                 'sync_health': {
                     'redis_vs_postgres': {
                         'postgres_count': postgres_count,
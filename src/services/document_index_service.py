@@ -1,36 +1,77 @@
+import hashlib
 import json
 import logging
+import os
+import time
 from datetime import datetime
 from typing import List, Dict
 from src.utils import TextProcessor
 
+FINGERPRINT_FIELD = 'fingerprint'
+UNFINGERPRINTED_FIELDS = ('indexed_at', FINGERPRINT_FIELD)
+
 
 class DocumentIndexService:
-    def __init__(self, redis_client, documents_key: str = "search:documents", inverted_index_key: str = "search:inverted_index"):
+    def __init__(self, redis_client, documents_key: str = "search:documents", inverted_index_key: str = "search:inverted_index", generation=None):
         self.redis_client = redis_client
+        self.generation = generation
         self.documents_key = documents_key
         self.inverted_index_key = inverted_index_key
         self.text_processor = TextProcessor()
+        self.skip_unchanged = os.getenv('INDEX_SKIP_UNCHANGED', 'true').lower() == 'true'
+
+    def build_document(self, doc_id: str, name: str, price: float, image: str, url: str, metadata: Dict = None) -> Dict:
+        """Build the RediSearch hash mapping for a document, including its content fingerprint"""
+        metadata = metadata if isinstance(metadata, dict) else {}
+        tags = metadata.get('tags', [])
+        document = {
+            'id': doc_id,
+            'name': name,
+            'price': price,
+            'image': image or '',
+            'url': url or '',
+            'metadata.name': metadata.get('name', name),
+            'metadata.tags': ', '.join(tags) if isinstance(tags, list) else str(tags or ''),
+            'metadata.brand': metadata.get('brand', ''),
+            'indexed_at': datetime.now().isoformat()
+        }
+        document[FINGERPRINT_FIELD] = self.fingerprint(document)
+        return document
+
+    @staticmethod
+    def fingerprint(document: Dict) -> str:
+        """Compact hash of the indexed fields as Redis stores them, ignoring ``indexed_at``"""
+        content = '\x1f'.join(
+            f"{field}\x1e{value}" for field, value in sorted(document.items()) if field not in UNFINGERPRINTED_FIELDS
+        )
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=8).hexdigest()
+
+    def document_key(self, doc_id: str) -> str:
+        return f"{self.documents_key}:{doc_id}"
+
+    def queue_fingerprints(self, pipe, doc_ids: List[str]):
+        """Queue reading the fingerprints of the stored documents, one HGET each, None for missing ones"""
+        for doc_id in doc_ids:
+            pipe.hget(self.document_key(doc_id), FINGERPRINT_FIELD)
+
+    def queue_document(self, pipe, doc_id: str, name: str, price: float, image: str, url: str, metadata: Dict = None):
+        """Queue a document HSET on a Redis pipeline without executing it"""
+        self.queue_mapping(pipe, self.build_document(doc_id, name, price, image, url, metadata))
+
+    def queue_mapping(self, pipe, document: Dict):
+        """Queue the HSET of a document built with ``build_document``"""
+        pipe.hset(self.document_key(document['id']), mapping=document)
 
     def index_document(self, doc_id: str, name: str, price: float, image:str , url:str, metadata: Dict = None) -> bool:
         """Index document using RediSearch native indexing"""
         try:
-            document = {
-                'id':doc_id,
-                'name': name,
-                'price': price,
-                'image': image,
-                'url' : url,
-                'metadata.name': metadata.get('name', name),
-                'metadata.tags': ', '.join(metadata.get('tags', [])) if isinstance(metadata.get('tags'), list) else str(metadata.get('tags', '')),
-                'metadata.brand': metadata.get('brand', ''),
-                'indexed_at': datetime.now().isoformat()
-            }
-            
-            self.redis_client.hset(
-                f"{self.documents_key}:{doc_id}",
-                mapping=document
-            )
+            pipe = self.redis_client.pipeline(transaction=False)
+            self.queue_document(pipe, doc_id, name, price, image, url, metadata)
+            if self.generation:
+                self.generation.queue_bump(pipe)
+            pipe.execute()
+            if self.generation:
+                self.generation.invalidate()
             
             logging.info(f"Successfully indexed document with RediSearch: {doc_id}")
             return True
@@ -39,37 +80,48 @@ class DocumentIndexService:
             logging.error(f"Error indexing document {doc_id}: {e}")
             return False
 
-    def clear_all_data(self) -> bool:
-        """Clear all indexed data including RediSearch index"""
-        try:
-            keys_to_delete = []
-            
-            for _ in self.redis_client.scan_iter(match=f"{self.documents_key}:*"):
-                keys_to_delete.append(_)
-            
-            if keys_to_delete:
-                self.redis_client.delete(*keys_to_delete)
-            
-            try:
-                self.redis_client.execute_command('FT.DROPINDEX', 'product_index', 'DD')
-                logging.info("Dropped RediSearch index")
-            except Exception as e:
-                logging.warning(f"Could not drop RediSearch index (may not exist): {e}")
-            
-            logging.info(f"Cleared {len(keys_to_delete)} keys from Redis")
-            return True
-            
-        except Exception as e:
-            logging.error(f"Error clearing data: {e}")
-            return False
+    def delete_documents(self, chunk_size: int = 500, throttle_seconds: float = 0.0, progress: Dict = None, cancel_event=None) -> int:
+        """Stream-delete every document hash under this service's key prefix
+        
+        Keys are scanned page by page and removed with UNLINK in chunks of at most
+        ``chunk_size``, so memory is reclaimed off the Redis main thread and no single
+        command blocks it. ``throttle_seconds`` is slept between chunks and ``progress``,
+        if given, is updated in place. Returns the number of keys deleted.
+        """
+        progress = progress if progress is not None else {}
+        progress.update({'scanned': 0, 'deleted': 0, 'chunks': 0})
+        chunk = []
+        
+        def flush():
+            progress['deleted'] += self.redis_client.unlink(*chunk)
+            progress['chunks'] += 1
+            chunk.clear()
+            if throttle_seconds:
+                time.sleep(throttle_seconds)
+        
+        for key in self.redis_client.scan_iter(match=f"{self.documents_key}:*", count=chunk_size):
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            chunk.append(key)
+            progress['scanned'] += 1
+            if len(chunk) >= chunk_size:
+                flush()
+                if progress['chunks'] % 100 == 0:
+                    logging.info(f"Teardown of {self.documents_key}: {progress['deleted']} keys deleted")
+        if chunk:
+            flush()
+        return progress['deleted']
 
-    def get_document_count(self) -> int:
-        """Get total document count"""
+    def get_document_count(self, index_name: str = "product_index") -> int:
+        """Get total document count from the index's num_docs, an O(1) lookup"""
         try:
-            count = 0
-            for _ in self.redis_client.scan_iter(match=f"{self.documents_key}:*"):
-                count += 1
-            return count
+            info = self.redis_client.execute_command('FT.INFO', index_name)
+            return self.parse_num_docs(info)
         except Exception as e:
             logging.error(f"Error getting document count: {e}")
             return 0
+
+    @staticmethod
+    def parse_num_docs(info) -> int:
+        info = dict(zip(info[::2], info[1::2]))
+        return int(float(info.get('num_docs', 0)))
@@ -0,0 +1,153 @@
+import logging
+from typing import List, Dict
+from src.services.search_service import SearchService
+
+MAX_PRICE_BUCKETS = 100
+
+
+class FacetService:
+    """Brand, tag and price-bucket counts computed by FT.AGGREGATE next to the hits
+
+    Hits and facet aggregations of every planner variant go out in one pipeline;
+    the facets of the variant that produced the hits are returned. Whole responses
+    are cached in the query cache, so they are dropped when the index generation moves.
+    """
+
+    def __init__(self, redis_client, search_service: SearchService, cache=None):
+        self.redis_client = redis_client
+        self.search_service = search_service
+        self.cache = cache
+
+    @property
+    def index_name(self) -> str:
+        return self.search_service.index_name
+
+    def plan(self, query: str, limit: int = 10, facet_size: int = 10, price_bucket: float = 50.0,
+             fields: List[str] = None, ids_only: bool = False, options: Dict = None) -> Dict:
+        """Describe a faceted full-text search without running it, None for an empty query"""
+        plan = self.search_service.plan_full_text(query, limit, fields, ids_only, options)
+        if plan is None:
+            return None
+        plan['facet_size'] = facet_size
+        plan['price_bucket'] = price_bucket
+        if self.cache:
+            plan['cache_key'] = ('facets', plan['cache_key'], facet_size, price_bucket)
+        return plan
+
+    def faceted_search(self, query: str, limit: int = 10, facet_size: int = 10, price_bucket: float = 50.0,
+                       fields: List[str] = None, ids_only: bool = False, options: Dict = None) -> Dict:
+        try:
+            plan = self.plan(query, limit, facet_size, price_bucket, fields, ids_only, options)
+            if plan is None:
+                return self.empty_response()
+            cached = self.cached_response(plan)
+            if cached is not None:
+                return cached
+            responses = self._execute(plan)
+            if self.search_service.is_missing_index_reply(responses):
+                self.search_service.recover_missing_index()
+                responses = self._execute(plan)
+            return self.resolve(plan, responses)
+        except Exception as e:
+            logging.error(f"Error in faceted search: {e}")
+            return {'error': str(e)}
+
+    @staticmethod
+    def empty_response() -> Dict:
+        return {'results': [], 'total': 0, 'facets': {'brand': [], 'tags': [], 'price': []}}
+
+    def cached_response(self, plan: Dict):
+        if not plan['cache_key']:
+            return None
+        cached, plan['generation'] = self.cache.lookup(plan['cache_key'])
+        if cached is not None:
+            return dict(cached, cached=True)
+        return None
+
+    def _execute(self, plan: Dict) -> List:
+        pipe = self.redis_client.pipeline(transaction=False)
+        self.queue(pipe, plan)
+        return pipe.execute(raise_on_error=False)
+
+    def queue(self, pipe, plan: Dict) -> int:
+        """Queue hits plus the three facet aggregations for every variant, returns the number of commands"""
+        facet_size = str(plan['facet_size'])
+        bucket = plan['price_bucket']
+        for _, search_query in plan['variants']:
+            self.search_service.queue_search(pipe, plan, search_query)
+            pipe.execute_command(
+                'FT.AGGREGATE', self.index_name, search_query,
+                'LOAD', '1', '@metadata.brand',
+                'GROUPBY', '1', '@metadata.brand',
+                'REDUCE', 'COUNT', '0', 'AS', 'count',
+                'SORTBY', '2', '@count', 'DESC', 'MAX', facet_size
+            )
+            pipe.execute_command(
+                'FT.AGGREGATE', self.index_name, search_query,
+                'LOAD', '1', '@metadata.tags',
+                'APPLY', 'split(@metadata.tags, ",", " ")', 'AS', 'tag',
+                'GROUPBY', '1', '@tag',
+                'REDUCE', 'COUNT', '0', 'AS', 'count',
+                'SORTBY', '2', '@count', 'DESC', 'MAX', facet_size
+            )
+            pipe.execute_command(
+                'FT.AGGREGATE', self.index_name, search_query,
+                'APPLY', f'floor(@price / {bucket}) * {bucket}', 'AS', 'price_bucket',
+                'GROUPBY', '1', '@price_bucket',
+                'REDUCE', 'COUNT', '0', 'AS', 'count',
+                'SORTBY', '2', '@price_bucket', 'ASC', 'MAX', str(MAX_PRICE_BUCKETS)
+            )
+        return len(plan['variants']) * 4
+
+    def resolve(self, plan: Dict, responses: List) -> Dict:
+        """Hits and facets of the first variant with hits, cached unless a variant failed"""
+        response, failures = self.evaluate(plan, responses)
+        if plan['cache_key'] and 'generation' in plan and not failures:
+            self.cache.set(plan['cache_key'], response, plan['generation'])
+        return dict(response, cached=False)
+
+    def evaluate(self, plan: Dict, responses: List):
+        """Hits and facets of the first variant with hits without caching them, returns (response, failures)"""
+        response = self.empty_response()
+        failures = 0
+        chosen = 'none'
+        for position, (variant, search_query) in enumerate(plan['variants']):
+            hits, brands, tags, prices = responses[position * 4:position * 4 + 4]
+            if isinstance(hits, Exception):
+                logging.warning(f"facets query '{search_query}' failed: {hits}")
+                failures += 1
+                continue
+            if not hits or int(hits[0]) == 0:
+                continue
+            chosen = variant
+            response['results'] = self.search_service.parse_search_results(hits, plan['ids_only'])
+            response['total'] = int(hits[0])
+            response['facets'] = {
+                'brand': self._parse_counts(brands, 'metadata.brand'),
+                'tags': self._parse_counts(tags, 'tag'),
+                'price': [
+                    {'from': bucket['value'], 'to': bucket['value'] + plan['price_bucket'], 'count': bucket['count']}
+                    for bucket in self._parse_counts(prices, 'price_bucket', numeric=True)
+                ]
+            }
+            failures += sum(1 for reply in (brands, tags, prices) if isinstance(reply, Exception))
+            break
+
+        self.search_service.record_plan('facets', chosen)
+        return response, failures
+
+    @staticmethod
+    def _parse_counts(reply, field: str, numeric: bool = False) -> List[Dict]:
+        """Rows of a GROUPBY ... REDUCE COUNT reply as value/count pairs, empty values dropped"""
+        if isinstance(reply, Exception):
+            logging.warning(f"Facet aggregation on {field} failed: {reply}")
+            return []
+        counts = []
+        for row in reply[1:]:
+            pairs = iter(row)
+            row = dict(zip(pairs, pairs))
+            value = row.get(field)
+            if value in (None, ''):
+                continue
+            counts.append({'value': float(value) if numeric else value, 'count': int(row.get('count', 0))})
+        return counts
@@ -0,0 +1,74 @@
+import logging
+import threading
+import time
+
+GENERATION_KEY = "search:index:generation"
+SUGGESTIONS_GENERATION_KEY = "search:suggestions:generation"
+
+
+class IndexGeneration:
+    """Counter bumped on every index write or rebuild, used to invalidate derived caches
+
+    The current value is re-read from Redis at most once per ``check_interval``
+    seconds, so other processes observe a bump within that bound while local
+    bumps are visible immediately. ``current_async`` is the same read for code on
+    an event loop, through a ``redis.asyncio`` client.
+    """
+
+    def __init__(self, redis_client, key: str = GENERATION_KEY, check_interval: float = 1.0):
+        self.redis_client = redis_client
+        self.key = key
+        self.check_interval = check_interval
+        self._value = 0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> int:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._value
+        with self._lock:
+            if now - self._checked_at >= self.check_interval:
+                try:
+                    self._value = int(self.redis_client.get(self.key) or 0)
+                except Exception as e:
+                    logging.warning(f"Could not read index generation: {e}")
+                self._checked_at = now
+        return self._value
+
+    async def current_async(self, redis_client) -> int:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._value
+        # Claimed before awaiting, so concurrent requests keep the cached value meanwhile
+        self._checked_at = now
+        try:
+            value = int(await redis_client.get(self.key) or 0)
+        except Exception as e:
+            logging.warning(f"Could not read index generation: {e}")
+            return self._value
+        with self._lock:
+            self._value = value
+        return value
+
+    def bump(self) -> int:
+        try:
+            value = int(self.redis_client.incr(self.key))
+        except Exception as e:
+            logging.error(f"Could not bump index generation: {e}")
+            return self._value
+        self._observe(value)
+        return value
+
+    def queue_bump(self, pipe):
+        """Queue an increment on a pipeline, call ``invalidate`` once it has executed"""
+        pipe.incr(self.key)
+
+    def invalidate(self):
+        """Force the next ``current`` call to re-read the counter"""
+        self._checked_at = 0.0
+
+    def _observe(self, value: int):
+        with self._lock:
+            self._value = max(self._value, value)
+            self._checked_at = time.monotonic()
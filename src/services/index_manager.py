@@ -0,0 +1,211 @@
+import json
+import logging
+import os
+import threading
+from typing import Dict, List
+
+SCHEMA_VERSION = 2
+SCHEMA_VERSIONS_KEY = "search:index:schema_versions"
+FIELD_TYPES = ('TEXT', 'TAG', 'NUMERIC', 'NOINDEX')
+MEMORY_INFO_FIELDS = (
+    'inverted_sz_mb', 'offset_vectors_sz_mb', 'doc_table_size_mb', 'sortable_values_size_mb',
+    'key_table_size_mb', 'tag_overhead_sz_mb', 'text_overhead_sz_mb', 'total_index_memory_sz_mb'
+)
+
+# Declarative index schema. ``type`` is TEXT, TAG, NUMERIC or NOINDEX; NOINDEX fields
+# stay in the document hash and are returned with results but are not indexed.
+# Optional flags: ``sortable``, ``nostem``, ``weight`` (TEXT) and ``separator`` (TAG).
+DEFAULT_INDEX_SCHEMA = [
+    {'field': 'id', 'type': 'TAG', 'sortable': True},
+    {'field': 'name', 'type': 'TEXT', 'weight': 3.0},
+    {'field': 'price', 'type': 'NUMERIC', 'sortable': True},
+    {'field': 'image', 'type': 'NOINDEX'},
+    {'field': 'url', 'type': 'NOINDEX'},
+    {'field': 'metadata.name', 'type': 'TEXT', 'weight': 2.0},
+    {'field': 'metadata.tags', 'type': 'TAG', 'separator': ','},
+    {'field': 'metadata.brand', 'type': 'TAG'},
+    {'field': 'metadata.price', 'type': 'NUMERIC', 'sortable': True},
+]
+
+
+def load_index_schema(overrides: str = None) -> List[Dict]:
+    """The default schema with per-field overrides from a JSON object, e.g. SEARCH_INDEX_SCHEMA
+
+    ``{"metadata.brand": {"type": "TEXT", "nostem": true}}`` changes one field, a field
+    that is not in the defaults is appended. Invalid overrides are logged and ignored.
+    """
+    schema = [dict(field) for field in DEFAULT_INDEX_SCHEMA]
+    overrides = overrides if overrides is not None else os.getenv('SEARCH_INDEX_SCHEMA')
+    if not overrides:
+        return schema
+    try:
+        changes = json.loads(overrides)
+        for name, spec in changes.items():
+            if spec.get('type', 'TEXT').upper() not in FIELD_TYPES:
+                raise ValueError(f"{name}: type must be one of {', '.join(FIELD_TYPES)}")
+        by_name = {field['field']: field for field in schema}
+        for name, spec in changes.items():
+            spec = dict(spec, field=name)
+            if 'type' in spec:
+                spec['type'] = spec['type'].upper()
+            if name in by_name:
+                by_name[name].update(spec)
+            else:
+                schema.append(dict({'type': 'TEXT'}, **spec))
+    except (ValueError, AttributeError) as e:
+        logging.error(f"Ignoring invalid SEARCH_INDEX_SCHEMA: {e}")
+        return [dict(field) for field in DEFAULT_INDEX_SCHEMA]
+    return schema
+
+
+def schema_field_args(field: Dict) -> List[str]:
+    """FT.CREATE arguments for one declared field, empty for NOINDEX fields"""
+    if field['type'] == 'NOINDEX':
+        return []
+    args = [field['field'], field['type']]
+    if field['type'] == 'TEXT':
+        if field.get('nostem'):
+            args.append('NOSTEM')
+        if 'weight' in field:
+            args.extend(['WEIGHT', str(field['weight'])])
+    if field['type'] == 'TAG' and field.get('separator'):
+        args.extend(['SEPARATOR', field['separator']])
+    if field.get('sortable'):
+        args.append('SORTABLE')
+    return args
+
+
+class IndexManager:
+    """Owns the versioned index schema and the cached existence state of the live index
+
+    Existence is checked once and then assumed; callers report a missing index
+    through ``mark_missing`` when a command fails with an unknown-index error,
+    and the next ``ensure_index`` recreates it.
+    """
+
+    def __init__(self, redis_client, index_name: str = "product_index", documents_key: str = "search:documents"):
+        self.redis_client = redis_client
+        self.index_name = index_name
+        self.documents_key = documents_key
+        self._exists = False
+        self._lock = threading.Lock()
+        self.schema = load_index_schema()
+        self.schema_status = {}
+
+    @staticmethod
+    def is_missing_index_error(error: Exception) -> bool:
+        message = str(error).lower()
+        return 'unknown index' in message or 'no such index' in message
+
+    def schema_args(self) -> List[str]:
+        args = []
+        for field in self.schema:
+            args.extend(schema_field_args(field))
+        return args
+
+    def create_index(self, index_name: str, documents_key: str) -> bool:
+        """Create an index over ``documents_key``, returns False if it already existed"""
+        try:
+            self.redis_client.execute_command(
+                'FT.CREATE', index_name,
+                'ON', 'HASH',
+                'PREFIX', '1', f"{documents_key}:",
+                'SCHEMA',
+                *self.schema_args()
+            )
+        except Exception as e:
+            if 'already exists' in str(e).lower():
+                return False
+            raise
+        self.redis_client.hset(SCHEMA_VERSIONS_KEY, index_name, SCHEMA_VERSION)
+        logging.info(f"Created RediSearch index: {index_name} (schema v{SCHEMA_VERSION})")
+        return True
+
+    def ensure_index(self):
+        """Make sure the live index exists, costing a round trip only when its state is unknown"""
+        if self._exists:
+            return
+        with self._lock:
+            if self._exists:
+                return
+            try:
+                self.redis_client.execute_command('FT.INFO', self.index_name)
+            except Exception as e:
+                if not self.is_missing_index_error(e):
+                    logging.error(f"Could not check RediSearch index {self.index_name}: {e}")
+                    return
+                try:
+                    self.create_index(self.index_name, self.documents_key)
+                except Exception as create_error:
+                    logging.error(f"Failed to create RediSearch index: {create_error}")
+                    return
+            self._exists = True
+
+    def mark_missing(self):
+        self._exists = False
+
+    def check_schema(self) -> Dict:
+        """Compare the live index against the declared schema, meant to run at startup"""
+        try:
+            info = self.redis_client.execute_command('FT.INFO', self.index_name)
+        except Exception as e:
+            self.schema_status = {'index_exists': False, 'error': str(e)}
+            return self.schema_status
+        info = dict(zip(info[::2], info[1::2]))
+        actual = {}
+        for attribute in info.get('attributes', []):
+            # Leading pairs are identifier/attribute/type; trailing flags such as SORTABLE have no value
+            attribute = dict(zip(attribute[:6:2], attribute[1:6:2]))
+            actual[attribute.get('attribute')] = attribute.get('type')
+        expected = {field['field']: field['type'] for field in self.schema if field['type'] != 'NOINDEX'}
+        drift = sorted(
+            f"{name}: expected {expected.get(name)}, found {actual.get(name)}"
+            for name in set(expected) | set(actual)
+            if expected.get(name) != actual.get(name)
+        )
+        real_index = info.get('index_name', self.index_name)
+        stored_version = self.redis_client.hget(SCHEMA_VERSIONS_KEY, real_index)
+        self.schema_status = {
+            'index_exists': True,
+            'index_name': real_index,
+            'schema_version': SCHEMA_VERSION,
+            'index_schema_version': int(stored_version) if stored_version else None,
+            'drift': drift
+        }
+        index_version = self.schema_status['index_schema_version']
+        if drift or (index_version is not None and index_version != SCHEMA_VERSION):
+            logging.warning(
+                f"RediSearch index {real_index} does not match schema v{SCHEMA_VERSION} "
+                f"(index version {stored_version}, drift: {drift}); rebuild with POST /search/index/rebuild"
+            )
+        return self.schema_status
+
+    def memory_report(self, index_names: List[str] = None) -> Dict:
+        """FT.INFO size figures per index, every index when none are named, in one pipelined round trip"""
+        index_names = list(index_names or self.redis_client.execute_command('FT._LIST'))
+        pipe = self.redis_client.pipeline(transaction=False)
+        for index_name in index_names:
+            pipe.execute_command('FT.INFO', index_name)
+        pipe.hgetall(SCHEMA_VERSIONS_KEY)
+        *infos, versions = pipe.execute(raise_on_error=False)
+        versions = {} if isinstance(versions, Exception) else versions
+
+        report = {}
+        for index_name, info in zip(index_names, infos):
+            if isinstance(info, Exception):
+                report[index_name] = {'error': str(info)}
+                continue
+            info = dict(zip(info[::2], info[1::2]))
+            real_index = info.get('index_name', index_name)
+            entry = {
+                'index_name': real_index,
+                'schema_version': int(versions[real_index]) if real_index in versions else None,
+                'num_docs': int(float(info.get('num_docs', 0)))
+            }
+            for field in MEMORY_INFO_FIELDS:
+                if field in info:
+                    entry[field] = float(info[field])
+            if 'total_index_memory_sz_mb' not in entry:
+                entry['total_index_memory_sz_mb'] = round(sum(entry.get(field, 0.0) for field in MEMORY_INFO_FIELDS[:-1]), 6)
+            report[index_name] = entry
+        return report
@@ -0,0 +1,126 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict
+from src.services.document_index_service import DocumentIndexService
+from src.services.suggestion_service import suggestion_keys_for
+
+LIVE_VERSION_KEY = "search:index:live_version"
+VERSION_COUNTER_KEY = "search:index:version_counter"
+
+
+class IndexVersionService:
+    """Blue/green index versions served through a RediSearch alias
+
+    Version 0 is the legacy layout: a real index named after the alias over
+    ``documents_key``. Every rebuild gets a new version N with its own index
+    ``{alias}_vN`` over ``{documents_key}.vN`` and is made live by an atomic
+    alias swap.
+    """
+
+    def __init__(self, redis_client, alias: str = "product_index", documents_key: str = "search:documents", suggestions_key: str = "suggestions"):
+        self.redis_client = redis_client
+        self.alias = alias
+        self.documents_key = documents_key
+        self.suggestions_key = suggestions_key
+        self.teardown_chunk_size = int(os.getenv('TEARDOWN_CHUNK_SIZE', 500))
+        self.teardown_throttle_seconds = float(os.getenv('TEARDOWN_THROTTLE_MS', 10)) / 1000
+        self.teardown_history = int(os.getenv('TEARDOWN_HISTORY', 20))
+        self.teardowns = {}
+
+    def index_name(self, version: int) -> str:
+        return self.alias if version == 0 else f"{self.alias}_v{version}"
+
+    def documents_key_for(self, version: int) -> str:
+        return self.documents_key if version == 0 else f"{self.documents_key}.v{version}"
+
+    def staging_suggestions_key(self, version: int) -> str:
+        return f"{self.suggestions_key}.v{version}"
+
+    def live_version(self) -> int:
+        try:
+            return int(self.redis_client.get(LIVE_VERSION_KEY) or 0)
+        except Exception as e:
+            logging.error(f"Error reading live index version: {e}")
+            return 0
+
+    def allocate_version(self) -> int:
+        return int(self.redis_client.incr(VERSION_COUNTER_KEY))
+
+    def _is_legacy_index(self) -> bool:
+        """True when the alias name is taken by a real (version 0) index"""
+        try:
+            info = self.redis_client.execute_command('FT.INFO', self.alias)
+        except Exception:
+            return False
+        info = dict(zip(info[::2], info[1::2]))
+        return info.get('index_name') == self.alias
+
+    def promote(self, version: int) -> int:
+        """Atomically point the alias and the suggestions key at ``version``, returns the previous live version"""
+        previous = self.live_version()
+        suggestion_keys = [
+            (staging_key, live_key, self.redis_client.exists(staging_key))
+            for staging_key, live_key in zip(suggestion_keys_for(self.staging_suggestions_key(version)), suggestion_keys_for(self.suggestions_key))
+        ]
+
+        pipe = self.redis_client.pipeline(transaction=True)
+        if self._is_legacy_index():
+            pipe.execute_command('FT.DROPINDEX', self.alias)
+        pipe.execute_command('FT.ALIASUPDATE', self.alias, self.index_name(version))
+        for staging_key, live_key, exists in suggestion_keys:
+            if exists:
+                pipe.rename(staging_key, live_key)
+            else:
+                pipe.unlink(live_key)
+        pipe.set(LIVE_VERSION_KEY, version)
+        pipe.execute()
+
+        logging.info(f"Promoted index version {version} ({self.index_name(version)}), previous version {previous}")
+        return previous
+
+    def discard(self, version: int, progress: Dict = None):
+        """Drop an index version, then unlink its documents and staging suggestions in throttled chunks"""
+        progress = progress if progress is not None else {}
+        if version != 0:
+            try:
+                self.redis_client.execute_command('FT.DROPINDEX', self.index_name(version))
+            except Exception as e:
+                logging.warning(f"Could not drop index {self.index_name(version)} (may not exist): {e}")
+        deleted = DocumentIndexService(self.redis_client, self.documents_key_for(version)).delete_documents(
+            self.teardown_chunk_size, self.teardown_throttle_seconds, progress
+        )
+        if version != 0:
+            self.redis_client.unlink(*suggestion_keys_for(self.staging_suggestions_key(version)))
+        logging.info(f"Garbage-collected index version {version}: {deleted} documents removed")
+
+    def discard_in_background(self, version: int) -> threading.Thread:
+        progress = {'version': version, 'status': 'running', 'started_at': time.time()}
+        self.teardowns.pop(version, None)
+        self.teardowns[version] = progress
+        # Only the most recent teardowns are reported, oldest first out
+        while len(self.teardowns) > self.teardown_history:
+            self.teardowns.pop(next(iter(self.teardowns)))
+
+        def run():
+            try:
+                self.discard(version, progress)
+                progress['status'] = 'completed'
+            except Exception as e:
+                progress['status'] = 'failed'
+                progress['error'] = str(e)
+                logging.error(f"Error garbage-collecting index version {version}: {e}")
+            finally:
+                progress['finished_at'] = time.time()
+
+        thread = threading.Thread(target=run, name=f'index-gc-v{version}', daemon=True)
+        thread.start()
+        return thread
+
+    def get_status(self) -> Dict:
+        return {
+            'alias': self.alias,
+            'live_version': self.live_version(),
+            'teardowns': [dict(progress) for progress in self.teardowns.values()]
+        }
@@ -0,0 +1,359 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List
+from redis.exceptions import WatchError
+
+JOBS_KEY = "search:jobs"
+JOB_KEY_PREFIX = "search:jobs:"
+ACTIVE_KEY_PREFIX = "search:jobs:active:"
+JSON_FIELDS = ('params', 'checkpoint', 'result')
+RESUMABLE_STATUSES = ('failed', 'cancelled', 'stalled')
+# Shared by every job kind that clears or writes the search index
+INDEX_LOCK = "index"
+
+
+class JobContext:
+    """Handle given to a job runner to report progress, commit checkpoints and see cancellation"""
+
+    def __init__(self, service: 'JobService', job_id: str, kind: str, params: Dict, checkpoint: Dict = None, token: str = None):
+        self.service = service
+        self.job_id = job_id
+        self.kind = kind
+        self.params = params
+        self.checkpoint = checkpoint
+        self.lock = service.lock_name(kind)
+        self.token = token
+        self.lost = False
+        self._last_write = 0.0
+        self._last_checkpoint = time.monotonic()
+        self._cancel_checked = 0.0
+        self._cancelled = False
+
+    @property
+    def cancelled(self) -> bool:
+        """True once cancellation was requested or the run lost its lock, re-read from Redis at most once a second"""
+        if self.lost:
+            return True
+        now = time.monotonic()
+        if not self._cancelled and now - self._cancel_checked >= 1.0:
+            self._cancel_checked = now
+            self._cancelled = self.service.cancel_requested(self.job_id)
+        return self._cancelled
+
+    def checkpoint_due(self) -> bool:
+        return time.monotonic() - self._last_checkpoint >= self.service.checkpoint_interval
+
+    def set_total(self, total):
+        self._write({'total': total})
+
+    def heartbeat(self):
+        """Refresh the heartbeat during long steps without countable progress, at most once a second"""
+        now = time.monotonic()
+        if now - self._last_write < 1.0:
+            return
+        self._last_write = now
+        self._write({})
+
+    def update(self, processed: int, checkpoint: Dict = None):
+        """Record progress and refresh the heartbeat; a ``checkpoint`` is committed whenever given
+
+        A checkpoint must only describe work that is already durable in Redis, since
+        a resumed run starts right after it.
+        """
+        now = time.monotonic()
+        if checkpoint is None and now - self._last_write < 1.0:
+            return
+        fields = {'processed': processed}
+        if checkpoint is not None:
+            self.checkpoint = checkpoint
+            fields['checkpoint'] = checkpoint
+            self._last_checkpoint = now
+        self._last_write = now
+        self._write(fields)
+
+    def _write(self, fields: Dict):
+        if not self.lost and not self.service.update(self.job_id, fields, heartbeat=self):
+            self.lost = True
+
+
+class JobService:
+    """Background jobs for long-running sync and indexing work, with their state kept in Redis
+
+    Each job runs in a daemon thread of the process that accepted it and is stored
+    as a hash under ``search:jobs:<id>``. Progress and checkpoints are written there
+    as the runner commits batches. Kinds registered with the same lock never run at
+    the same time: the lock holds the job id and a token of the run, and a run that
+    finds it taken by another run stops writing and winds down. A job whose heartbeat is older than
+    JOB_STALE_SECONDS, e.g. because its process died, is reported as ``stalled`` and
+    can be resumed from its last checkpoint like a failed or cancelled one.
+    """
+
+    def __init__(self, redis_client=None):
+        self._redis_client = redis_client
+        self.runners = {}
+        self.locks = {}
+        self.stale_seconds = float(os.getenv('JOB_STALE_SECONDS', 120))
+        self.checkpoint_interval = float(os.getenv('JOB_CHECKPOINT_INTERVAL', 5))
+        self.ttl = int(os.getenv('JOB_TTL', 7 * 24 * 3600))
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+    @property
+    def redis_client(self):
+        if self._redis_client is None:
+            from config import redis_config
+            self._redis_client = redis_config.get_connection()
+        return self._redis_client
+
+    def register(self, kind: str, runner: Callable[[JobContext], Dict], lock: str = None):
+        """Register the function running jobs of ``kind``, it returns the job result
+
+        Jobs of kinds sharing a ``lock`` run one at a time, by default each kind has its own.
+        """
+        self.runners[kind] = runner
+        self.locks[kind] = lock or kind
+
+    def lock_name(self, kind: str) -> str:
+        return self.locks.get(kind, kind)
+
+    def submit(self, kind: str, params: Dict) -> Dict:
+        """Start a job in the background, returns the job or an error when one of this kind is active"""
+        if kind not in self.runners:
+            return {'error': f"Unknown job kind '{kind}'"}
+        job_id = uuid.uuid4().hex[:16]
+        token = self._acquire(kind, job_id)
+        if token is None:
+            return self._conflict(kind)
+        now = time.time()
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.hset(self._key(job_id), mapping=self._encode({
+            'id': job_id,
+            'kind': kind,
+            'status': 'running',
+            'params': params,
+            'processed': 0,
+            'runs': 1,
+            'created_at': now,
+            'run_started_at': now,
+            'run_start_processed': 0,
+            'updated_at': now,
+            'owner': self.owner
+        }))
+        pipe.zadd(JOBS_KEY, {job_id: now})
+        pipe.execute()
+        self._start(job_id, kind, params, None, token)
+        return self.get_job(job_id)
+
+    def resume(self, job_id: str) -> Dict:
+        """Run a failed, cancelled or stalled job again from its last checkpoint"""
+        job = self.get_job(job_id)
+        if job is None:
+            return None
+        if job['status'] not in RESUMABLE_STATUSES:
+            return {'error': f"Job {job_id} is {job['status']}, only {', '.join(RESUMABLE_STATUSES)} jobs can be resumed"}
+        if job['kind'] not in self.runners:
+            return {'error': f"Unknown job kind '{job['kind']}'"}
+        # A stalled run still holding the lock may only be slow, it is never taken over
+        token = self._acquire(job['kind'], job_id)
+        if token is None:
+            return self._conflict(job['kind'])
+        now = time.time()
+        self.redis_client.hset(self._key(job_id), mapping=self._encode({
+            'status': 'running',
+            'runs': job.get('runs', 1) + 1,
+            'cancel_requested': 0,
+            'run_started_at': now,
+            'run_start_processed': job.get('processed', 0),
+            'updated_at': now,
+            'owner': self.owner,
+            'error': ''
+        }))
+        self.redis_client.hdel(self._key(job_id), 'finished_at')
+        self.redis_client.persist(self._key(job_id))
+        self._start(job_id, job['kind'], job['params'], job.get('checkpoint'), token)
+        return self.get_job(job_id)
+
+    def cancel(self, job_id: str) -> Dict:
+        """Ask a running job to stop after its current batch"""
+        job = self.get_job(job_id)
+        if job is None:
+            return None
+        if job['status'] != 'running':
+            return {'error': f"Job {job_id} is {job['status']}, only running jobs can be cancelled"}
+        self.redis_client.hset(self._key(job_id), 'cancel_requested', 1)
+        job['cancel_requested'] = True
+        return job
+
+    def cancel_requested(self, job_id: str) -> bool:
+        try:
+            return self.redis_client.hget(self._key(job_id), 'cancel_requested') == '1'
+        except Exception as e:
+            logging.warning(f"Could not read cancellation of job {job_id}: {e}")
+            return False
+
+    def update(self, job_id: str, fields: Dict, heartbeat: JobContext = None) -> bool:
+        """Write job fields, first refreshing the lock of the ``heartbeat`` run
+
+        Returns False, writing nothing, when that run no longer holds its lock.
+        """
+        fields = dict(fields, updated_at=time.time())
+        try:
+            if heartbeat is not None and not self._hold_lock(heartbeat.lock, heartbeat.token):
+                logging.warning(f"Job {job_id} no longer holds the {heartbeat.lock} lock, stopping this run")
+                return False
+            self.redis_client.hset(self._key(job_id), mapping=self._encode(fields))
+        except Exception as e:
+            logging.warning(f"Could not update job {job_id}: {e}")
+        return True
+
+    def get_job(self, job_id: str) -> Dict:
+        """Job state with rate and ETA of the current run, None when unknown"""
+        raw = self.redis_client.hgetall(self._key(job_id))
+        if not raw:
+            return None
+        job = self._decode(raw)
+        now = time.time()
+        if job['status'] == 'running' and now - job.get('updated_at', now) > self.stale_seconds:
+            job['status'] = 'stalled'
+        job['cancel_requested'] = bool(job.get('cancel_requested'))
+        end = job.get('finished_at', now)
+        elapsed = max(end - job.get('run_started_at', end), 0.0)
+        done = job.get('processed', 0) - job.get('run_start_processed', 0)
+        job['rate_per_second'] = round(done / elapsed, 1) if elapsed > 0 else 0
+        job['elapsed_seconds'] = round(elapsed, 1)
+        total = job.get('total')
+        job['eta_seconds'] = None
+        if total and job['status'] == 'running' and job['rate_per_second']:
+            job['eta_seconds'] = round(max(total - job['processed'], 0) / job['rate_per_second'], 1)
+        if total:
+            job['percent'] = round(min(job.get('processed', 0) / total, 1.0) * 100, 1)
+        return job
+
+    def list_jobs(self, limit: int = 20) -> List[Dict]:
+        """Most recent jobs first, forgetting ids whose record expired"""
+        jobs = []
+        for job_id in self.redis_client.zrevrange(JOBS_KEY, 0, limit - 1):
+            job = self.get_job(job_id)
+            if job is None:
+                self.redis_client.zrem(JOBS_KEY, job_id)
+                continue
+            jobs.append(job)
+        return jobs
+
+    def _start(self, job_id: str, kind: str, params: Dict, checkpoint: Dict, token: str):
+        context = JobContext(self, job_id, kind, params, checkpoint, token)
+        thread = threading.Thread(target=self._run, args=(context,), name=f'job-{kind}-{job_id}', daemon=True)
+        thread.start()
+
+    def _run(self, job: JobContext):
+        status, result, error = 'failed', None, ''
+        try:
+            result = self.runners[job.kind](job)
+            if result.get('cancelled'):
+                status = 'cancelled'
+            elif 'error' in result or result.get('success') is False:
+                status = 'failed'
+                error = result.get('error', '')
+            else:
+                status = 'completed'
+        except Exception as e:
+            logging.error(f"Job {job.job_id} ({job.kind}) failed: {e}")
+            error = str(e)
+        finally:
+            try:
+                released = self._hold_lock(job.lock, job.token, release=True)
+            except Exception as e:
+                released = True
+                logging.warning(f"Could not release job {job.job_id}: {e}")
+            if not released:
+                logging.warning(f"Job {job.job_id} ({job.kind}) lost its lock, leaving the job record to the run holding it")
+                return
+            fields = {'status': status, 'finished_at': time.time(), 'error': error}
+            if result is not None:
+                fields['result'] = result
+            self.update(job.job_id, fields)
+            try:
+                self.redis_client.expire(self._key(job.job_id), self.ttl)
+            except Exception as e:
+                logging.warning(f"Could not expire job {job.job_id}: {e}")
+            logging.info(f"Job {job.job_id} ({job.kind}) {status}")
+
+    def _acquire(self, kind: str, job_id: str):
+        """Take the lock of ``kind`` for a new run of ``job_id``, returns the run token or None when taken"""
+        token = f"{job_id}:{uuid.uuid4().hex[:8]}"
+        if self.redis_client.set(self._active_key(self.lock_name(kind)), token, nx=True, ex=int(self.stale_seconds)):
+            return token
+        return None
+
+    def _hold_lock(self, lock: str, token: str, release: bool = False) -> bool:
+        """Extend, or release, ``lock`` only while the run ``token`` holds it
+
+        The check and the write run in a WATCH transaction, so a lock that expired
+        and was taken by another run, even of the same job, is left alone. An expired
+        lock nobody took is taken back. Returns False when the lock belongs to another run.
+        """
+        key = self._active_key(lock)
+        with self.redis_client.pipeline(transaction=True) as pipe:
+            try:
+                pipe.watch(key)
+                holder = pipe.get(key)
+                if holder is not None and holder != token:
+                    pipe.unwatch()
+                    return False
+                pipe.multi()
+                if release:
+                    pipe.delete(key)
+                else:
+                    pipe.set(key, token, ex=int(self.stale_seconds))
+                pipe.execute()
+                return True
+            except WatchError:
+                return False
+
+    def _active_job(self, kind: str):
+        """Id of the job holding the lock of ``kind``, None when free"""
+        holder = self.redis_client.get(self._active_key(self.lock_name(kind)))
+        return holder.split(':', 1)[0] if holder else None
+
+    def _conflict(self, kind: str) -> Dict:
+        active = self._active_job(kind)
+        active_kind = self.redis_client.hget(self._key(active), 'kind') if active else None
+        return {'error': f"A {active_kind or kind} job is already running", 'job_id': active, 'conflict': True}
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"{JOB_KEY_PREFIX}{job_id}"
+
+    @staticmethod
+    def _active_key(kind: str) -> str:
+        return f"{ACTIVE_KEY_PREFIX}{kind}"
+
+    @staticmethod
+    def _encode(fields: Dict) -> Dict:
+        return {
+            name: json.dumps(value, default=str) if name in JSON_FIELDS else value
+            for name, value in fields.items() if value is not None
+        }
+
+    @staticmethod
+    def _decode(raw: Dict) -> Dict:
+        job = {}
+        for name, value in raw.items():
+            if name in JSON_FIELDS:
+                job[name] = json.loads(value) if value else None
+            elif name in ('processed', 'total', 'runs', 'run_start_processed'):
+                job[name] = int(float(value))
+            elif name in ('created_at', 'run_started_at', 'updated_at', 'finished_at'):
+                job[name] = float(value)
+            elif name == 'cancel_requested':
+                job[name] = value == '1'
+            else:
+                job[name] = value
+        return job
+
+
+job_service = JobService()
@@ -1,12 +1,19 @@
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
 import os
+import threading
+import time
+from contextlib import contextmanager
 from dotenv import load_dotenv
 import logging
 from typing import List, Dict
 
 load_dotenv()
 
+PRODUCT_COLUMNS = "c21 as id , c2 as price, c18 as image, c22 as name, '' as metadata, c11 as source_url"
+PRODUCT_ID_COLUMN = "c21"
+
 class PostgreSQLService:
     """PostgreSQL database service for fetching product data"""
     
@@ -17,35 +24,126 @@ class PostgreSQLService:
         self.password = os.getenv('PSQL_PASSWORD')
         self.database = os.getenv('PSQL_DATABASE')
         self.table = os.getenv('PSQL_TABLE')
-        self._connection = None
+        self.updated_column = os.getenv('PSQL_UPDATED_COLUMN')
+        self.pool_min = int(os.getenv('PSQL_POOL_MIN', 1))
+        self.pool_max = int(os.getenv('PSQL_POOL_MAX', 10))
+        self.pool_timeout = float(os.getenv('PSQL_POOL_TIMEOUT', 10))
+        self.pool_max_idle = float(os.getenv('PSQL_POOL_MAX_IDLE', 300))
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.pool_max)
+        self._last_used = {}
+        self._stats_lock = threading.Lock()
+        self._pool_stats = {
+            'checkouts': 0,
+            'total_wait_seconds': 0.0,
+            'max_wait_seconds': 0.0,
+            'timeouts': 0,
+            'recycled': 0,
+            'discarded': 0
+        }
         
-    def get_connection(self):
-        """Get PostgreSQL connection instance"""
-        if self._connection is None or self._connection.closed:
-            try:
-                self._connection = psycopg2.connect(
-                    host=self.host,
-                    port=self.port,
-                    user=self.username,
-                    password=self.password,
-                    database=self.database,
-                    cursor_factory=psycopg2.extras.RealDictCursor
-                )
-                logging.info(f"Successfully connected to PostgreSQL at {self.host}:{self.port}")
-            except psycopg2.Error as e:
-                logging.error(f"Failed to connect to PostgreSQL: {e}")
-                raise
-            except Exception as e:
-                logging.error(f"Error connecting to PostgreSQL: {e}")
-                raise
-                
-        return self._connection
+    def _get_pool(self):
+        """Get the thread-safe PostgreSQL connection pool, creating it on first use"""
+        with self._pool_lock:
+            if self._pool is None or self._pool.closed:
+                try:
+                    self._pool = psycopg2.pool.ThreadedConnectionPool(
+                        self.pool_min,
+                        self.pool_max,
+                        host=self.host,
+                        port=self.port,
+                        user=self.username,
+                        password=self.password,
+                        database=self.database,
+                        cursor_factory=psycopg2.extras.RealDictCursor
+                    )
+                    logging.info(f"Created PostgreSQL connection pool at {self.host}:{self.port} ({self.pool_min}-{self.pool_max} connections)")
+                except psycopg2.Error as e:
+                    logging.error(f"Failed to connect to PostgreSQL: {e}")
+                    raise
+            return self._pool
+    
+    def _checkout(self, pool):
+        """Take a connection from the pool, recycling closed or long-idle ones
+        
+        Every idle connection may be stale, so up to ``pool_max`` are recycled before
+        the pool hands out a freshly opened one.
+        """
+        for _ in range(self.pool_max + 1):
+            conn = pool.getconn()
+            last_used = self._last_used.get(id(conn))
+            if not conn.closed and (last_used is None or time.monotonic() - last_used <= self.pool_max_idle):
+                conn.autocommit = True
+                return conn
+            pool.putconn(conn, close=True)
+            self._last_used.pop(id(conn), None)
+            with self._stats_lock:
+                self._pool_stats['recycled'] += 1
+        raise psycopg2.pool.PoolError(f"No live PostgreSQL connection after recycling {self.pool_max + 1} stale ones")
+    
+    @contextmanager
+    def connection(self):
+        """Check a connection out of the pool for the duration of the block
+        
+        Liveness is judged from the connection state and from errors raised while it
+        is in use, so no extra round trip is spent on a probe query.
+        """
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.pool_timeout):
+            with self._stats_lock:
+                self._pool_stats['timeouts'] += 1
+            raise psycopg2.pool.PoolError(f"No PostgreSQL connection available within {self.pool_timeout}s")
+        conn = None
+        broken = False
+        try:
+            pool = self._get_pool()
+            conn = self._checkout(pool)
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self._pool_stats['checkouts'] += 1
+                self._pool_stats['total_wait_seconds'] += waited
+                self._pool_stats['max_wait_seconds'] = max(self._pool_stats['max_wait_seconds'], waited)
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            if conn is not None:
+                broken = broken or bool(conn.closed)
+                if broken:
+                    self._last_used.pop(id(conn), None)
+                    with self._stats_lock:
+                        self._pool_stats['discarded'] += 1
+                else:
+                    self._last_used[id(conn)] = time.monotonic()
+                try:
+                    pool.putconn(conn, close=broken)
+                except Exception as e:
+                    logging.warning(f"Error returning PostgreSQL connection to pool: {e}")
+            self._slots.release()
+    
+    def get_pool_stats(self) -> Dict:
+        """Connection pool configuration and checkout statistics"""
+        with self._stats_lock:
+            stats = dict(self._pool_stats)
+        checkouts = stats['checkouts']
+        stats['avg_wait_ms'] = round(stats['total_wait_seconds'] / checkouts * 1000, 3) if checkouts else 0
+        stats['max_wait_ms'] = round(stats.pop('max_wait_seconds') * 1000, 3)
+        stats['total_wait_seconds'] = round(stats['total_wait_seconds'], 3)
+        pool = self._pool
+        stats.update({
+            'min_connections': self.pool_min,
+            'max_connections': self.pool_max,
+            'open_connections': len(pool._pool) + len(pool._used) if pool and not pool.closed else 0,
+            'in_use_connections': len(pool._used) if pool and not pool.closed else 0
+        })
+        return stats
     
     def test_connection(self) -> bool:
         """Test PostgreSQL connection"""
         try:
-            conn = self.get_connection()
-            with conn.cursor() as cursor:
+            with self.connection() as conn, conn.cursor() as cursor:
                 cursor.execute("SELECT 1")
                 cursor.fetchone()
             return True
@@ -53,11 +151,10 @@ class PostgreSQLService:
             logging.error(f"PostgreSQL connection test failed: {e}")
             return False
     
-    def get_table_info(self) -> Dict:
+    def get_table_info(self, exact: bool = False) -> Dict:
         """Get information about the products table"""
         try:
-            conn = self.get_connection()
-            with conn.cursor() as cursor:
+            with self.connection() as conn, conn.cursor() as cursor:
                 # Get column information
                 cursor.execute("""
                     SELECT column_name, data_type, is_nullable
@@ -66,17 +163,13 @@ class PostgreSQLService:
                     ORDER BY ordinal_position
                 """, (self.table,))
                 columns = cursor.fetchall()
-                
-                # Get row count
-                cursor.execute(f"SELECT COUNT(*) as count FROM {self.table}")
-                count_result = cursor.fetchone()
-                row_count = count_result['count'] if count_result else 0
-                
-                return {
-                    'table_name': self.table,
-                    'total_rows': row_count,
-                    'columns': [dict(col) for col in columns]
-                }
+            
+            return {
+                'table_name': self.table,
+                'total_rows': self.get_products_count(exact),
+                'total_rows_exact': exact,
+                'columns': [dict(col) for col in columns]
+            }
                 
         except Exception as e:
             logging.error(f"Error getting table info: {e}")
@@ -85,11 +178,12 @@ class PostgreSQLService:
     def fetch_products(self, limit: int = None, offset: int = 0) -> List[Dict]:
         """
         Fetch images from product table: image, namge, price metadata, source_url
+        
+        Connection failures are raised so callers can tell an outage from an empty table.
         """
         try:
-            conn = self.get_connection()
-            with conn.cursor() as cursor:
-                query = f"select distinct c21 as id , c2 as price, c18 as image, c22 as name, '' as metadata, c11 as source_url from {self.table}"
+            with self.connection() as conn, conn.cursor() as cursor:
+                query = f"select distinct {PRODUCT_COLUMNS} from {self.table}"
                 if limit:
                     query += f" LIMIT {limit}"
                 if offset:
@@ -102,43 +196,165 @@ class PostgreSQLService:
                     result.append(d)
                 logging.info(f"Fetched {len(result)} products from PostgreSQL")
                 return result
+        except (psycopg2.OperationalError, psycopg2.pool.PoolError):
+            raise
         except Exception as e:
             logging.error(f"Error fetching product: {e}")
             return []
     
-    def get_products_count(self) -> int:
-        """Get total number of products in the table"""
+    def estimate_products_count(self):
+        """Row count estimate from the planner statistics in pg_class, None if the table was never analyzed"""
+        with self.connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT reltuples::bigint AS estimate FROM pg_class WHERE oid = %s::regclass", (self.table,))
+            result = cursor.fetchone()
+        if not result or result['estimate'] is None or result['estimate'] < 0:
+            return None
+        return int(result['estimate'])
+    
+    def get_products_count(self, exact: bool = True) -> int:
+        """Get total number of products in the table
+        
+        With ``exact=False`` the planner estimate is returned when one is available,
+        avoiding a full COUNT(*) scan.
+        """
         try:
-            conn = self.get_connection()
-            with conn.cursor() as cursor:
+            if not exact:
+                estimate = self.estimate_products_count()
+                if estimate is not None:
+                    return estimate
+            with self.connection() as conn, conn.cursor() as cursor:
                 cursor.execute(f"SELECT COUNT(*) as count FROM {self.table}")
                 result = cursor.fetchone()
                 return result['count'] if result else 0
+        except (psycopg2.OperationalError, psycopg2.pool.PoolError):
+            raise
         except Exception as e:
             logging.error(f"Error getting products count: {e}")
             return 0
     
+    def fetch_products_after(self, after_id=None, limit: int = 100) -> List[Dict]:
+        """
+        Fetch one page of products ordered by id, starting after ``after_id`` (keyset pagination)
+        """
+        with self.connection() as conn, conn.cursor() as cursor:
+            query = f"SELECT DISTINCT ON ({PRODUCT_ID_COLUMN}) {PRODUCT_COLUMNS} FROM {self.table}"
+            params = []
+            if after_id is not None:
+                query += f" WHERE {PRODUCT_ID_COLUMN} > %s"
+                params.append(after_id)
+            query += f" ORDER BY {PRODUCT_ID_COLUMN} LIMIT %s"
+            params.append(limit)
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def iter_products(self, batch_size: int = 100, after_id=None):
+        """
+        Stream products in bounded batches using keyset pagination on id.
+        
+        Each page is an index range scan from the last seen id, so every batch costs
+        the same regardless of depth and only one batch is held in memory.
+        """
+        last_id = after_id
+        while True:
+            try:
+                batch = self.fetch_products_after(last_id, batch_size)
+            except Exception as e:
+                logging.error(f"Error streaming products after id {last_id}: {e}")
+                raise
+            if not batch:
+                break
+            yield batch
+            if len(batch) < batch_size:
+                break
+            last_id = batch[-1]['id']
+    
+    def _changes_filter(self, watermark: Dict):
+        """Build the WHERE clause and params selecting rows past a change watermark
+        
+        With PSQL_UPDATED_COLUMN set, rows whose updated column is NULL are never part
+        of the change feed (they sort apart and would break the watermark); a full
+        sync picks them up. A watermark without ``updated_at`` selects every other row.
+        """
+        watermark = watermark or {}
+        if self.updated_column:
+            where = f" WHERE {self.updated_column} IS NOT NULL"
+            if watermark.get('updated_at') is None:
+                return where, []
+            return f"{where} AND ({self.updated_column}, {PRODUCT_ID_COLUMN}) > (%s, %s)", [watermark['updated_at'], watermark['id']]
+        if watermark.get('id') is not None:
+            return f" WHERE {PRODUCT_ID_COLUMN} > %s", [watermark['id']]
+        return "", []
+    
+    def _change_order(self) -> str:
+        if self.updated_column:
+            return f"{self.updated_column}, {PRODUCT_ID_COLUMN}"
+        return PRODUCT_ID_COLUMN
+    
+    def has_changes_since(self, watermark: Dict = None) -> bool:
+        """
+        Cheap check whether any row changed past the watermark (a single index probe)
+        """
+        with self.connection() as conn, conn.cursor() as cursor:
+            where, params = self._changes_filter(watermark)
+            cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {self.table}{where}) as changed", params)
+            result = cursor.fetchone()
+            return bool(result['changed']) if result else False
+    
+    def get_change_watermark(self) -> Dict:
+        """
+        Current high-water mark of the table: the last row in change order, skipping
+        rows whose updated column is NULL as the change feed does
+        """
+        with self.connection() as conn, conn.cursor() as cursor:
+            updated = f", {self.updated_column} as updated_at" if self.updated_column else ""
+            where, _ = self._changes_filter(None)
+            order = ", ".join(f"{column.strip()} DESC" for column in self._change_order().split(","))
+            cursor.execute(f"SELECT {PRODUCT_ID_COLUMN} as id{updated} FROM {self.table}{where} ORDER BY {order} LIMIT 1")
+            row = cursor.fetchone()
+            return self._row_watermark(row) if row else {}
+    
+    def _row_watermark(self, row: Dict) -> Dict:
+        updated_at = row.get('updated_at')
+        return {
+            'id': str(row['id']),
+            'updated_at': updated_at.isoformat() if hasattr(updated_at, 'isoformat') else updated_at
+        }
+    
+    def iter_products_changed_since(self, watermark: Dict = None, batch_size: int = 100):
+        """
+        Stream products that changed past ``watermark`` in change order.
+        
+        With PSQL_UPDATED_COLUMN set, rows are paged on (updated column, id) so updates
+        are picked up; otherwise only rows with an id above the watermark (inserts) are.
+        Each yielded batch is paired with the watermark of its last row.
+        """
+        updated = f", {self.updated_column} as updated_at" if self.updated_column else ""
+        while True:
+            where, params = self._changes_filter(watermark)
+            with self.connection() as conn, conn.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT {PRODUCT_COLUMNS}{updated} FROM {self.table}{where} ORDER BY {self._change_order()} LIMIT %s",
+                    params + [batch_size]
+                )
+                batch = [dict(row) for row in cursor.fetchall()]
+            if not batch:
+                break
+            watermark = self._row_watermark(batch[-1])
+            yield batch, watermark
+            if len(batch) < batch_size:
+                break
+    
     def fetch_products_batch(self, batch_size: int = 100):
         """
-        Fetch images in batches for large datasets
+        Fetch products in batches for large datasets
         """
-        try:
-            total_count = self.get_products_count()
-            offset = 0
-            while offset < total_count:
-                batch = self.fetch_products(limit=batch_size, offset=offset)
-                if not batch:
-                    break
-                yield batch
-                offset += batch_size
-        except Exception as e:
-            logging.error(f"Error in batch fetching: {e}")
-            return []
+        yield from self.iter_products(batch_size)
     
     def close_connection(self):
-        """Close PostgreSQL connection"""
-        if self._connection and not self._connection.closed:
-            self._connection.close()
-            logging.info("PostgreSQL connection closed")
+        """Close every pooled PostgreSQL connection"""
+        with self._pool_lock:
+            if self._pool and not self._pool.closed:
+                self._pool.closeall()
+                logging.info("PostgreSQL connection pool closed")
 
 postgres_service = PostgreSQLService()
\ No newline at end of file
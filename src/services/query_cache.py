@@ -0,0 +1,171 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class QueryCache:
+    """Two-tier search result cache: an in-process LRU with TTL and an optional shared Redis tier
+
+    Entries are tagged with the index generation they were computed against and
+    are ignored once the generation moves on, so no explicit purge is needed.
+    ``lookup`` returns the generation it checked against; a miss must be stored
+    with ``set`` under that generation, read before the search ran, so a result
+    computed while a write bumped the counter is never filed under the new one.
+    ``lookup_async`` and ``set_async`` do the same over a ``redis.asyncio`` client.
+    """
+
+    def __init__(self, generation, redis_client=None, max_entries: int = 2048, ttl: float = 60.0,
+                 use_redis: bool = False, redis_ttl: int = 300, key_prefix: str = "search:cache"):
+        self.generation = generation
+        self.redis_client = redis_client
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.use_redis = use_redis and redis_client is not None
+        self.redis_ttl = redis_ttl
+        self.key_prefix = key_prefix
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'local_hits': 0, 'redis_hits': 0, 'misses': 0, 'evictions': 0, 'stale': 0}
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return ' '.join(query.lower().split())
+
+    def _digest(self, key: Tuple) -> str:
+        return hashlib.sha1(json.dumps(key, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+    def lookup(self, key: Tuple) -> Tuple[Optional[Any], int]:
+        """Cached value for ``key`` or None, and the generation to store a fresh value under"""
+        generation = self.generation.current()
+        if self.max_entries <= 0:
+            return None, generation
+        value = self._lookup_local(key, generation)
+        if value is not None:
+            return value, generation
+        if self.use_redis:
+            try:
+                value = self._redis_hit(key, generation, self.redis_client.get(self._redis_key(key, generation)))
+            except Exception as e:
+                logging.warning(f"Query cache Redis lookup failed: {e}")
+        if value is None:
+            self._count_miss()
+        return value, generation
+
+    async def lookup_async(self, key: Tuple, redis_client) -> Tuple[Optional[Any], int]:
+        generation = await self.generation.current_async(redis_client)
+        if self.max_entries <= 0:
+            return None, generation
+        value = self._lookup_local(key, generation)
+        if value is not None:
+            return value, generation
+        if self.use_redis:
+            try:
+                value = self._redis_hit(key, generation, await redis_client.get(self._redis_key(key, generation)))
+            except Exception as e:
+                logging.warning(f"Query cache Redis lookup failed: {e}")
+        if value is None:
+            self._count_miss()
+        return value, generation
+
+    def _count_miss(self):
+        with self._lock:
+            self._stats['misses'] += 1
+
+    def _redis_key(self, key: Tuple, generation: int) -> str:
+        return f"{self.key_prefix}:{generation}:{self._digest(key)}"
+
+    def _redis_hit(self, key: Tuple, generation: int, payload):
+        if payload is None:
+            return None
+        value = json.loads(payload)
+        self._store(self._digest(key), generation, value, len(payload))
+        with self._lock:
+            self._stats['redis_hits'] += 1
+        return value
+
+    def _lookup_local(self, key: Tuple, generation: int):
+        digest = self._digest(key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                entry_generation, expires_at, value, size = entry
+                if entry_generation == generation and expires_at > now:
+                    self._entries.move_to_end(digest)
+                    self._stats['local_hits'] += 1
+                    return value
+                self._remove(digest)
+                self._stats['stale'] += 1
+        return None
+
+    def set(self, key: Tuple, value: Any, generation: int):
+        """Store ``value`` under the generation ``lookup`` returned before computing it"""
+        payload = self._prepare(key, value, generation)
+        if payload is not None and self.use_redis:
+            try:
+                self.redis_client.set(self._redis_key(key, generation), payload, ex=self.redis_ttl)
+            except Exception as e:
+                logging.warning(f"Query cache Redis store failed: {e}")
+
+    async def set_async(self, key: Tuple, value: Any, generation: int, redis_client):
+        payload = self._prepare(key, value, generation)
+        if payload is not None and self.use_redis:
+            try:
+                await redis_client.set(self._redis_key(key, generation), payload, ex=self.redis_ttl)
+            except Exception as e:
+                logging.warning(f"Query cache Redis store failed: {e}")
+
+    def _prepare(self, key: Tuple, value: Any, generation: int):
+        """Store ``value`` locally, returns its JSON payload or None when caching is off"""
+        if self.max_entries <= 0:
+            return None
+        payload = json.dumps(value, separators=(',', ':'), default=str)
+        self._store(self._digest(key), generation, value, len(payload))
+        return payload
+
+    def _store(self, digest: str, generation: int, value: Any, size: int):
+        with self._lock:
+            self._remove(digest)
+            self._entries[digest] = (generation, time.monotonic() + self.ttl, value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats['evictions'] += 1
+
+    def _remove(self, digest: str):
+        entry = self._entries.pop(digest, None)
+        if entry is not None:
+            self._bytes -= entry[3]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self, generation: int = None) -> Dict:
+        """Hit and size counters, callers on an event loop pass the ``generation`` they read asynchronously"""
+        with self._lock:
+            stats = dict(self._stats)
+            entries = len(self._entries)
+            approx_bytes = self._bytes
+        hits = stats['local_hits'] + stats['redis_hits']
+        lookups = hits + stats['misses']
+        stats.update({
+            'hits': hits,
+            'lookups': lookups,
+            'hit_ratio': round(hits / lookups, 4) if lookups else 0,
+            'miss_ratio': round(stats['misses'] / lookups, 4) if lookups else 0,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'approx_bytes': approx_bytes,
+            'ttl_seconds': self.ttl,
+            'redis_tier': self.use_redis,
+            'generation': self.generation.current() if generation is None else generation
+        })
+        return stats
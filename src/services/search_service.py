@@ -1,116 +1,475 @@
 import json
 import logging
-from typing import List, Dict
+import os
+import threading
+from typing import List, Dict, Tuple
 from src.utils import TextProcessor
+from src.services.index_manager import IndexManager
+from src.services.document_index_service import FINGERPRINT_FIELD
+
+RETURNABLE_FIELDS = (
+    'id', 'name', 'price', 'image', 'url',
+    'metadata.name', 'metadata.tags', 'metadata.brand', 'metadata.price', 'indexed_at'
+)
+SORTABLE_FIELDS = ('price', 'metadata.price', 'id')
+# Dictionary terms kept per misspelled word, and the largest distance FT.SPELLCHECK accepts
+SPELLCHECK_TERMS = 3
+SPELLCHECK_MAX_DISTANCE = 4
+# FT.AGGREGATE ... ADDSCORES, used to order cursors by relevance, needs RediSearch 2.10
+ADDSCORES_MIN_VERSION = 21000
 
 
 class SearchService:
-    def __init__(self, redis_client, index_name: str = "product_index", documents_key: str = "search:documents", inverted_index_key: str = "search:inverted_index"):
+    def __init__(self, redis_client, index_name: str = "product_index", documents_key: str = "search:documents", inverted_index_key: str = "search:inverted_index", cache=None, index_manager: IndexManager = None):
         self.redis_client = redis_client
         self.index_name = index_name
         self.documents_key = documents_key
         self.inverted_index_key = inverted_index_key
+        self.cache = cache
+        self.index_manager = index_manager or IndexManager(redis_client, index_name, documents_key)
         self.text_processor = TextProcessor()
+        self._planner_lock = threading.Lock()
+        self._planner_stats = {}
+        self.cursor_max_idle_ms = int(os.getenv('SEARCH_CURSOR_MAX_IDLE_MS', 300000))
+        self.cursor_window = int(os.getenv('SEARCH_CURSOR_WINDOW', 10000))
+        self.module_version = None
+        self.spellcheck_enabled = os.getenv('SEARCH_SPELLCHECK', 'true').lower() == 'true'
         self._ensure_index_exists()
 
     def _ensure_index_exists(self):
         """Ensure RediSearch index exists"""
+        self.index_manager.ensure_index()
+
+    def detect_module_version(self):
+        """Read the RediSearch module version, meant to run at startup; None when it cannot be read"""
         try:
-            self.redis_client.execute_command('FT.INFO', self.index_name)
-        except Exception:
-            try:
-                self.redis_client.execute_command(
-                    'FT.CREATE', self.index_name,
-                    'ON', 'HASH',
-                    'PREFIX', '1', f"{self.documents_key}:",
-                    'SCHEMA',
-                    'id', 'TEXT', 'SORTABLE',
-                    'name', 'TEXT', 'WEIGHT', '3.0',
-                    'price', 'NUMERIC', 'SORTABLE',
-                    'image', 'TEXT', 'WEIGHT', '1.0',
-                    'url', 'TEXT', 'WEIGHT', '1.0',
-                    'metadata.name', 'TEXT', 'WEIGHT', '2.0',
-                    'metadata.tags', 'TEXT', 'WEIGHT', '1.0',
-                    'metadata.brand', 'TEXT', 'WEIGHT', '1.0',
-                    'metadata.price', 'NUMERIC', 'SORTABLE'
-                )
-                logging.info(f"Created RediSearch index: {self.index_name}")
-            except Exception as e:
-                logging.error(f"Failed to create RediSearch index: {e}")
-
-    def full_text_search(self, query: str, limit: int = 10) -> List[Dict]:
-        """Use RediSearch FT.SEARCH for full-text search"""
-        try:
-            if not query.strip():
-                return []
-            
-            self._ensure_index_exists()
-            
-            search_queries = [
-                f"@name:({query}) | @price:({query}) | @metadata.name:({query})",
-                f"({query})",
-                f"{query}",
-                "*"
-            ]
-            
-            for search_query in search_queries:
-                try:
-                    result = self.redis_client.execute_command(
-                        'FT.SEARCH', self.index_name, 
-                        search_query,
-                        'LIMIT', '0', str(limit)
-                    )
-                    
-                    if result and len(result) > 1:  # Found results
-                        return self._parse_search_results(result)
-                        
-                except Exception as e:
-                    logging.warning(f"Search query '{search_query}' failed: {e}")
-                    continue
+            for module in self.redis_client.module_list():
+                module = {self._decode_reply(name): value for name, value in module.items()}
+                if self._decode_reply(module.get('name')) in ('search', 'ft'):
+                    self.module_version = int(module['ver'])
+        except Exception as e:
+            logging.warning(f"Could not read the RediSearch module version: {e}")
+        if self.module_version is not None and self.module_version < ADDSCORES_MIN_VERSION:
+            logging.warning(f"RediSearch {self.module_version} is older than 2.10, cursors without sort_by are disabled")
+        return self.module_version
 
-            return []
-            
+    def cursor_unsupported(self, plan: Dict):
+        """Why ``plan`` cannot be read through a cursor on this server, None when it can"""
+        if plan is None or 'sort_by' in plan['options']:
+            return None
+        if self.module_version is not None and self.module_version < ADDSCORES_MIN_VERSION:
+            return 'Cursor pagination by relevance needs RediSearch 2.10 or later, pass sort_by or upgrade'
+        return None
+
+    def full_text_search(self, query: str, limit: int = 10, fields: List[str] = None, ids_only: bool = False, options: Dict = None) -> List[Dict]:
+        """Use RediSearch FT.SEARCH for full-text search
+        
+        ``fields`` limits the returned hash fields (RETURN) and ``ids_only`` returns
+        document ids without content (NOCONTENT). ``options`` may hold ``offset``,
+        ``min_price``, ``max_price``, ``sort_by`` and ``order``, all applied by RediSearch.
+        """
+        try:
+            return self._search(self.plan_full_text(query, limit, fields, ids_only, options))
         except Exception as e:
             logging.error(f"Error in RediSearch full text search: {e}")
             return []
 
-    def _parse_search_results(self, result) -> List[Dict]:
-        """Parse RediSearch results into document dictionaries"""
+    def plan_full_text(self, query: str, limit: int = 10, fields: List[str] = None, ids_only: bool = False, options: Dict = None) -> Dict:
+        """Describe a full-text search without running it, None for an empty query"""
+        if not query.strip():
+            return None
+        projection = self._projection_args(fields, ids_only)
+        options = self._normalize_options(options)
+        return {
+            'kind': 'fulltext',
+            'variants': self._filtered_variants(self._full_text_variants(query), options),
+            'limit': limit,
+            'projection': projection,
+            'fields': fields,
+            'ids_only': ids_only,
+            'options': options,
+            'cache_key': ('fulltext', self.cache.normalize_query(query), limit, projection, sorted(options.items())) if self.cache else None
+        }
+
+    def plan_fuzzy(self, query: str, max_distance: int = 2, limit: int = 10, fields: List[str] = None, ids_only: bool = False,
+                   options: Dict = None, correction: Dict = None) -> Dict:
+        """Describe a fuzzy search without running it, None when the query has no words
+
+        With a ``correction`` from ``correct_query`` misspelled words are replaced by
+        their dictionary terms and only words without any are fuzzy-expanded.
+        """
+        if not query.strip():
+            return None
+        query_words = self.text_processor.extract_words(query.lower())
+        if not query_words:
+            return None
+        projection = self._projection_args(fields, ids_only)
+        options = self._normalize_options(options)
+        if correction is None:
+            terms = [self._fuzzy_term(word, max_distance) for word in query_words]
+        else:
+            terms = [self._corrected_term(word, max_distance, correction) for word in query_words]
+        return {
+            'kind': 'fuzzy',
+            'variants': self._filtered_variants(self._fuzzy_variants(terms), options),
+            'limit': limit,
+            'projection': projection,
+            'fields': fields,
+            'ids_only': ids_only,
+            'options': options,
+            'cache_key': ('fuzzy', self.cache.normalize_query(query), max_distance, limit, projection, sorted(options.items()), correction is not None) if self.cache else None
+        }
+
+    def correct_query(self, query: str, max_distance: int = 2):
+        """Spelling correction of ``query`` from the index term dictionary, None when unavailable
+
+        Corrections are cached like results, so they are recomputed after index writes.
+        """
+        if not self.spellcheck_enabled:
+            return None
+        query_words = self.text_processor.extract_words(query.lower())
+        if not query_words:
+            return None
+        cache_key = self.correction_cache_key(query_words, max_distance)
+        if cache_key:
+            cached, generation = self.cache.lookup(cache_key)
+            if cached is not None:
+                return cached
+        try:
+            reply = self.redis_client.execute_command(*self.spellcheck_command(query_words, max_distance))
+        except Exception as e:
+            logging.warning(f"Spellcheck of '{query}' failed, using fuzzy expansion: {e}")
+            return None
+        correction = self.parse_spellcheck(query_words, reply)
+        if cache_key:
+            self.cache.set(cache_key, correction, generation)
+        return correction
+
+    def correction_cache_key(self, query_words: List[str], max_distance: int):
+        return ('spellcheck', ' '.join(query_words), max_distance) if self.cache else None
+
+    def spellcheck_command(self, query_words: List[str], max_distance: int) -> List[str]:
+        distance = min(max(max_distance, 1), SPELLCHECK_MAX_DISTANCE)
+        return ['FT.SPELLCHECK', self.index_name, ' '.join(query_words), 'DISTANCE', str(distance)]
+
+    @staticmethod
+    def parse_spellcheck(query_words: List[str], reply) -> Dict:
+        """Dictionary terms for every misspelled word of an FT.SPELLCHECK reply, best first
+
+        Words RediSearch reports without a candidate are listed in ``unknown``; words it
+        does not report are in the index as typed.
+        """
+        corrections = {}
+        unknown = []
+        for entry in reply or []:
+            if len(entry) < 3:
+                continue
+            word, candidates = entry[1], entry[2]
+            terms = [term for score, term in sorted(candidates, key=lambda c: -float(c[0]))][:SPELLCHECK_TERMS]
+            if terms:
+                corrections[word] = terms
+            else:
+                unknown.append(word)
+        did_you_mean = ' '.join(corrections[word][0] if word in corrections else word for word in query_words) if corrections else None
+        return {'corrections': corrections, 'unknown': unknown, 'did_you_mean': did_you_mean}
+
+    @staticmethod
+    def _normalize_options(options: Dict = None) -> Dict:
+        """Keep only the paging, price range and sort options that are set"""
+        options = options or {}
+        normalized = {}
+        if options.get('offset'):
+            normalized['offset'] = int(options['offset'])
+        for bound in ('min_price', 'max_price'):
+            if options.get(bound) is not None:
+                normalized[bound] = float(options[bound])
+        if options.get('sort_by'):
+            normalized['sort_by'] = options['sort_by']
+            normalized['order'] = 'DESC' if str(options.get('order', 'asc')).lower() == 'desc' else 'ASC'
+        return normalized
+
+    @staticmethod
+    def _filtered_variants(variants: List[Tuple[str, str]], options: Dict) -> List[Tuple[str, str]]:
+        """Intersect every variant with the price range so RediSearch filters before paging"""
+        if 'min_price' not in options and 'max_price' not in options:
+            return variants
+        low = options.get('min_price', '-inf')
+        high = options.get('max_price', '+inf')
+        price_range = f"@price:[{low} {high}]"
+        return [(variant, f"({search_query}) {price_range}") for variant, search_query in variants]
+
+    def plan_query(self, kind: str, query: str, limit: int = 10, max_distance: int = 2, fields: List[str] = None, ids_only: bool = False,
+                   options: Dict = None, correction: Dict = None) -> Dict:
+        """Plan a 'fulltext' or 'fuzzy' search"""
+        if kind == 'fuzzy':
+            return self.plan_fuzzy(query, max_distance, limit, fields, ids_only, options, correction)
+        return self.plan_full_text(query, limit, fields, ids_only, options)
+
+    def cached_results(self, plan: Dict):
+        """Results for ``plan`` from the query cache, None on a miss
+        
+        The generation checked is kept on the plan, ``resolve_plan`` caches the
+        fresh results under it.
+        """
+        if not plan['cache_key']:
+            return None
+        cached, plan['generation'] = self.cache.lookup(plan['cache_key'])
+        return cached
+
+    def _search(self, plan: Dict) -> List[Dict]:
+        if plan is None:
+            return []
+        cached = self.cached_results(plan)
+        if cached is not None:
+            return cached
+        results, _ = self._run_query_plan(plan)
+        return results
+
+    def _full_text_variants(self, query: str) -> List[Tuple[str, str]]:
+        """Candidate full-text queries, most specific first"""
+        return [
+            ('fielded', f"@name:({query}) | @price:({query}) | @metadata.name:({query})"),
+            ('grouped', f"({query})"),
+            ('raw', f"{query}")
+        ]
+
+    @staticmethod
+    def _fuzzy_term(word: str, max_distance: int) -> str:
+        if max_distance == 1:
+            return f"%{word}%"
+        if max_distance == 2:
+            return f"%%{word}%%"
+        return f"%%%{word}%%%"
+
+    def _corrected_term(self, word: str, max_distance: int, correction: Dict) -> str:
+        """Dictionary terms for a corrected word, the word itself when it is spelled right, fuzzy otherwise"""
+        terms = correction['corrections'].get(word)
+        if terms:
+            return terms[0] if len(terms) == 1 else f"({'|'.join(terms)})"
+        if word in correction['unknown']:
+            return self._fuzzy_term(word, max_distance)
+        return word
+
+    def _fuzzy_variants(self, terms: List[str]) -> List[Tuple[str, str]]:
+        """Candidate fuzzy queries, most specific first"""
+        union = ' | '.join(terms)
+        return [
+            ('fielded', f"@metadata.name:({union}) | @price:({union}) | @name:({union})"),
+            ('union', union),
+            ('grouped', f"({union})")
+        ]
+
+    @staticmethod
+    def _projection_args(fields: List[str] = None, ids_only: bool = False) -> Tuple:
+        """FT.SEARCH arguments selecting what each hit carries"""
+        if ids_only:
+            return ('NOCONTENT',)
+        if fields:
+            return ('RETURN', str(len(fields)), *fields)
+        return ()
+
+    def _run_query_plan(self, plan: Dict):
+        """Send every query variant in one pipelined round trip and keep the best non-empty result
+        
+        If the index turns out to be missing it is recreated and the plan retried once.
+        Returns (results, failed variant count).
+        """
+        responses = self._execute_plan(plan)
+        if self.is_missing_index_reply(responses):
+            self.recover_missing_index()
+            responses = self._execute_plan(plan)
+        return self.resolve_plan(plan, responses)
+
+    def is_missing_index_reply(self, responses: List) -> bool:
+        return all(isinstance(r, Exception) for r in responses) and any(self.index_manager.is_missing_index_error(r) for r in responses)
+
+    def recover_missing_index(self):
+        logging.warning(f"RediSearch index {self.index_name} is missing, recreating it")
+        self.index_manager.mark_missing()
+        self.index_manager.ensure_index()
+
+    def queue_plan(self, pipe, plan: Dict) -> int:
+        """Queue the FT.SEARCH call of every variant on ``pipe``, returns the number of commands queued"""
+        for _, search_query in plan['variants']:
+            self.queue_search(pipe, plan, search_query)
+        return len(plan['variants'])
+
+    def queue_search(self, pipe, plan: Dict, search_query: str):
+        """Queue one FT.SEARCH with the projection, sort and paging of ``plan``"""
+        options = plan['options']
+        sort = ('SORTBY', options['sort_by'], options['order']) if 'sort_by' in options else ()
+        pipe.execute_command(
+            'FT.SEARCH', self.index_name,
+            search_query,
+            *plan['projection'],
+            *sort,
+            'LIMIT', str(options.get('offset', 0)), str(plan['limit'])
+        )
+
+    def resolve_plan(self, plan: Dict, responses: List, store: bool = True):
+        """Pick the result of the first variant with hits and cache it
+        
+        Variants are ordered by preference, so the first one with hits wins.
+        Returns (results, failed variant count). With ``store`` False the caller
+        caches the results itself when ``cacheable`` says so.
+        """
+        kind = plan['kind']
+        results = []
+        failures = 0
+        chosen = 'none'
+        for (variant, search_query), result in zip(plan['variants'], responses):
+            if isinstance(result, Exception):
+                logging.warning(f"{kind} query '{search_query}' failed: {result}")
+                failures += 1
+                continue
+            if result and int(result[0]) > 0:  # Found results, possibly on another page
+                chosen = variant
+                results = self.parse_search_results(result, plan['projection'] == ('NOCONTENT',))
+                break
+        
+        self.record_plan(kind, chosen)
+        if store and self.cacheable(plan, results, failures):
+            self.cache.set(plan['cache_key'], results, plan['generation'])
+        return results, failures
+
+    @staticmethod
+    def cacheable(plan: Dict, results: List, failures: int) -> bool:
+        """Whether resolved results may be cached, a miss looked up and no failure hidden behind them"""
+        return bool(plan['cache_key']) and 'generation' in plan and bool(results or not failures)
+
+    def _execute_plan(self, plan: Dict) -> List:
+        pipe = self.redis_client.pipeline(transaction=False)
+        self.queue_plan(pipe, plan)
+        return pipe.execute(raise_on_error=False)
+
+    def open_cursor(self, plan: Dict, window: int = None) -> Dict:
+        """First page of a search read through an FT.AGGREGATE cursor
+        
+        Hit counts for every variant go out in one pipeline to pick the variant, then
+        the aggregation opens a cursor of ``limit`` rows over the best ``window`` hits.
+        Later pages cost one FT.CURSOR READ each, however deep they are.
+        """
+        if plan is None:
+            return {'results': [], 'cursor': None, 'total': 0}
+        unsupported = self.cursor_unsupported(plan)
+        if unsupported:
+            return {'error': unsupported}
+        responses = self._execute_count_plan(plan)
+        if self.is_missing_index_reply(responses):
+            self.recover_missing_index()
+            responses = self._execute_count_plan(plan)
+        search_query, total = self.pick_variant(plan, responses)
+        if search_query is None:
+            return {'results': [], 'cursor': None, 'total': 0}
+        command, window = self.aggregate_command(plan, search_query, total, window)
+        page = self.parse_cursor_reply(self.redis_client.execute_command(*command))
+        page['total'] = total
+        page['window'] = window
+        return page
+
+    def read_cursor(self, cursor_id: str, count: int = 10) -> Dict:
+        """Next page of a cursor opened by ``open_cursor``"""
+        return self.parse_cursor_reply(self.redis_client.execute_command(*self.cursor_read_command(cursor_id, count)))
+
+    def _execute_count_plan(self, plan: Dict) -> List:
+        pipe = self.redis_client.pipeline(transaction=False)
+        self.queue_count_plan(pipe, plan)
+        return pipe.execute(raise_on_error=False)
+
+    def queue_count_plan(self, pipe, plan: Dict) -> int:
+        """Queue a hit count for every variant, no documents are returned"""
+        for _, search_query in plan['variants']:
+            pipe.execute_command('FT.SEARCH', self.index_name, search_query, 'NOCONTENT', 'LIMIT', '0', '0')
+        return len(plan['variants'])
+
+    def pick_variant(self, plan: Dict, responses: List) -> Tuple:
+        """First variant with hits, returns (query, total hits) or (None, 0)"""
+        for (variant, search_query), result in zip(plan['variants'], responses):
+            if isinstance(result, Exception):
+                logging.warning(f"{plan['kind']} query '{search_query}' failed: {result}")
+                continue
+            if result and int(result[0]) > 0:
+                self.record_plan(plan['kind'], variant)
+                return search_query, int(result[0])
+        self.record_plan(plan['kind'], 'none')
+        return None, 0
+
+    def aggregate_command(self, plan: Dict, search_query: str, total: int, window: int = None) -> Tuple[List[str], int]:
+        """FT.AGGREGATE opening a cursor over the best ``window`` hits, in the order FT.SEARCH would return them
+        
+        Without ``sort_by`` the rows are sorted by relevance through ADDSCORES
+        (RediSearch 2.10+, see ``cursor_unsupported``); aggregate rows otherwise come
+        back in internal doc id order. The sort keeps only the rows the cursor can
+        return, SEARCH_CURSOR_WINDOW by default, so opening a cursor over a large
+        result set does not sort all of it. Returns the command and that row count.
+        """
+        load = ['@__key']
+        if not plan['ids_only']:
+            load.extend(f"@{field}" for field in (plan['fields'] or RETURNABLE_FIELDS))
+        command = ['FT.AGGREGATE', self.index_name, search_query, 'LOAD', str(len(load)), *load]
+        options = plan['options']
+        rows = max(min(total, window or self.cursor_window), 1)
+        # MAX bounds the sort to the window, the default of 10 would truncate it
+        if 'sort_by' in options:
+            command.extend(['SORTBY', '2', f"@{options['sort_by']}", options['order'], 'MAX', str(rows)])
+        else:
+            command.extend(['ADDSCORES', 'SORTBY', '2', '@__score', 'DESC', 'MAX', str(rows)])
+        command.extend(['WITHCURSOR', 'COUNT', str(plan['limit']), 'MAXIDLE', str(self.cursor_max_idle_ms)])
+        return command, rows
+
+    def cursor_read_command(self, cursor_id: str, count: int = 10) -> List[str]:
+        return ['FT.CURSOR', 'READ', self.index_name, str(cursor_id), 'COUNT', str(count)]
+
+    def parse_cursor_reply(self, reply) -> Dict:
+        """Parse an FT.AGGREGATE/FT.CURSOR READ reply into a page and the next cursor id
+        
+        Rows that carry only the key come back as ids, like NOCONTENT searches. The
+        relevance score added for ordering is dropped, as FT.SEARCH results omit it.
+        """
+        rows, cursor_id = reply
+        documents = []
+        for row in rows[1:]:
+            doc_id = None
+            doc_fields = []
+            pairs = iter(self._decode_reply(row))
+            for field_name, field_value in zip(pairs, pairs):
+                if field_name == '__key':
+                    doc_id = field_value
+                elif field_name != '__score':
+                    doc_fields.extend((field_name, field_value))
+            documents.append(self._document_from_fields(doc_id, doc_fields) if doc_fields else {'id': doc_id})
+        return {'results': documents, 'cursor': str(cursor_id) if int(cursor_id) else None}
+
+    def record_plan(self, kind: str, variant: str):
+        with self._planner_lock:
+            counts = self._planner_stats.setdefault(kind, {})
+            counts[variant] = counts.get(variant, 0) + 1
+
+    def get_planner_stats(self) -> Dict:
+        """How often each query variant produced the returned results"""
+        with self._planner_lock:
+            return {kind: dict(counts) for kind, counts in self._planner_stats.items()}
+
+    def parse_search_results(self, result, ids_only: bool = False) -> List[Dict]:
+        """Parse RediSearch results into document dictionaries
+        
+        Single linear pass over the flat reply: key/fields pairs are consumed with a
+        shared iterator and tags are split once per document.
+        """
         try:
             if not result or len(result) < 2:
                 return []
             
-            documents = []
+            if isinstance(result[1], bytes):
+                result = [result[0]] + [self._decode_reply(item) for item in result[1:]]
+            
+            if ids_only:
+                return [{'id': doc_id} for doc_id in result[1:]]
             
-            for i in range(1, len(result), 2):
-                if i + 1 < len(result):
-                    doc_id = result[i]
-                    doc_fields = result[i + 1]
-                    
-                    doc_dict = {}
-                    metadata_dict = {}
-                    
-                    for j in range(0, len(doc_fields), 2):
-                        if j + 1 < len(doc_fields):
-                            field_name = self._decode_bytes(doc_fields[j])
-                            field_value = self._decode_bytes(doc_fields[j + 1])
-                            
-                            if field_name.startswith('metadata.'):
-                                meta_field = field_name[9:]
-                                metadata_dict[meta_field] = field_value
-                                if 'metadata.tags' in doc_fields:
-                                    tags_value = metadata_dict.get('tags', '')
-                                    metadata_dict['tags'] = [tag.strip() for tag in tags_value.split(',') if tag.strip()] if tags_value else []
-                                else:
-                                    doc_dict['tags'] = []
-                            else:
-                                doc_dict[field_name] = field_value
-                    
-                    doc_dict['id'] = self._decode_bytes(doc_id)
-                    
-                    doc_dict['metadata'] = metadata_dict
-                    
-                    documents.append(doc_dict)
+            documents = []
+            replies = iter(result[1:])
+            for doc_id, doc_fields in zip(replies, replies):
+                documents.append(self._document_from_fields(doc_id, doc_fields))
             
             return documents
             
@@ -118,56 +477,50 @@ class SearchService:
             logging.error(f"Error parsing search results: {e}")
             return []
 
+    @staticmethod
+    def _document_from_fields(doc_id: str, doc_fields: List) -> Dict:
+        """Build a document from a flat field/value list, nesting metadata.* fields and dropping the fingerprint"""
+        doc_dict = {}
+        metadata_dict = {}
+        pairs = iter(doc_fields)
+        for field_name, field_value in zip(pairs, pairs):
+            if field_name == FINGERPRINT_FIELD:
+                continue
+            if field_name.startswith('metadata.'):
+                metadata_dict[field_name[9:]] = field_value
+            else:
+                doc_dict[field_name] = field_value
+        
+        tags_value = metadata_dict.get('tags')
+        if tags_value is not None:
+            metadata_dict['tags'] = [tag.strip() for tag in tags_value.split(',') if tag.strip()]
+        
+        doc_dict['id'] = doc_id
+        doc_dict['metadata'] = metadata_dict
+        return doc_dict
+
+    def _decode_reply(self, item):
+        """Decode a key or a list of field/value pairs returned as bytes"""
+        if isinstance(item, list):
+            return [self._decode_bytes(value) for value in item]
+        return self._decode_bytes(item)
+
     def _decode_bytes(self, value):
         """Helper to decode bytes to string"""
         if isinstance(value, bytes):
             return value.decode('utf-8')
         return value
 
-    def fuzzy_search(self, query: str, max_distance: int = 2, limit: int = 10) -> List[Dict]:
+    def fuzzy_search(self, query: str, max_distance: int = 2, limit: int = 10, fields: List[str] = None, ids_only: bool = False, options: Dict = None) -> List[Dict]:
         """Use RediSearch FT.SEARCH with fuzzy matching"""
-        try:
-            if not query.strip():
-                return []
-            
-            self._ensure_index_exists()
-            
-            query_words = self.text_processor.extract_words(query.lower())
-            if not query_words:
-                return []
+        return self.corrected_fuzzy_search(query, max_distance, limit, fields, ids_only, options)['results']
 
-            fuzzy_terms = []
-            for word in query_words:
-                if max_distance == 1:
-                    fuzzy_terms.append(f"%{word}%")
-                elif max_distance == 2:
-                    fuzzy_terms.append(f"%%{word}%%")
-                else:
-                    fuzzy_terms.append(f"%%%{word}%%%")
-            
-            search_queries = [
-                f"@metadata.name:({' | '.join(fuzzy_terms)}) | @price:({' | '.join(fuzzy_terms)}) | @name:({' | '.join(fuzzy_terms)})",
-                " | ".join(fuzzy_terms),
-                f"({' | '.join(fuzzy_terms)})"
-            ]
-            
-            for search_query in search_queries:
-                try:
-                    result = self.redis_client.execute_command(
-                        'FT.SEARCH', self.index_name, 
-                        search_query,
-                        'LIMIT', '0', str(limit)
-                    )
-                    
-                    if result and len(result) > 1:
-                        return self._parse_search_results(result)
-                        
-                except Exception as e:
-                    logging.warning(f"Fuzzy search query '{search_query}' failed: {e}")
-                    continue
-            
-            return []
-            
+    def corrected_fuzzy_search(self, query: str, max_distance: int = 2, limit: int = 10, fields: List[str] = None, ids_only: bool = False, options: Dict = None) -> Dict:
+        """Fuzzy search after spelling correction, with the corrected query as ``did_you_mean``"""
+        try:
+            correction = self.correct_query(query, max_distance)
+            results = self._search(self.plan_fuzzy(query, max_distance, limit, fields, ids_only, options, correction))
+            return {'results': results, 'did_you_mean': correction['did_you_mean'] if correction else None}
         except Exception as e:
             logging.error(f"Error in RediSearch fuzzy search: {e}")
-            return []
+            return {'results': [], 'did_you_mean': None}
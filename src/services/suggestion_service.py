@@ -1,22 +1,93 @@
+import heapq
+import json
 import logging
-from typing import List
+import os
+import time
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import List, Dict, Tuple
 from src.utils import TextProcessor
 
+# Hash field describing a prefix table, never a prefix since it is longer than any materialized one
+PREFIX_TABLE_META = "__meta__"
+
+
+def phrases_key_for(suggestions_key: str) -> str:
+    """Sorted set mirroring a suggestion dictionary, which FT.SUG* cannot enumerate"""
+    return f"{suggestions_key}:phrases"
+
+
+def prefixes_key_for(suggestions_key: str) -> str:
+    """Hash of precomputed completions for short prefixes of a suggestion dictionary"""
+    return f"{suggestions_key}:prefixes"
+
+
+def sources_key_for(suggestions_key: str) -> str:
+    """Hash of the name each document contributed phrases for, so they can be taken back exactly"""
+    return f"{suggestions_key}:sources"
+
+
+def suggestion_keys_for(suggestions_key: str) -> Tuple[str, str, str, str]:
+    """Every key belonging to a suggestion dictionary, renamed and dropped together"""
+    return suggestions_key, phrases_key_for(suggestions_key), prefixes_key_for(suggestions_key), sources_key_for(suggestions_key)
+
 
 class SuggestionService:
-    def __init__(self, redis_client, suggestions_key: str = "suggestions"):
+    """FT.SUG dictionary of product name phrases, mirrored in a sorted set
+
+    With a ``generation`` every write to the dictionary bumps it, so readers such
+    as the in-process autocomplete engine reload only when suggestions changed.
+    Staging dictionaries of a rebuild have none, their promotion bumps the live one.
+    """
+
+    def __init__(self, redis_client, suggestions_key: str = "suggestions", read_client=None, generation=None):
         self.redis_client = redis_client
+        self.read_client = read_client or redis_client
         self.suggestions_key = suggestions_key
+        self.generation = generation
         self.text_processor = TextProcessor()
+        self.prefix_max_length = int(os.getenv('SUGGEST_PREFIX_MAX_LENGTH', 3))
+        self.prefix_top_n = int(os.getenv('SUGGEST_PREFIX_TOP_N', 50))
+
+    @property
+    def phrases_key(self) -> str:
+        return phrases_key_for(self.suggestions_key)
+
+    @property
+    def prefixes_key(self) -> str:
+        return prefixes_key_for(self.suggestions_key)
+
+    @property
+    def sources_key(self) -> str:
+        return sources_key_for(self.suggestions_key)
+
+    def queue_sources_read(self, pipe, doc_ids: List[str]):
+        """Queue reading the names ``doc_ids`` contributed phrases for, None for documents not tracked yet"""
+        pipe.hmget(self.sources_key, doc_ids)
+
+    def queue_sources(self, pipe, sources: Dict[str, str]) -> int:
+        """Queue recording the name each document now contributes phrases for, returns the number of commands"""
+        if not sources:
+            return 0
+        pipe.hset(self.sources_key, mapping=sources)
+        return 1
+
+    def queue_forget_sources(self, pipe, doc_ids: List[str]):
+        """Queue dropping the recorded names of deleted documents"""
+        pipe.hdel(self.sources_key, *doc_ids)
 
     def add_suggestion(self, suggestion: str, score: float = 1.0) -> bool:
         try:
-            self.redis_client.execute_command(
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.execute_command(
                 'FT.SUGADD', 
                 self.suggestions_key, 
                 suggestion, 
                 score
             )
+            pipe.zadd(self.phrases_key, {suggestion.lower(): score})
+            self.queue_changed(pipe)
+            pipe.execute()
             return True
         except Exception as e:
             logging.error(f"Error adding suggestion '{suggestion}': {e}")
@@ -24,47 +95,153 @@ class SuggestionService:
 
     def add_suggestion_with_increment(self, suggestion: str, score: float = 1.0) -> bool:
         try:
-            self.redis_client.execute_command(
-                'FT.SUGADD', 
-                self.suggestions_key, 
-                suggestion, 
-                score,
-                'INCR'
-            )
+            pipe = self.redis_client.pipeline(transaction=False)
+            self.queue_increment(pipe, suggestion, score)
+            self.queue_changed(pipe)
+            pipe.execute()
             return True
         except Exception as e:
             logging.error(f"Error adding suggestion with increment '{suggestion}': {e}")
             return False
 
+    def queue_increment(self, pipe, suggestion: str, score: float) -> int:
+        """Queue a score increment on the dictionary and its mirror, returns the number of commands"""
+        pipe.execute_command('FT.SUGADD', self.suggestions_key, suggestion, score, 'INCR')
+        pipe.zincrby(self.phrases_key, score, suggestion.lower())
+        return 2
+
+    def queue_changed(self, pipe) -> int:
+        """Queue a bump of the suggestions generation after queued writes, returns the number of commands"""
+        if self.generation is None:
+            return 0
+        self.generation.queue_bump(pipe)
+        return 1
+
+    def changed(self):
+        """Bump the suggestions generation after writes already executed"""
+        if self.generation is not None:
+            self.generation.bump()
+
     def get_suggestions(self, prefix: str, limit: int = 10, fuzzy: bool = False, with_scores: bool = False) -> List:
         try:
-            cmd = ['FT.SUGGET', self.suggestions_key, prefix, 'MAX', str(limit)]
-            
-            if fuzzy:
-                cmd.append('FUZZY')
-            
-            if with_scores:
-                cmd.append('WITHSCORES')
-            
-            result = self.redis_client.execute_command(*cmd)
-            
-            if with_scores:
-                suggestions = []
-                for i in range(0, len(result), 2):
-                    suggestion = result[i].decode('utf-8') if isinstance(result[i], bytes) else result[i]
-                    score = float(result[i + 1]) if i + 1 < len(result) else 0.0
-                    suggestions.append({'suggestion': suggestion, 'score': score})
-                return suggestions
-            else:
-                return [item.decode('utf-8') if isinstance(item, bytes) else item for item in result]
+            field = self.prefix_table_field(prefix, limit)
+            if field is not None:
+                served = self.parse_prefix_entry(self.read_client.hmget(self.prefixes_key, field, PREFIX_TABLE_META), limit, fuzzy, with_scores)
+                if served is not None:
+                    return served
+            result = self.read_client.execute_command(*self.suggestion_command(prefix, limit, fuzzy, with_scores))
+            return self.parse_suggestions(result, with_scores)
                 
         except Exception as e:
             logging.error(f"Error getting suggestions for '{prefix}': {e}")
             return []
 
+    def suggestion_command(self, prefix: str, limit: int = 10, fuzzy: bool = False, with_scores: bool = False) -> List[str]:
+        cmd = ['FT.SUGGET', self.suggestions_key, prefix, 'MAX', str(limit)]
+        
+        if fuzzy:
+            cmd.append('FUZZY')
+        
+        if with_scores:
+            cmd.append('WITHSCORES')
+        
+        return cmd
+
+    def prefix_table_field(self, prefix: str, limit: int):
+        """Hash field holding the completions of ``prefix``, None when the prefix table cannot answer"""
+        prefix = prefix.strip().lower()
+        if not prefix or len(prefix) > self.prefix_max_length or limit > self.prefix_top_n:
+            return None
+        return prefix
+
+    @staticmethod
+    def parse_prefix_entry(reply, limit: int, fuzzy: bool = False, with_scores: bool = False):
+        """Suggestions from an HMGET of a prefix field and the table meta, None to fall back to FT.SUGGET
+
+        A built table without the field means the prefix has no completions. Exact
+        completions outrank fuzzy ones, so a fuzzy lookup is served only when the
+        prefix has at least ``limit`` exact completions.
+        """
+        entry, meta = reply
+        if meta is None:
+            return None
+        completions = json.loads(entry) if entry else []
+        if fuzzy and len(completions) < limit:
+            return None
+        completions = completions[:limit]
+        if with_scores:
+            return [{'suggestion': phrase, 'score': score} for phrase, score in completions]
+        return [phrase for phrase, _ in completions]
+
+    def materialize_prefixes(self, chunk_size: int = 1000) -> Dict:
+        """Precompute the top completions of every prefix up to ``prefix_max_length`` characters
+
+        Reads the phrases mirror once, keeps a bounded heap per prefix and writes
+        the lists as JSON, ``chunk_size`` prefixes per round trip, into a temporary
+        hash that replaces the table with RENAME, so readers never see a half-built table.
+        """
+        try:
+            started = time.perf_counter()
+            top_n = self.prefix_top_n
+            heaps = defaultdict(list)
+            phrases = 0
+            for phrase, score in self.redis_client.zscan_iter(self.phrases_key, count=5000):
+                phrases += 1
+                item = (float(score), phrase)
+                for length in range(1, min(len(phrase), self.prefix_max_length) + 1):
+                    heap = heaps[phrase[:length]]
+                    if len(heap) < top_n:
+                        heapq.heappush(heap, item)
+                    elif item > heap[0]:
+                        heapq.heapreplace(heap, item)
+
+            if not heaps:
+                self.redis_client.delete(self.prefixes_key)
+                return {'prefixes': 0, 'phrases': 0, 'duration_seconds': round(time.perf_counter() - started, 3)}
+
+            building_key = f"{self.prefixes_key}:building"
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.delete(building_key)
+            mapping = {PREFIX_TABLE_META: json.dumps({'top_n': top_n, 'max_length': self.prefix_max_length, 'phrases': phrases, 'built_at': time.time()})}
+            for prefix, heap in heaps.items():
+                mapping[prefix] = json.dumps([[phrase, score] for score, phrase in sorted(heap, reverse=True)], separators=(',', ':'))
+                if len(mapping) >= chunk_size:
+                    pipe.hset(building_key, mapping=mapping)
+                    pipe.execute()
+                    mapping = {}
+            if mapping:
+                pipe.hset(building_key, mapping=mapping)
+            pipe.rename(building_key, self.prefixes_key)
+            pipe.execute()
+
+            duration = time.perf_counter() - started
+            logging.info(f"Materialized {len(heaps)} suggestion prefixes from {phrases} phrases in {duration:.3f}s")
+            return {'prefixes': len(heaps), 'phrases': phrases, 'duration_seconds': round(duration, 3)}
+        except Exception as e:
+            logging.error(f"Error materializing suggestion prefixes: {e}")
+            return {'error': str(e)}
+
+    def parse_suggestions(self, result, with_scores: bool = False) -> List:
+        if not result:
+            return []
+        
+        if with_scores:
+            suggestions = []
+            for i in range(0, len(result), 2):
+                suggestion = result[i].decode('utf-8') if isinstance(result[i], bytes) else result[i]
+                score = float(result[i + 1]) if i + 1 < len(result) else 0.0
+                suggestions.append({'suggestion': suggestion, 'score': score})
+            return suggestions
+        else:
+            return [item.decode('utf-8') if isinstance(item, bytes) else item for item in result]
+
     def delete_suggestion(self, suggestion: str) -> bool:
         try:
-            result = self.redis_client.execute_command('FT.SUGDEL', self.suggestions_key, suggestion)
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.execute_command('FT.SUGDEL', self.suggestions_key, suggestion)
+            pipe.zrem(self.phrases_key, suggestion.lower())
+            self.queue_changed(pipe)
+            result = pipe.execute()[0]
             return bool(result)
         except Exception as e:
             logging.error(f"Error deleting suggestion '{suggestion}': {e}")
@@ -80,26 +257,60 @@ class SuggestionService:
 
     def clear_suggestions(self) -> bool:
         try:
-            self.redis_client.delete(self.suggestions_key)
+            self.redis_client.unlink(*suggestion_keys_for(self.suggestions_key))
+            self.changed()
             return True
         except Exception as e:
             logging.error(f"Error clearing suggestions: {e}")
             return False
 
+    def _suggestion_score(self, suggestion: str, weight_multiplier: float = 1.0) -> float:
+        word_count = len(suggestion.split())
+        return max(1.0, 5.0 - word_count) * weight_multiplier
+
+    def queue_decrements(self, pipe, scores: Dict[str, float]) -> Dict:
+        """Queue subtracting ``scores`` from their phrases, deleting the phrases it takes to zero
+
+        The current scores are read from the mirror first, in one ZMSCORE, and decide
+        per phrase between ``FT.SUGADD ... INCR`` with the negative score and
+        FT.SUGDEL. Phrases missing from the mirror are left alone. Every phrase
+        decremented or deleted costs two commands.
+        """
+        stats = {'decremented': 0, 'deleted': 0, 'commands': 0}
+        if not scores:
+            return stats
+        phrases = list(scores)
+        current = self.redis_client.zmscore(self.phrases_key, [phrase.lower() for phrase in phrases])
+        for phrase, left in zip(phrases, current):
+            if left is None:
+                continue
+            score = scores[phrase]
+            if float(left) - score <= 0:
+                pipe.execute_command('FT.SUGDEL', self.suggestions_key, phrase)
+                pipe.zrem(self.phrases_key, phrase.lower())
+                stats['deleted'] += 1
+            else:
+                self.queue_increment(pipe, phrase, -score)
+                stats['decremented'] += 1
+            stats['commands'] += 2
+        return stats
+
+    def queue_document_suggestions(self, pipe, names: str, weight_multiplier: float = 1.0) -> int:
+        """Queue score increments for a document on a pipeline, returns the number of commands queued"""
+        suggestions = self.text_processor.tokenize_for_suggestions(names)
+        for suggestion in suggestions:
+            self.queue_increment(pipe, suggestion, self._suggestion_score(suggestion, weight_multiplier))
+        return len(suggestions) * 2
+
+    def builder(self, chunk_size: int = 1000, max_pending: int = 50000) -> 'SuggestionBuilder':
+        """Bulk builder that writes each phrase of many documents once"""
+        return SuggestionBuilder(self, chunk_size, max_pending)
+
     def index_document_for_suggestions(self, sku: str, names: str, weight_multiplier: float = 1.0) -> bool:
         try:
-            suggestions = self.text_processor.tokenize_for_suggestions(names)
-            
-            success_count = 0
-            total_count = len(suggestions)
-            
-            for suggestion in suggestions:
-                word_count = len(suggestion.split())
-                base_score = max(1.0, 5.0 - word_count)
-                final_score = base_score * weight_multiplier
-                
-                if self.add_suggestion_with_increment(suggestion, final_score):
-                    success_count += 1
+            builder = self.builder()
+            total_count = builder.add(names, weight_multiplier)
+            success_count = builder.flush()['phrases']
             
             logging.info(f"Added {success_count}/{total_count} suggestions for SKU {sku}")
             return success_count > 0
@@ -107,3 +318,94 @@ class SuggestionService:
         except Exception as e:
             logging.error(f"Error indexing document for suggestions: {e}")
             return False
+
+class SuggestionBuilder:
+    """Accumulates suggestion scores of many documents locally and writes each phrase once
+
+    Names are tokenized through a memoized tokenizer, so repeated product names cost
+    one tokenization. Scores are summed in a Counter and written as one
+    ``FT.SUGADD ... INCR`` per unique phrase, pipelined in chunks of ``chunk_size``
+    together with the matching ZINCRBY on the phrases mirror.
+    INCR keeps the result identical to per-document writes, including scores
+    already in the dictionary. ``subtract`` takes a name's phrases back, e.g. the
+    old name of a renamed product, and nets out against adds of the same phrase;
+    phrases left negative are decremented instead. ``full`` tells the caller to
+    flush once ``max_pending`` phrases are buffered, bounding memory on large catalogs.
+    """
+
+    def __init__(self, suggestion_service: SuggestionService, chunk_size: int = 1000, max_pending: int = 50000, cache_size: int = 65536):
+        self.suggestion_service = suggestion_service
+        self.chunk_size = max(1, chunk_size)
+        self.max_pending = max_pending
+        self.scores = Counter()
+        self._tokenize = lru_cache(maxsize=cache_size)(suggestion_service.text_processor.tokenize_for_suggestions)
+        self.documents = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self.scores)
+
+    @property
+    def full(self) -> bool:
+        return self.pending >= self.max_pending
+
+    def add(self, names: str, weight_multiplier: float = 1.0) -> int:
+        """Add the phrases of one document to the local counter, returns the number of phrases"""
+        suggestions = self._tokenize(names)
+        for suggestion in suggestions:
+            self.scores[suggestion] += self.suggestion_service._suggestion_score(suggestion, weight_multiplier)
+        self.documents += 1
+        return len(suggestions)
+
+    def subtract(self, names: str, weight_multiplier: float = 1.0) -> int:
+        """Take the phrases of one document back from the local counter, returns the number of phrases"""
+        suggestions = self._tokenize(names)
+        for suggestion in suggestions:
+            self.scores[suggestion] -= self.suggestion_service._suggestion_score(suggestion, weight_multiplier)
+        return len(suggestions)
+
+    def _queue_chunk(self, pipe, items) -> int:
+        """Queue increments and decrements of ``items``, two commands per phrase queued, returns the number of commands"""
+        queued = 0
+        decrements = {}
+        for suggestion, score in items:
+            if score > 0:
+                queued += self.suggestion_service.queue_increment(pipe, suggestion, score)
+            elif score < 0:
+                decrements[suggestion] = -score
+        return queued + self.suggestion_service.queue_decrements(pipe, decrements)['commands']
+
+    def queue(self, pipe) -> int:
+        """Queue every buffered phrase on ``pipe`` and reset the counter, returns the number of commands queued
+
+        Decremented phrases need their current score, read with one extra round trip.
+        """
+        queued = self._queue_chunk(pipe, self.scores.items())
+        if queued:
+            queued += self.suggestion_service.queue_changed(pipe)
+        self.scores.clear()
+        return queued
+
+    def flush(self) -> Dict:
+        """Write every buffered phrase in pipelined chunks and reset the counter"""
+        stats = {'phrases': 0, 'commands': 0, 'round_trips': 0, 'errors': 0}
+        items = list(self.scores.items())
+        self.scores.clear()
+        for start in range(0, len(items), self.chunk_size):
+            chunk = items[start:start + self.chunk_size]
+            pipe = self.suggestion_service.redis_client.pipeline(transaction=False)
+            try:
+                queued = self._queue_chunk(pipe, chunk)
+                stats['commands'] += queued
+                stats['round_trips'] += 1
+                results = pipe.execute(raise_on_error=False)
+            except Exception as e:
+                logging.error(f"Error writing {len(chunk)} suggestions: {e}")
+                stats['errors'] += len(chunk)
+                continue
+            failed = sum(1 for r in results[::2] if isinstance(r, Exception))
+            stats['errors'] += failed
+            stats['phrases'] += queued // 2 - failed
+        if stats['phrases']:
+            self.suggestion_service.changed()
+        return stats
@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+from typing import Dict, List
+
+SYNC_GENERATION_KEY = "search:sync:generation"
+SYNC_STAMPS_KEY = "search:sync:stamps"
+
+
+class SyncGeneration:
+    """Generation counter of full syncs and the per-document stamps used to sweep deleted products
+
+    Every indexed document id is stamped in the ``search:sync:stamps`` sorted set
+    with the generation of the run that last saw it. A full sync starts a new
+    generation and, once it has read every product, ``sweep`` removes the
+    documents still stamped with an older one: products deleted from PostgreSQL.
+    Documents that were never stamped are left alone.
+    """
+
+    def __init__(self, redis_client, chunk_size: int = 500, throttle_seconds: float = 0.01, max_ratio: float = 0.5):
+        self.redis_client = redis_client
+        self.chunk_size = chunk_size
+        self.throttle_seconds = throttle_seconds
+        self.max_ratio = max_ratio
+        self.sweeps = {}
+
+    def current(self) -> int:
+        return int(self.redis_client.get(SYNC_GENERATION_KEY) or 0)
+
+    def next(self) -> int:
+        """Start a new generation for a full sync"""
+        return int(self.redis_client.incr(SYNC_GENERATION_KEY))
+
+    @staticmethod
+    def queue_stamp(pipe, doc_ids: List[str], generation: int):
+        """Queue stamping ``doc_ids`` with ``generation`` on a pipeline, never lowering an existing stamp"""
+        pipe.zadd(SYNC_STAMPS_KEY, dict.fromkeys(doc_ids, generation), gt=True)
+
+    def stale_count(self, generation: int) -> int:
+        return int(self.redis_client.zcount(SYNC_STAMPS_KEY, '-inf', f'({generation}'))
+
+    def clear(self):
+        self.redis_client.unlink(SYNC_STAMPS_KEY)
+
+    def sweep(self, generation: int, document_service, suggestion_service, progress: Dict = None, force: bool = False) -> Dict:
+        """Delete documents stamped before ``generation`` and take back their suggestions
+
+        Stale ids are taken in chunks of ``chunk_size``: one round trip reads the
+        names they contributed suggestions for, then one pipeline unlinks the
+        documents, their stamps and recorded names and takes exactly those phrases
+        back, after reading the current scores of the phrases it decrements.
+        ``throttle_seconds`` is slept between chunks. Unless ``force``, nothing is deleted when the stale
+        documents exceed ``max_ratio`` of the stamped ones, which points at a
+        sync that did not see the whole table rather than at real deletions.
+        """
+        progress = progress if progress is not None else {}
+        progress.update({'generation': generation, 'stale': self.stale_count(generation), 'deleted': 0, 'chunks': 0,
+                         'suggestions_decremented': 0, 'suggestions_deleted': 0})
+        stamped = int(self.redis_client.zcard(SYNC_STAMPS_KEY))
+        if not force and stamped and progress['stale'] > stamped * self.max_ratio:
+            progress['error'] = (f"{progress['stale']} of {stamped} documents are stale, above SYNC_SWEEP_MAX_RATIO "
+                                 f"{self.max_ratio}; refusing to sweep")
+            logging.error(progress['error'])
+            return progress
+        builder = suggestion_service.builder(self.chunk_size)
+
+        while True:
+            doc_ids = self.redis_client.zrangebyscore(SYNC_STAMPS_KEY, '-inf', f'({generation}', start=0, num=self.chunk_size)
+            if not doc_ids:
+                break
+            keys = [document_service.document_key(doc_id) for doc_id in doc_ids]
+            pipe = self.redis_client.pipeline(transaction=False)
+            suggestion_service.queue_sources_read(pipe, doc_ids)
+            for key in keys:
+                pipe.hget(key, 'name')
+            sources, *names = pipe.execute()
+            for source, name in zip(sources, names):
+                # Documents indexed before names were recorded contributed their current name
+                contributed = source if source is not None else name
+                if contributed:
+                    builder.add(contributed, 1.0)
+
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.unlink(*keys)
+            pipe.zrem(SYNC_STAMPS_KEY, *doc_ids)
+            suggestion_service.queue_forget_sources(pipe, doc_ids)
+            retracted = suggestion_service.queue_decrements(pipe, dict(builder.scores))
+            builder.scores.clear()
+            changed = suggestion_service.queue_changed(pipe) if retracted['commands'] else 0
+            deleted = pipe.execute()[0]
+            if changed:
+                suggestion_service.generation.invalidate()
+            progress['deleted'] += deleted
+            progress['chunks'] += 1
+            progress['suggestions_decremented'] += retracted['decremented']
+            progress['suggestions_deleted'] += retracted['deleted']
+            if self.throttle_seconds:
+                time.sleep(self.throttle_seconds)
+
+        logging.info(f"Sweep of sync generation {generation}: {progress['deleted']} stale documents deleted")
+        return progress
+
+    def sweep_in_background(self, generation: int, document_service, suggestion_service, on_done=None) -> threading.Thread:
+        """Run ``sweep`` in a daemon thread, ``on_done(progress)`` is called once it deleted anything"""
+        progress = {'generation': generation, 'status': 'running', 'started_at': time.time()}
+        self.sweeps[generation] = progress
+
+        def run():
+            try:
+                self.sweep(generation, document_service, suggestion_service, progress)
+                progress['status'] = 'failed' if 'error' in progress else 'completed'
+            except Exception as e:
+                progress['status'] = 'failed'
+                progress['error'] = str(e)
+                logging.error(f"Error sweeping sync generation {generation}: {e}")
+            finally:
+                if on_done and progress.get('deleted'):
+                    try:
+                        on_done(progress)
+                    except Exception as e:
+                        logging.error(f"Error finishing sweep of sync generation {generation}: {e}")
+                progress['finished_at'] = time.time()
+
+        thread = threading.Thread(target=run, name=f'sync-sweep-g{generation}', daemon=True)
+        thread.start()
+        return thread
+
+    def get_status(self) -> Dict:
+        return {
+            'generation': self.current(),
+            'sweeps': [dict(progress) for progress in self.sweeps.values()]
+        }